@@ -1,28 +1,91 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file
+from flask import (Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file, abort,
+                   Response, g, send_from_directory, make_response, has_request_context)
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
+from werkzeug.datastructures import MultiDict
 from datetime import datetime, timedelta
 import os
 import re
+import atexit
+import math
+import json
+import hashlib
+import mimetypes
+import queue
+import random
+import sqlite3
+import threading
+import time
+import uuid
 from functools import wraps
+from itertools import groupby
 import io
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import click
+import csv
 import matplotlib
 
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config import Config
+from sentiment import SentimentLexicon, classify_score, classify_scores, aggregate_by_poll, merge_aggregates
+from scheduler import LifecycleScheduler
+from rollups import GRANULARITIES, bucket_start, coarser, aggregate_rows, build_series
+from caching import TTLCache
+from bulk_import import BulkImportError, iter_records, iter_ndjson, iter_json_array, validate_poll_record
+from remote_images import fetch_image
+from voters import canonical_identity
+from bloom import VoterFilterRegistry
+from tallies import CounterBuffer, WriteRateTracker, option_counter, reaction_counter, pick_shard, split_counts
+from tabulation import SINGLE, BORDA, APPROVAL, RANKED_METHODS, VOTING_METHODS, ballot_matrix, tabulate
+from events import create_event_bus
+from replicas import ReplicaRoutingSession
+from assets import DIST_DIR, AssetManifest, build_bundles
+from compression import SUPPORTED_ENCODINGS, FILE_SUFFIXES, negotiate, compress
+from idempotency import PENDING, create_idempotency_store
+from viewcounts import HyperLogLog, ViewBuffer
+from ratelimit import AdmissionController, create_rate_limiter
+from archive import VOTE_COLUMNS, RANKING_COLUMNS, ArchiveReader, write_archive
+from breakdowns import NO_ACCOUNT, compute_breakdown
+from suggest import TitleIndex
 
 app = Flask(__name__)
+app.config.from_object(Config)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///polling_system.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
 
-db = SQLAlchemy(app)
+# Each replica is an extra bind; no model is bound to them, so create_all leaves them alone
+REPLICA_BINDS = [f'replica_{i}' for i in range(len(app.config['SQLALCHEMY_REPLICA_URIS']))]
+app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}),
+                                  **dict(zip(REPLICA_BINDS, app.config['SQLALCHEMY_REPLICA_URIS']))}
+
+db = SQLAlchemy(app, session_options={'class_': ReplicaRoutingSession})
+
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
@@ -31,8 +94,19 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'profiles'), exist_ok=True)
 os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'polls'), exist_ok=True)
 
+sentiment_lexicon = SentimentLexicon.from_config(app.config)
+
 
 # -------------------- DATABASE MODELS --------------------
+POLL_SCHEDULED = 'scheduled'
+POLL_OPEN = 'open'
+POLL_CLOSED = 'closed'
+POLL_DELETING = 'deleting'  # hidden everywhere while a background delete job removes its rows
+
+REACTION_TYPES = ['like', 'love', 'wow', 'sad', 'angry']
+POLL_CATEGORIES = ['General', 'Politics', 'Sports', 'Technology', 'Entertainment', 'Health', 'Education', 'Business']
+
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
@@ -61,61 +135,128 @@ class Poll(db.Model):
     category = db.Column(db.String(50), default='General')
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
     is_masked = db.Column(db.Boolean, default=False)
     is_anonymous_voting = db.Column(db.Boolean, default=False)
-    scheduled_for = db.Column(db.DateTime, nullable=True)
+    scheduled_for = db.Column(db.DateTime, nullable=True, index=True)
     image = db.Column(db.String(200), nullable=True)
-
-    options = db.relationship('Option', backref='poll', lazy=True, cascade='all, delete-orphan')
-    votes = db.relationship('Vote', backref='poll', lazy=True, cascade='all, delete-orphan')
-    comments = db.relationship('Comment', backref='poll', lazy=True, cascade='all, delete-orphan')
-    reactions = db.relationship('Reaction', backref='poll', lazy=True, cascade='all, delete-orphan')
+    # scheduled -> open -> closed, advanced by the lifecycle scheduler
+    status = db.Column(db.String(20), default=POLL_OPEN, nullable=False, index=True)
+    # Rows each vote / reaction counter is spread over; raised automatically for hot polls
+    tally_shards = db.Column(db.Integer, default=1, nullable=False)
+    voting_method = db.Column(db.String(20), default=SINGLE, nullable=False)
+    max_choices = db.Column(db.Integer, nullable=True)  # Approval polls: most options one ballot may approve
+
+    # Child rows are removed by ON DELETE CASCADE in the database, never loaded just to be deleted
+    options = db.relationship('Option', backref='poll', lazy=True, cascade='all, delete-orphan',
+                              passive_deletes=True)
+    votes = db.relationship('Vote', backref='poll', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    comments = db.relationship('Comment', backref='poll', lazy=True, cascade='all, delete-orphan',
+                               passive_deletes=True)
+    reactions = db.relationship('Reaction', backref='poll', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
+    sentiment = db.relationship('PollSentiment', uselist=False, lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
+    result_snapshot = db.relationship('PollResultSnapshot', uselist=False, lazy=True, cascade='all, delete-orphan',
+                                      passive_deletes=True)
+    vote_rollups = db.relationship('VoteRollup', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    tallies = db.relationship('PollTally', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    view_stats = db.relationship('PollViewStats', uselist=False, lazy=True, cascade='all, delete-orphan',
+                                 passive_deletes=True)
+    archive = db.relationship('ArchivedPoll', uselist=False, lazy=True, cascade='all, delete-orphan',
+                              passive_deletes=True)
+
+    @property
+    def is_expired(self):
+        return self.status == POLL_CLOSED
+
+    @property
+    def is_scheduled(self):
+        return self.status == POLL_SCHEDULED
 
 
 class Option(db.Model):
     __tablename__ = 'options'
     id = db.Column(db.Integer, primary_key=True)
-    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id'), nullable=False)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
     option_text = db.Column(db.String(300), nullable=False)
     image = db.Column(db.String(200), nullable=True)
-    votes = db.relationship('Vote', backref='option', lazy=True, cascade='all, delete-orphan')
+    votes = db.relationship('Vote', backref='option', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+
+
+class Voter(db.Model):
+    """One row per canonical guest email / phone, referenced by integer key from votes and reactions"""
+    __tablename__ = 'voters'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)
+    identity = db.Column(db.String(120), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Equality-only lookups; PostgreSQL can serve them from a smaller hash index
+    __table_args__ = (db.Index('ix_voters_identity_hash', 'identity', postgresql_using='hash'),)
 
 
 class Vote(db.Model):
     __tablename__ = 'votes'
     id = db.Column(db.Integer, primary_key=True)
-    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id'), nullable=False)
-    option_id = db.Column(db.Integer, db.ForeignKey('options.id'), nullable=False)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
+    option_id = db.Column(db.Integer, db.ForeignKey('options.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    voter_id = db.Column(db.Integer, db.ForeignKey('voters.id'), nullable=True)
+    # Legacy guest identity columns; new guest votes store voter_id only
     email = db.Column(db.String(120), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     is_anonymous = db.Column(db.Boolean, default=False)
 
+    # One vote per guest per poll, enforced by the database so inserts can skip the pre-read
+    __table_args__ = (db.UniqueConstraint('poll_id', 'voter_id', name='uq_votes_poll_voter'),)
+
+    # Ranked / approval polls: the full ballot; option_id above holds the first preference
+    rankings = db.relationship('BallotRanking', lazy=True, order_by='BallotRanking.rank',
+                               cascade='all, delete-orphan', passive_deletes=True)
+
+
+class BallotRanking(db.Model):
+    """One preference on a ranked or approval ballot (rank 0 is the first choice)"""
+    __tablename__ = 'ballot_rankings'
+    id = db.Column(db.Integer, primary_key=True)
+    vote_id = db.Column(db.Integer, db.ForeignKey('votes.id', ondelete='CASCADE'), nullable=False, index=True)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
+    option_id = db.Column(db.Integer, db.ForeignKey('options.id', ondelete='CASCADE'), nullable=False)
+    rank = db.Column(db.SmallInteger, nullable=False)
+
 
 class Comment(db.Model):
     __tablename__ = 'comments'
     id = db.Column(db.Integer, primary_key=True)
-    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id'), nullable=False)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     comment_text = db.Column(db.Text, nullable=False)
     sentiment_score = db.Column(db.Float, default=0.0)
-    parent_id = db.Column(db.Integer, db.ForeignKey('comments.id'), nullable=True)
+    parent_id = db.Column(db.Integer, db.ForeignKey('comments.id', ondelete='CASCADE'), nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     is_reported = db.Column(db.Boolean, default=False)
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy=True)
 
+    @property
+    def sentiment_label(self):
+        return classify_score(self.sentiment_score, app.config['SENTIMENT_POSITIVE_THRESHOLD'],
+                              app.config['SENTIMENT_NEGATIVE_THRESHOLD'])
+
 
 class Reaction(db.Model):
     __tablename__ = 'reactions'
     id = db.Column(db.Integer, primary_key=True)
-    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id'), nullable=False)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Now nullable for guest users
-    email = db.Column(db.String(120), nullable=True)  # Added for guest users
+    voter_id = db.Column(db.Integer, db.ForeignKey('voters.id'), nullable=True)  # Guest users
+    email = db.Column(db.String(120), nullable=True)  # Legacy guest column, superseded by voter_id
     reaction_type = db.Column(db.String(20), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (db.Index('ix_reactions_poll_voter', 'poll_id', 'voter_id'),)
+
 
 class Badge(db.Model):
     __tablename__ = 'badges'
@@ -125,10 +266,236 @@ class Badge(db.Model):
     earned_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class PollSentiment(db.Model):
+    __tablename__ = 'poll_sentiment'
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), primary_key=True)
+    comment_count = db.Column(db.Integer, default=0, nullable=False)
+    score_sum = db.Column(db.Float, default=0.0, nullable=False)
+    positive_count = db.Column(db.Integer, default=0, nullable=False)
+    neutral_count = db.Column(db.Integer, default=0, nullable=False)
+    negative_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.comment_count if self.comment_count else 0.0
+
+    def distribution(self):
+        total = self.comment_count or 1
+        return {
+            'positive': self.positive_count / total * 100,
+            'neutral': self.neutral_count / total * 100,
+            'negative': self.negative_count / total * 100,
+        }
+
+
+class PollResultSnapshot(db.Model):
+    """Final results of a closed poll, written once when it closes"""
+    __tablename__ = 'poll_result_snapshots'
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), primary_key=True)
+    total_votes = db.Column(db.Integer, nullable=False, default=0)
+    option_counts = db.Column(db.JSON, nullable=False)  # {"<option_id>": count}
+    reactions = db.Column(db.JSON, nullable=False)  # {"like": count, ...}
+    total_reactions = db.Column(db.Integer, nullable=False, default=0)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    rebuilt_at = db.Column(db.DateTime, nullable=True)
+
+    def counts_by_option(self):
+        return {int(option_id): count for option_id, count in self.option_counts.items()}
+
+
+class VoteRollup(db.Model):
+    """Vote counts per poll option per time bucket; minute buckets are compacted into hours, hours into days"""
+    __tablename__ = 'vote_rollups'
+    id = db.Column(db.Integer, primary_key=True)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False)
+    option_id = db.Column(db.Integer, db.ForeignKey('options.id', ondelete='CASCADE'), nullable=False)
+    granularity = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('poll_id', 'option_id', 'granularity', 'bucket_start', name='uq_vote_rollup_bucket'),
+        db.Index('ix_vote_rollups_granularity_bucket', 'granularity', 'bucket_start'),
+    )
+
+
+class PollTally(db.Model):
+    """
+    One shard of a per-poll counter ('option:<id>' or 'reaction:<type>').
+    A counter's value is the sum of its shards.
+    """
+    __tablename__ = 'poll_tallies'
+    id = db.Column(db.Integer, primary_key=True)
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), nullable=False)
+    counter = db.Column(db.String(40), nullable=False)
+    shard = db.Column(db.SmallInteger, nullable=False, default=0)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    __table_args__ = (db.UniqueConstraint('poll_id', 'counter', 'shard', name='uq_poll_tally_shard'),)
+
+
+class PollViewStats(db.Model):
+    """Page views per poll, flushed in batches from each worker's buffer, with a HyperLogLog of distinct viewers"""
+    __tablename__ = 'poll_view_stats'
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), primary_key=True)
+    views = db.Column(db.BigInteger, nullable=False, default=0)
+    viewer_sketch = db.Column(db.LargeBinary, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class PollDeleteJob(db.Model):
+    """
+    A background poll delete and its progress. The worker running it holds
+    `runner` and refreshes updated_at after every chunk; a job whose runner
+    went quiet is picked up again by any worker. A job that fails is retried
+    with exponential backoff, and after POLL_DELETE_MAX_ATTEMPTS it stays
+    failed until an admin retries it.
+    """
+    __tablename__ = 'poll_delete_jobs'
+    id = db.Column(db.String(12), primary_key=True)
+    poll_ids_json = db.Column(db.Text, nullable=False)
+    state = db.Column(db.String(20), nullable=False, default='queued')  # queued / running / retrying / done / failed
+    table_name = db.Column(db.String(50), nullable=True)
+    total = db.Column(db.Integer, nullable=True)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    runner = db.Column(db.String(32), nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # Failed runs so far
+    retry_at = db.Column(db.DateTime, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def poll_ids(self):
+        return json.loads(self.poll_ids_json)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'poll_ids': self.poll_ids,
+            'state': self.state,
+            'table': self.table_name,
+            'total': self.total,
+            'deleted': self.deleted,
+            'attempts': self.attempts,
+            'retry_at': self.retry_at.isoformat() if self.retry_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error,
+        }
+
+
+class ArchivedPoll(db.Model):
+    """
+    A closed poll whose votes were moved into an archive file. Its results
+    keep coming from the snapshot and tallies; raw votes are read from the file.
+    """
+    __tablename__ = 'archived_polls'
+    poll_id = db.Column(db.Integer, db.ForeignKey('polls.id', ondelete='CASCADE'), primary_key=True)
+    path = db.Column(db.String(300), nullable=False)  # Relative to ARCHIVE_FOLDER
+    vote_count = db.Column(db.Integer, nullable=False, default=0)
+    ranking_count = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ArchivedVoterCount(db.Model):
+    """Votes an account cast on an archived poll, so activity recounts never open archive files"""
+    __tablename__ = 'archived_voter_counts'
+    poll_id = db.Column(db.Integer, db.ForeignKey('archived_polls.poll_id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+    vote_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class GlobalStat(db.Model):
+    """Platform-wide row counts kept current by write-path hooks instead of COUNT(*) scans"""
+    __tablename__ = 'global_stats'
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CategoryStat(db.Model):
+    """Listed polls per category, kept current on write for the category facets"""
+    __tablename__ = 'category_stats'
+    category = db.Column(db.String(50), primary_key=True)
+    open_count = db.Column(db.BigInteger, nullable=False, default=0)
+    total_count = db.Column(db.BigInteger, nullable=False, default=0)  # Open and closed
+
+
+class UserActivity(db.Model):
+    """Per-user activity totals kept current on write for profile cards and badges"""
+    __tablename__ = 'user_activity'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    vote_count = db.Column(db.Integer, default=0, nullable=False)
+    poll_count = db.Column(db.Integer, default=0, nullable=False)
+    comment_count = db.Column(db.Integer, default=0, nullable=False)
+    reaction_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # -------------------- LOGIN MANAGER --------------------
+class SessionUser(UserMixin):
+    """
+    Read-only identity for current_user, built from the users row alone.
+    Routes that modify the account load the User model explicitly.
+    """
+    FIELDS = ('id', 'name', 'email', 'phone', 'profile_picture', 'name_changed', 'created_at', 'is_admin')
+
+    def __init__(self, row):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(row, field))
+
+    def __repr__(self):
+        return f"<SessionUser {self.id}>"
+
+
+user_cache = TTLCache(maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL_SECONDS'])
+
+
+def _load_session_user(user_id):
+    row = db.session.query(*(getattr(User, field) for field in SessionUser.FIELDS)) \
+        .filter(User.id == user_id).first()
+    return SessionUser(row) if row is not None else None
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = _load_session_user(user_id)
+        if user is not None:
+            user_cache.set(user_id, user)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    user_cache.pop(user_id)
+    # Every other worker drops its copy too, so a revoked admin flag stops working everywhere
+    publish_event('user.updated', user_id=user_id)
+
+
+def _user_changed(target):
+    user_id = target.id
+    user_cache.pop(user_id)
+    # Published after the commit, so no worker reloads the row before the change is visible
+    run_after_commit(object_session(target), lambda: invalidate_cached_user(user_id))
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    # Covers name, picture and admin flag changes from any code path: routes, shell or scripts
+    attrs = db.inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in SessionUser.FIELDS):
+        _user_changed(target)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _user_changed(target)
 
 
 # -------------------- HELPERS --------------------
@@ -157,19 +524,2450 @@ def admin_required(f):
     return decorated_function
 
 
+idempotency_store = create_idempotency_store(app.config)
+# Only these headers are replayed; Set-Cookie in particular belongs to the original client session
+IDEMPOTENT_REPLAY_HEADERS = ('Content-Type', 'Location')
+
+
+def request_guest_identity():
+    """Canonical email / phone a guest sent in the form or JSON body, or None"""
+    data = request.form if request.form else request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    email, phone = data.get('email'), data.get('phone')
+    # JSON clients can send anything; only strings can be an address or number
+    canonical = canonical_identity(email if isinstance(email, str) else None,
+                                   phone if isinstance(phone, str) else None)
+    return canonical[1] if canonical is not None else None
+
+
+def idempotency_client():
+    """Who an Idempotency-Key belongs to: the user, else the guest's canonical email / phone, else their session"""
+    user_id = session.get('_user_id')
+    if user_id is not None:
+        return f"user:{user_id}"
+    identity = request_guest_identity()
+    if identity is not None:
+        # Hashed so stored keys do not carry the guest's address
+        return f"guest:{hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32]}"
+    # Guests who give no identity get a random one kept in their session cookie
+    return f"session:{session.setdefault('idempotency_client', uuid.uuid4().hex)}"
+
+
+def idempotent(f):
+    """
+    Honour an Idempotency-Key header: the first response is stored and
+    returned as-is to retries with the same key, without running the view.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > app.config['IDEMPOTENCY_KEY_MAX_LENGTH']:
+            return jsonify({'success': False, 'message': 'Idempotency-Key is too long'}), 400
+
+        # Scoped per client and path so keys from different users or guests cannot collide
+        scope = f"{request.method}:{request.path}:{idempotency_client()}:{key}"
+        payload = sorted(request.form.items(multi=True)) if request.form else request.get_data(as_text=True)
+        fingerprint = hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()
+
+        record = idempotency_store.reserve(scope, fingerprint)
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                return jsonify({'success': False,
+                                'message': 'Idempotency-Key was already used with a different request'}), 422
+            if record['state'] == PENDING:
+                return jsonify({'success': False, 'message': 'A request with this Idempotency-Key is in progress'}), 409
+            response = Response(record['body'], status=record['status'], headers=record['headers'])
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_store.release(scope)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            # Let the client retry for real
+            idempotency_store.release(scope)
+        else:
+            idempotency_store.complete(scope, {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'headers': {name: response.headers[name] for name in IDEMPOTENT_REPLAY_HEADERS if name in response.headers},
+                'body': response.get_data(as_text=True),
+            })
+        return response
+
+    return decorated_function
+
+
+rate_limiter = create_rate_limiter(app.config)
+admission = AdmissionController(max_pending=app.config['ADMISSION_MAX_PENDING_WRITES'],
+                                max_latency=app.config['ADMISSION_MAX_DB_LATENCY_MS'] / 1000,
+                                window=app.config['ADMISSION_LATENCY_WINDOW_SECONDS'])
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['statement_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def observe_write_latency(conn, cursor, statement, parameters, context, executemany):
+    # Lock waits on a saturated writer show up in the write statements themselves. Only requests count:
+    # a bulk delete or counter flush on the scheduler thread is slow by design and must not shed votes.
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete) \
+            and has_request_context():
+        admission.observe(time.perf_counter() - conn.info['statement_started'])
+
+
+def rate_limit_keys(bucket):
+    """(key, rate, burst) for each identity the request can be charged to"""
+    rate, burst = app.config['RATE_LIMITS'][bucket]
+    multiplier = app.config['RATE_LIMIT_IP_MULTIPLIER']
+    # Offices and mobile carriers put many clients behind one address, so its bucket is larger
+    limits = [(f"{bucket}:ip:{request.remote_addr}", rate * multiplier, burst * multiplier)]
+    if current_user.is_authenticated:
+        limits.append((f"{bucket}:user:{current_user.id}", rate, burst))
+    else:
+        identity = request_guest_identity()
+        if identity is not None:
+            limits.append((f"{bucket}:guest:{identity}", rate, burst))
+    return limits
+
+
+def overloaded(status, message, retry_after):
+    response = jsonify({'success': False, 'message': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(int(math.ceil(retry_after)), 1))
+    return response
+
+
+def rate_limited(bucket, cost=None):
+    """
+    Charge the client's RATE_LIMITS[bucket] token buckets (per IP, and per
+    user or guest email) and shed the write while the database is behind.
+    cost() may price a request at more than one token, e.g. a batch.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if app.config['ADMISSION_CONTROL_ENABLED']:
+                reason = admission.check()
+                if reason:
+                    return overloaded(503, f"{reason}, please try again shortly", 1)
+
+            if app.config['RATE_LIMIT_ENABLED']:
+                try:
+                    retry_after = rate_limiter.allow(rate_limit_keys(bucket), cost() if cost else 1)
+                except Exception:
+                    # An unreachable limiter store should not take the write endpoints down with it
+                    app.logger.exception("Rate limiter unavailable; allowing request")
+                    retry_after = 0
+                if retry_after:
+                    return overloaded(429, 'Too many requests, please slow down', retry_after)
+
+            with admission:
+                return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def get_or_create_voter(email=None, phone=None):
+    """Integer key for a guest's canonical email / phone, or None if neither is usable"""
+    canonical = canonical_identity(email, phone)
+    if canonical is None:
+        return None
+    kind, identity = canonical
+
+    voter_id = db.session.query(Voter.id).filter_by(identity=identity).scalar()
+    if voter_id is not None:
+        return voter_id
+
+    # A concurrent request may insert the same identity; let the unique constraint settle it
+    insert_if_missing(Voter.__table__, {'kind': kind, 'identity': identity, 'created_at': datetime.utcnow()},
+                      ['identity'])
+    return db.session.query(Voter.id).filter_by(identity=identity).scalar()
+
+
+def insert_if_missing(table, values, index_elements):
+    """Insert a row unless one with the same unique key exists; concurrent inserts of the same key are fine"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        db.session.execute(insert(table).values(**values).on_conflict_do_nothing(index_elements=index_elements))
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(table).values(**values))
+    except IntegrityError:
+        pass
+
+
 def check_and_award_badges(user):
-    vote_count = Vote.query.filter_by(user_id=user.id).count()
-    if vote_count >= 10 and not Badge.query.filter_by(user_id=user.id, badge_type='Active Voter').first():
+    activity = get_user_activity(user.id)
+    if activity.vote_count >= 10 and not Badge.query.filter_by(user_id=user.id, badge_type='Active Voter').first():
         db.session.add(Badge(user_id=user.id, badge_type='Active Voter'))
-    poll_count = Poll.query.filter_by(created_by=user.id).count()
-    if poll_count >= 5 and not Badge.query.filter_by(user_id=user.id, badge_type='Poll Creator').first():
+    if activity.poll_count >= 5 and not Badge.query.filter_by(user_id=user.id, badge_type='Poll Creator').first():
         db.session.add(Badge(user_id=user.id, badge_type='Poll Creator'))
-    comment_count = Comment.query.filter_by(user_id=user.id).count()
-    if comment_count >= 20 and not Badge.query.filter_by(user_id=user.id, badge_type='Top Commenter').first():
+    if activity.comment_count >= 20 and \
+            not Badge.query.filter_by(user_id=user.id, badge_type='Top Commenter').first():
         db.session.add(Badge(user_id=user.id, badge_type='Top Commenter'))
     db.session.commit()
 
 
+def record_comment_sentiment(poll_id, score, direction=1):
+    """Fold one comment's score into the poll aggregate (direction=-1 removes it)"""
+    label = classify_score(score, app.config['SENTIMENT_POSITIVE_THRESHOLD'],
+                           app.config['SENTIMENT_NEGATIVE_THRESHOLD'])
+    table = PollSentiment.__table__
+    increments = {'comment_count': direction, 'score_sum': direction * (score or 0.0), label + '_count': direction}
+    connection = db.session.connection()
+    if direction > 0:
+        # Incremented in SQL, so two first comments on a poll add to one row instead of both inserting it
+        upsert_increment(connection, table, {'poll_id': poll_id}, increments)
+        return
+    # Removing from a missing aggregate is a no-op; counts never go below zero
+    connection.execute(db.update(table).where(table.c.poll_id == poll_id).values({
+        column: table.c[column] + amount if column == 'score_sum'
+        else db.case((table.c[column] + amount < 0, 0), else_=table.c[column] + amount)
+        for column, amount in increments.items()
+    }))
+
+
+def rescore_all_comments(chunk_size=None):
+    """Re-score every stored comment in id-ordered chunks and rebuild per-poll aggregates"""
+    chunk_size = chunk_size or app.config['SENTIMENT_RESCORE_CHUNK_SIZE']
+    pos_t = app.config['SENTIMENT_POSITIVE_THRESHOLD']
+    neg_t = app.config['SENTIMENT_NEGATIVE_THRESHOLD']
+    totals = {}
+    last_id = 0
+    rescored = 0
+
+    while True:
+        rows = db.session.query(Comment.id, Comment.poll_id, Comment.comment_text) \
+            .filter(Comment.id > last_id).order_by(Comment.id).limit(chunk_size).all()
+        if not rows:
+            break
+
+        ids = [r[0] for r in rows]
+        poll_ids = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+        scores = sentiment_lexicon.score_many([r[2] for r in rows])
+        labels = classify_scores(scores, pos_t, neg_t)
+
+        db.session.execute(db.update(Comment), [
+            {'id': cid, 'sentiment_score': float(score)} for cid, score in zip(ids, scores)
+        ])
+        db.session.commit()
+
+        merge_aggregates(totals, aggregate_by_poll(poll_ids, scores, labels))
+        rescored += len(rows)
+        last_id = ids[-1]
+
+    now = datetime.utcnow()
+    PollSentiment.query.delete()
+    if totals:
+        db.session.execute(db.insert(PollSentiment), [
+            {'poll_id': pid, 'comment_count': v[0], 'score_sum': v[1], 'positive_count': v[2],
+             'neutral_count': v[3], 'negative_count': v[4], 'updated_at': now}
+            for pid, v in totals.items()
+        ])
+    db.session.commit()
+    return rescored, len(totals)
+
+
+@app.cli.command('rescore-sentiment')
+def rescore_sentiment_command():
+    """Re-score all comments with the current lexicon and rebuild poll aggregates"""
+    rescored, polls = rescore_all_comments()
+    print(f"✓ Re-scored {rescored} comments across {polls} polls")
+
+
+def run_after_commit(session, callback):
+    """Call callback once the session's transaction commits; rolling back (or a savepoint rollback) drops it"""
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault('after_commit', []).append((transaction, callback))
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_commit_callbacks(session):
+    for _, callback in session.info.pop('after_commit', []):
+        callback()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _drop_commit_callbacks(session, previous_transaction):
+    def rolled_back(transaction):
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+
+    callbacks = session.info.get('after_commit')
+    if callbacks:
+        session.info['after_commit'] = [entry for entry in callbacks if not rolled_back(entry[0])]
+
+
+def upsert_increment(connection, table, key, increments):
+    """Add increments to the row identified by key (a unique constraint), creating it if missing"""
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table).values(**key, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: table.c[column] + stmt.excluded[column] for column in increments}
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        db.update(table).where(*[table.c[k] == v for k, v in key.items()])
+        .values({column: table.c[column] + amount for column, amount in increments.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(db.insert(table).values(**key, **increments))
+
+
+def stream_columns(query, dtypes, chunk_size=10000):
+    """
+    One NumPy array per selected column, filled a yield_per partition at a
+    time so at most chunk_size rows exist as Python tuples at once.
+    """
+    chunks = [[] for _ in dtypes]
+    result = db.session.execute(query.statement.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        for column, values, dtype in zip(chunks, zip(*partition), dtypes):
+            column.append(np.array(values, dtype=dtype))
+    return [np.concatenate(column) if column else np.empty(0, dtype=dtype) for column, dtype in zip(chunks, dtypes)]
+
+
+def count_option_votes(poll_id):
+    """Per-option vote counts for one poll in a single GROUP BY"""
+    archived = db.session.get(ArchivedPoll, poll_id)
+    if archived is not None:
+        return archived_option_counts(archived)
+    rows = db.session.query(Vote.option_id, db.func.count(Vote.id)) \
+        .filter(Vote.poll_id == poll_id).group_by(Vote.option_id).all()
+    return {option_id: count for option_id, count in rows}
+
+
+def count_reactions(poll_id):
+    rows = db.session.query(Reaction.reaction_type, db.func.count(Reaction.id)) \
+        .filter(Reaction.poll_id == poll_id).group_by(Reaction.reaction_type).all()
+    counts = {rt: 0 for rt in REACTION_TYPES}
+    counts.update(rows)
+    return counts
+
+
+def poll_vote_totals(poll_ids):
+    """{poll_id: votes} summed from the tallies, which archived polls keep; poll_ids may be a subquery"""
+    # Every ballot has exactly one first-preference option counter
+    rows = db.session.query(PollTally.poll_id, db.func.sum(PollTally.count)) \
+        .filter(PollTally.poll_id.in_(poll_ids), PollTally.counter.like('option:%')).group_by(PollTally.poll_id)
+    return {poll_id: int(count or 0) for poll_id, count in rows}
+
+
+def read_poll_tallies(poll_id):
+    """Live ({option_id: votes}, {reaction_type: count}) summed over each counter's shards"""
+    rows = db.session.query(PollTally.counter, db.func.sum(PollTally.count)) \
+        .filter(PollTally.poll_id == poll_id).group_by(PollTally.counter).all()
+    option_counts, reaction_counts = split_counts(dict(rows))
+    reactions = {rt: 0 for rt in REACTION_TYPES}
+    reactions.update(reaction_counts)
+    return option_counts, reactions
+
+
+def build_option_votes(options, counts):
+    """Shape raw counts into the {option_id: {'count', 'percentage'}} mapping templates use"""
+    total_votes = sum(counts.get(option.id, 0) for option in options)
+    option_votes = {}
+    for option in options:
+        c = counts.get(option.id, 0)
+        option_votes[option.id] = {
+            'count': c,
+            'percentage': (c / total_votes * 100) if total_votes > 0 else 0
+        }
+    return option_votes, total_votes
+
+
+def results_payload(poll_id, status, options, option_votes, total_votes, reactions):
+    """JSON body of the results API, shared with the async app in asgi.py"""
+    return {
+        'success': True,
+        'poll_id': poll_id,
+        'status': status,
+        'total_votes': total_votes,
+        'options': [{'id': option.id, 'text': option.option_text,
+                     'votes': option_votes[option.id]['count'],
+                     'percentage': round(option_votes[option.id]['percentage'], 1)} for option in options],
+        'reactions': reactions,
+    }
+
+
+# -------------------- BALLOT TABULATION --------------------
+# (poll_id, method, version) -> tabulation; a poll's version is its ballot count
+tabulation_cache = TTLCache(maxsize=256, ttl=app.config['TABULATION_CACHE_TTL_SECONDS'])
+
+
+def parse_ballot(poll, form):
+    """Ordered option ids chosen on the vote form; raises ValueError with a message for the voter"""
+    option_ids = [option.id for option in poll.options]
+    method = poll.voting_method
+
+    if method == SINGLE:
+        choices = [form.get('option_id', type=int)] if form.get('option_id', type=int) else []
+    elif method in RANKED_METHODS:
+        ranked = []
+        for option_id in option_ids:
+            rank = form.get(f'rank_{option_id}', type=int)
+            if rank:
+                ranked.append((rank, option_id))
+        if len({rank for rank, _ in ranked}) != len(ranked):
+            raise ValueError('Each rank can only be given to one option')
+        choices = [option_id for _, option_id in sorted(ranked)]
+    else:
+        choices = form.getlist('option_ids', type=int)
+        if poll.max_choices and len(choices) > poll.max_choices:
+            raise ValueError(f'You can approve at most {poll.max_choices} options')
+
+    if not choices:
+        raise ValueError('Please select an option')
+    if len(set(choices)) != len(choices) or not set(choices) <= set(option_ids):
+        raise ValueError('Invalid option selected')
+    return choices
+
+
+def attach_ballot(vote, poll, choices):
+    if poll.voting_method != SINGLE:
+        vote.rankings = [BallotRanking(poll_id=poll.id, option_id=option_id, rank=rank)
+                         for rank, option_id in enumerate(choices)]
+
+
+def load_ballot_matrix(poll, option_ids):
+    """Every ballot of the poll as a NumPy preference matrix over option_ids' columns"""
+    if poll.archive is not None:
+        with open_vote_archive(poll.archive) as reader:
+            rows = reader.read('ballot_rankings', ['vote_id', 'rank', 'option_id'], poll_id=poll.id)
+        vote_ids, ranks, chosen = rows['vote_id'], rows['rank'], rows['option_id']
+    else:
+        query = db.session.query(BallotRanking.vote_id, BallotRanking.rank, BallotRanking.option_id) \
+            .filter(BallotRanking.poll_id == poll.id)
+        vote_ids, ranks, chosen = stream_columns(query, (np.int64, np.int32, np.int64))
+    if not len(vote_ids):
+        return ballot_matrix([], [], [], max_rank=max(len(option_ids), 1))[0]
+    columns = np.searchsorted(np.asarray(option_ids), chosen)
+    return ballot_matrix(vote_ids, ranks, columns, max_rank=len(option_ids))[0]
+
+
+def tabulate_poll(poll, version):
+    """Round-by-round results for a ranked or approval poll, cached until its ballot count changes"""
+    key = (poll.id, poll.voting_method, version)
+
+    def load():
+        option_ids = sorted(option.id for option in poll.options)
+        return tabulate(poll.voting_method, load_ballot_matrix(poll, option_ids), option_ids)
+
+    return tabulation_cache.get_or_load(key, load)
+
+
+def render_tabulation_lines(poll, tabulation):
+    names = {option.id: option.option_text for option in poll.options}
+    lines = [f"{VOTING_METHODS[tabulation['method']]} - {tabulation['ballots']} ballots"]
+    for r in tabulation['rounds']:
+        counts = ', '.join(f"{names[option_id]} {count}" for option_id, count in
+                           sorted(r['counts'].items(), key=lambda item: -item[1]))
+        line = f"Round {r['round']}: {counts}"
+        if r['exhausted']:
+            line += f"; {r['exhausted']} exhausted"
+        if r['eliminated'] is not None:
+            line += f"; eliminated {names[r['eliminated']]}"
+        lines.append(line)
+    if tabulation['winner'] is not None:
+        lines.append(f"Winner: {names[tabulation['winner']]}")
+    return lines
+
+
+# -------------------- RESULT SNAPSHOTS --------------------
+def render_results_summary(poll, option_votes, total_votes, tabulation=None):
+    lines = [f"Total Votes: {total_votes}"]
+    for option in poll.options:
+        v = option_votes[option.id]
+        lines.append(f"{option.option_text}: {v['count']} votes ({v['percentage']:.1f}%)")
+    if tabulation:
+        lines.extend(render_tabulation_lines(poll, tabulation))
+    return "\n".join(lines)
+
+
+def _snapshot_values(poll):
+    option_votes, total_votes = build_option_votes(poll.options, count_option_votes(poll.id))
+    reactions = count_reactions(poll.id)
+    tabulation = tabulate_poll(poll, total_votes) if poll.voting_method != SINGLE else None
+    return {
+        'total_votes': total_votes,
+        'option_counts': {str(option_id): v['count'] for option_id, v in option_votes.items()},
+        'reactions': reactions,
+        'total_reactions': sum(reactions.values()),
+        'summary': render_results_summary(poll, option_votes, total_votes, tabulation),
+    }
+
+
+def freeze_poll_results(poll):
+    """Write the poll's snapshot if it does not have one yet; never overwrites"""
+    snapshot = db.session.get(PollResultSnapshot, poll.id)
+    if snapshot is None:
+        db.session.add(PollResultSnapshot(poll_id=poll.id, **_snapshot_values(poll)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request froze it first; the first snapshot stands
+            db.session.rollback()
+        snapshot = db.session.get(PollResultSnapshot, poll.id)
+    return snapshot
+
+
+def rebuild_result_snapshot(poll):
+    """Recount a snapshot from raw votes for auditing; returns the fields that differed"""
+    values = _snapshot_values(poll)
+    snapshot = db.session.get(PollResultSnapshot, poll.id)
+    if snapshot is None:
+        db.session.add(PollResultSnapshot(poll_id=poll.id, **values))
+        db.session.commit()
+        return {'missing': True}
+
+    differences = {}
+    for field, value in values.items():
+        if getattr(snapshot, field) != value:
+            differences[field] = {'stored': getattr(snapshot, field), 'recounted': value}
+            setattr(snapshot, field, value)
+    snapshot.rebuilt_at = datetime.utcnow()
+    db.session.commit()
+    return differences
+
+
+def get_poll_results(poll, closed):
+    """(option_votes, total_votes, reactions) from the snapshot for closed polls, live otherwise"""
+    if closed:
+        snapshot = poll.result_snapshot or freeze_poll_results(poll)
+        option_votes, total_votes = build_option_votes(poll.options, snapshot.counts_by_option())
+        reactions = {rt: 0 for rt in REACTION_TYPES}
+        reactions.update(snapshot.reactions)
+        return option_votes, total_votes, reactions
+
+    option_counts, reactions = read_poll_tallies(poll.id)
+    option_votes, total_votes = build_option_votes(poll.options, option_counts)
+    return option_votes, total_votes, reactions
+
+
+@app.cli.command('rebuild-snapshots')
+def rebuild_snapshots_command():
+    """Recount every closed poll's snapshot from raw votes and report mismatches"""
+    mismatched = 0
+    for poll in Poll.query.filter_by(status=POLL_CLOSED).yield_per(100):
+        differences = rebuild_result_snapshot(poll)
+        if differences:
+            mismatched += 1
+            print(f"Poll {poll.id}: {differences}")
+    print(f"✓ Snapshots rebuilt; {mismatched} differed from raw votes")
+
+
+# -------------------- POLL LIFECYCLE --------------------
+poll_close_hooks = []
+
+
+def on_poll_closed(func):
+    """Register func(poll_ids) to run once for polls that just transitioned to closed"""
+    poll_close_hooks.append(func)
+    return func
+
+
+def compute_poll_status(scheduled_for, expires_at, now=None):
+    now = now or datetime.utcnow()
+    if expires_at and expires_at <= now:
+        return POLL_CLOSED
+    if scheduled_for and scheduled_for > now:
+        return POLL_SCHEDULED
+    return POLL_OPEN
+
+
+def close_polls(poll_ids):
+    """Claim each poll's open->closed transition and run close hooks for the ones we won"""
+    closed = []
+    categories = dict(db.session.query(Poll.id, Poll.category).filter(Poll.id.in_(poll_ids)))
+    for poll_id in poll_ids:
+        # One claim per previous status, so the category counts know which one the poll left
+        for previous in (POLL_OPEN, POLL_SCHEDULED):
+            result = db.session.execute(
+                db.update(Poll).where(Poll.id == poll_id, Poll.status == previous).values(status=POLL_CLOSED)
+            )
+            if result.rowcount:
+                move_category_counts(categories[poll_id], previous, POLL_CLOSED)
+                closed.append(poll_id)
+                break
+    db.session.commit()
+
+    if closed:
+        for hook in poll_close_hooks:
+            try:
+                hook(closed)
+            except Exception:
+                app.logger.exception("Poll close hook %s failed", hook.__name__)
+    return closed
+
+
+def advance_poll_lifecycle(now=None):
+    """Move every due poll to its next status and return when the next transition is due"""
+    now = now or datetime.utcnow()
+
+    due_ids = [row[0] for row in db.session.query(Poll.id).filter(
+        Poll.status.in_([POLL_SCHEDULED, POLL_OPEN]), Poll.expires_at != None, Poll.expires_at <= now)]
+    close_polls(due_ids)
+
+    opened = []
+    due = db.session.query(Poll.id, Poll.category, Poll.title) \
+        .filter(Poll.status == POLL_SCHEDULED, Poll.scheduled_for <= now).all()
+    for poll_id, category, title in due:
+        result = db.session.execute(
+            db.update(Poll).where(Poll.id == poll_id, Poll.status == POLL_SCHEDULED).values(status=POLL_OPEN)
+        )
+        if result.rowcount:
+            move_category_counts(category, POLL_SCHEDULED, POLL_OPEN)
+            opened.append((poll_id, title))
+    db.session.commit()
+    announce_listed_polls(opened)
+
+    next_open = db.session.query(db.func.min(Poll.scheduled_for)).filter(Poll.status == POLL_SCHEDULED).scalar()
+    next_close = db.session.query(db.func.min(Poll.expires_at)) \
+        .filter(Poll.status.in_([POLL_SCHEDULED, POLL_OPEN])).scalar()
+    pending = [t for t in (next_open, next_close) if t is not None]
+    return min(pending) if pending else None
+
+
+@on_poll_closed
+def freeze_closed_poll_results(poll_ids):
+    for poll in Poll.query.filter(Poll.id.in_(poll_ids)):
+        freeze_poll_results(poll)
+
+
+def sync_poll_status(poll):
+    """Catch a single loaded poll up with the clock if the scheduler has not got to it yet"""
+    if poll.status == POLL_DELETING:
+        abort(404)
+    status = compute_poll_status(poll.scheduled_for, poll.expires_at)
+    if status == poll.status:
+        return status
+    if status == POLL_CLOSED:
+        close_polls([poll.id])
+    else:
+        poll.status = status
+        db.session.commit()
+        if status == POLL_OPEN:
+            announce_listed_polls([(poll.id, poll.title)])
+    db.session.refresh(poll)
+    return poll.status
+
+
+def run_in_app_context(func):
+    """Wrap func for the scheduler thread, which has no app context of its own"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            finally:
+                db.session.remove()
+
+    return wrapper
+
+
+lifecycle_scheduler = LifecycleScheduler(run_in_app_context(advance_poll_lifecycle),
+                                         max_sleep=app.config['SCHEDULER_MAX_SLEEP_SECONDS'])
+
+
+def start_lifecycle_scheduler():
+    if app.config['SCHEDULER_ENABLED']:
+        lifecycle_scheduler.start()
+
+
+def start_background_services():
+    """Per-process startup: warm in-memory structures, join the event bus and start the scheduler thread"""
+    with app.app_context():
+        rebuild_voter_filters()
+        # Picks up deletes a previous run of this or another worker left unfinished
+        resume_poll_delete_jobs()
+    event_bus.start()
+    start_lifecycle_scheduler()
+    # Buffered page views and counters would otherwise be lost when the worker exits
+    atexit.register(run_in_app_context(flush_poll_views))
+    atexit.register(run_in_app_context(flush_counters))
+
+
+@app.cli.command('advance-polls')
+def advance_polls_command():
+    """Run one lifecycle pass (for cron-driven deployments without the background thread)"""
+    next_due = advance_poll_lifecycle()
+    print(f"✓ Poll statuses advanced; next transition due at {next_due or 'never'}")
+
+
+# -------------------- SHARDED TALLIES --------------------
+tally_write_rates = WriteRateTracker(window=app.config['TALLY_RATE_WINDOW_SECONDS'])
+tally_shard_counts = TTLCache(maxsize=10000, ttl=app.config['TALLY_SHARD_CACHE_TTL_SECONDS'])
+
+
+def _poll_shard_count(connection, poll_id):
+    shards = tally_shard_counts.get(poll_id)
+    if shards is None:
+        shards = connection.execute(db.select(Poll.tally_shards).where(Poll.id == poll_id)).scalar() or 1
+        tally_shard_counts.set(poll_id, shards)
+    return shards
+
+
+def increment_tally(connection, poll_id, counter, amount, num_shards=1):
+    upsert_increment(connection, PollTally.__table__,
+                     {'poll_id': poll_id, 'counter': counter, 'shard': pick_shard(num_shards)},
+                     {'count': amount})
+
+
+def record_tally_writes(connection, row, increments):
+    """Apply {counter: amount} to the tallies of row's poll, promoting it to sharded mode when it runs hot"""
+    poll_id = row.poll_id
+    shards = _poll_shard_count(connection, poll_id)
+    rate = tally_write_rates.record(poll_id)
+    target = app.config['TALLY_SHARDS']
+    if shards < target and rate >= app.config['TALLY_SHARD_WRITE_RATE']:
+        connection.execute(db.update(Poll.__table__).where(Poll.id == poll_id).values(tally_shards=target))
+        tally_shard_counts.set(poll_id, target)
+        # Other workers start spreading their writes now instead of when their cache expires,
+        # but only once the promotion is committed and they can see it
+        run_after_commit(object_session(row), lambda: publish_event('poll.sharded', poll_id=poll_id, shards=target))
+        app.logger.info("Poll %s promoted to %s tally shards at %.1f writes/s", poll_id, target, rate)
+        shards = target
+    for counter, amount in increments.items():
+        increment_tally(connection, poll_id, counter, amount, shards)
+
+
+@event.listens_for(Vote, 'after_insert')
+def tally_inserted_vote(mapper, connection, target):
+    record_tally_writes(connection, target, {option_counter(target.option_id): 1})
+
+
+@event.listens_for(Vote, 'after_delete')
+def tally_deleted_vote(mapper, connection, target):
+    record_tally_writes(connection, target, {option_counter(target.option_id): -1})
+
+
+@event.listens_for(Reaction, 'after_insert')
+def tally_inserted_reaction(mapper, connection, target):
+    record_tally_writes(connection, target, {reaction_counter(target.reaction_type): 1})
+
+
+@event.listens_for(Reaction, 'after_delete')
+def tally_deleted_reaction(mapper, connection, target):
+    record_tally_writes(connection, target, {reaction_counter(target.reaction_type): -1})
+
+
+@event.listens_for(Reaction, 'after_update')
+def tally_changed_reaction(mapper, connection, target):
+    history = db.inspect(target).attrs.reaction_type.history
+    if history.deleted and history.added:
+        record_tally_writes(connection, target, {
+            reaction_counter(history.deleted[0]): -1,
+            reaction_counter(history.added[0]): 1,
+        })
+
+
+def compact_poll_tallies(poll_id):
+    """Fold every counter of a poll back into shard 0"""
+    table = PollTally.__table__
+    rows = db.session.query(PollTally.counter, db.func.sum(PollTally.count)) \
+        .filter(PollTally.poll_id == poll_id).group_by(PollTally.counter).all()
+    db.session.execute(db.delete(table).where(table.c.poll_id == poll_id))
+    if rows:
+        db.session.execute(db.insert(table), [
+            {'poll_id': poll_id, 'counter': counter, 'shard': 0, 'count': total} for counter, total in rows
+        ])
+    db.session.execute(db.update(Poll).where(Poll.id == poll_id).values(tally_shards=1))
+    tally_shard_counts.pop(poll_id)
+    tally_write_rates.forget(poll_id)
+
+
+@on_poll_closed
+def compact_closed_poll_tallies(poll_ids):
+    # Closed polls take no more writes, so their counters no longer need spreading
+    sharded = db.session.query(Poll.id).filter(Poll.id.in_(poll_ids), Poll.tally_shards > 1).all()
+    for (poll_id,) in sharded:
+        compact_poll_tallies(poll_id)
+    db.session.commit()
+
+
+def rebuild_poll_tallies(poll_ids=None):
+    """Recount tallies from raw votes and reactions (all polls when poll_ids is None)"""
+    table = PollTally.__table__
+    # Archived polls are counted from their files, even while an interrupted archive run left rows behind
+    votes = db.session.query(Vote.poll_id, Vote.option_id, db.func.count(Vote.id)) \
+        .outerjoin(ArchivedPoll, ArchivedPoll.poll_id == Vote.poll_id).filter(ArchivedPoll.poll_id.is_(None)) \
+        .group_by(Vote.poll_id, Vote.option_id)
+    reactions = db.session.query(Reaction.poll_id, Reaction.reaction_type, db.func.count(Reaction.id)) \
+        .group_by(Reaction.poll_id, Reaction.reaction_type)
+    delete = db.delete(table)
+    if poll_ids is not None:
+        votes = votes.filter(Vote.poll_id.in_(poll_ids))
+        reactions = reactions.filter(Reaction.poll_id.in_(poll_ids))
+        delete = delete.where(table.c.poll_id.in_(poll_ids))
+
+    rows = [{'poll_id': pid, 'counter': option_counter(oid), 'shard': 0, 'count': n} for pid, oid, n in votes]
+    archived = ArchivedPoll.query
+    if poll_ids is not None:
+        archived = archived.filter(ArchivedPoll.poll_id.in_(poll_ids))
+    for entry in archived:
+        rows += [{'poll_id': entry.poll_id, 'counter': option_counter(oid), 'shard': 0, 'count': n}
+                 for oid, n in archived_option_counts(entry).items()]
+    rows += [{'poll_id': pid, 'counter': reaction_counter(rt), 'shard': 0, 'count': n} for pid, rt, n in reactions]
+    db.session.execute(delete)
+    if rows:
+        db.session.execute(db.insert(table), rows)
+    db.session.commit()
+    tally_shard_counts.clear()
+    return len(rows)
+
+
+@app.cli.command('rebuild-tallies')
+def rebuild_tallies_command():
+    """Recount sharded vote / reaction tallies from the raw rows"""
+    print(f"✓ Rebuilt {rebuild_poll_tallies()} tally counters")
+
+
+# -------------------- COUNTER BUFFER --------------------
+counter_buffer = CounterBuffer()
+
+# Rollup buckets are created by their first write; stat and activity rows only by recounts and signup
+UPSERTED_COUNTER_TABLES = {'vote_rollups'}
+
+
+def buffering_counters():
+    # Without the scheduler thread nothing would flush, so CLI commands and cron deployments write through
+    return app.config['COUNTER_BUFFER_ENABLED'] and lifecycle_scheduler.running
+
+
+def write_counter(connection, table, key, increments):
+    if table.name in UPSERTED_COUNTER_TABLES:
+        upsert_increment(connection, table, key, increments)
+        return
+    connection.execute(
+        db.update(table).where(*[table.c[k] == v for k, v in key.items()])
+        .values({column: table.c[column] + amount for column, amount in increments.items()})
+    )
+
+
+def add_to_counter(connection, target, table, key, increments):
+    """Counter change made by a mapper event on target: written now, or buffered until the next flush"""
+    session = object_session(target)
+    if session is None or not buffering_counters():
+        write_counter(connection, table, key, increments)
+    else:
+        run_after_commit(session, lambda: counter_buffer.add(table.name, key, increments))
+
+
+def pending_counter(table, key):
+    """{column: amount} committed by this worker but not flushed yet"""
+    return counter_buffer.pending(table.name, key)
+
+
+def flush_counters():
+    """Write this worker's buffered counter increments in one transaction"""
+    drained = counter_buffer.drain()
+    if not drained:
+        return 0
+    try:
+        # Buckets of polls deleted meanwhile would be recreated (or break the FK), so they are dropped
+        poll_ids = {dict(key)['poll_id'] for table_name, key in drained if table_name == 'vote_rollups'}
+        live = {row[0] for row in db.session.query(Poll.id).filter(
+            Poll.id.in_(poll_ids), Poll.status != POLL_DELETING)} if poll_ids else set()
+        connection = db.session.connection()
+        # Rows in a fixed order, so two workers flushing at once cannot deadlock each other
+        for (table_name, key), increments in sorted(drained.items(), key=lambda item: item[0]):
+            key = dict(key)
+            if table_name == 'vote_rollups' and key['poll_id'] not in live:
+                continue
+            write_counter(connection, db.metadata.tables[table_name], key, increments)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        counter_buffer.restore(drained)
+        raise
+    return len(drained)
+
+
+lifecycle_scheduler.add_periodic(run_in_app_context(flush_counters),
+                                 app.config['COUNTER_FLUSH_INTERVAL_SECONDS'], name='flush_counters')
+
+
+@app.cli.command('flush-counters')
+def flush_counters_command():
+    """Write this process's buffered stat, rollup and activity counters (mainly useful in development)"""
+    print(f"✓ Flushed {flush_counters()} counter rows")
+
+
+# -------------------- VOTE ROLLUPS --------------------
+@event.listens_for(Vote, 'after_insert')
+def rollup_inserted_vote(mapper, connection, target):
+    ts = target.timestamp or datetime.utcnow()
+    add_to_counter(connection, target, VoteRollup.__table__, {
+        'poll_id': target.poll_id,
+        'option_id': target.option_id,
+        'granularity': 'minute',
+        'bucket_start': bucket_start(ts, 'minute'),
+    }, {'count': 1})
+
+
+def rollup_retention():
+    return {
+        'minute': timedelta(hours=app.config['ROLLUP_MINUTE_RETENTION_HOURS']),
+        'hour': timedelta(days=app.config['ROLLUP_HOUR_RETENTION_DAYS']),
+    }
+
+
+def compact_vote_rollups(now=None, chunk_size=5000):
+    """Fold minute buckets past retention into hours, and hours into days"""
+    now = now or datetime.utcnow()
+    table = VoteRollup.__table__
+    compacted = 0
+
+    for granularity, retention in rollup_retention().items():
+        target = coarser(granularity)
+        # Only compact whole target buckets so each one is folded in a single pass
+        cutoff = bucket_start(now - retention, target)
+        while True:
+            rows = db.session.query(VoteRollup.id, VoteRollup.poll_id, VoteRollup.option_id,
+                                    VoteRollup.bucket_start, VoteRollup.count) \
+                .filter(VoteRollup.granularity == granularity, VoteRollup.bucket_start < cutoff) \
+                .order_by(VoteRollup.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            connection = db.session.connection()
+            for (poll_id, option_id, bucket), count in aggregate_rows([r[1:] for r in rows], target).items():
+                upsert_increment(connection, table, {
+                    'poll_id': poll_id, 'option_id': option_id, 'granularity': target, 'bucket_start': bucket,
+                }, {'count': count})
+            db.session.execute(db.delete(VoteRollup).where(VoteRollup.id.in_([r[0] for r in rows])))
+            db.session.commit()
+            compacted += len(rows)
+
+    return compacted
+
+
+def vote_timeline(poll, granularity):
+    """Velocity and cumulative series per option, read from rollups only"""
+    rows = db.session.query(VoteRollup.option_id, VoteRollup.granularity,
+                            VoteRollup.bucket_start, VoteRollup.count) \
+        .filter(VoteRollup.poll_id == poll.id).all()
+    option_ids = [option.id for option in poll.options]
+    buckets, velocity, cumulative = build_series(rows, option_ids, granularity)
+    return {
+        'poll_id': poll.id,
+        'granularity': granularity,
+        'buckets': [b.isoformat() for b in buckets],
+        'options': [
+            {
+                'id': option.id,
+                'text': option.option_text,
+                'velocity': velocity[i].tolist(),
+                'cumulative': cumulative[i].tolist(),
+            }
+            for i, option in enumerate(poll.options)
+        ],
+        'total_velocity': velocity.sum(axis=0).tolist(),
+        'total_cumulative': cumulative.sum(axis=0).tolist(),
+    }
+
+
+lifecycle_scheduler.add_periodic(run_in_app_context(compact_vote_rollups),
+                                 app.config['ROLLUP_COMPACT_INTERVAL_SECONDS'], name='compact_vote_rollups')
+
+
+@app.cli.command('compact-rollups')
+def compact_rollups_command():
+    """Compact old minute/hour vote rollups into coarser buckets"""
+    print(f"✓ Compacted {compact_vote_rollups()} rollup rows")
+
+
+@app.cli.command('backfill-rollups')
+def backfill_rollups_command():
+    """Rebuild all vote rollups from raw and archived votes (one-off, for data that predates rollups)"""
+    flush_counters()
+    now = datetime.utcnow()
+    retention = rollup_retention()
+    totals = {}
+
+    def count(poll_id, option_id, ts):
+        ts = ts or now
+        age = now - ts
+        granularity = 'minute' if age < retention['minute'] else 'hour' if age < retention['hour'] else 'day'
+        key = (poll_id, option_id, granularity, bucket_start(ts, granularity))
+        totals[key] = totals.get(key, 0) + 1
+
+    # Rows an interrupted archive run left behind are counted from the file below
+    query = db.session.query(Vote.poll_id, Vote.option_id, Vote.timestamp) \
+        .filter(Vote.poll_id.not_in(db.session.query(ArchivedPoll.poll_id)))
+    for poll_id, option_id, ts in query.yield_per(10000):
+        count(poll_id, option_id, ts)
+    for archived in ArchivedPoll.query.all():
+        with open_vote_archive(archived) as reader:
+            columns = reader.read('votes', ['option_id', 'timestamp'], poll_id=archived.poll_id)
+        for option_id, micros in zip(columns['option_id'].tolist(), columns['timestamp'].tolist()):
+            ts = datetime(1970, 1, 1) + timedelta(microseconds=micros) if micros else None
+            count(archived.poll_id, option_id, ts)
+
+    VoteRollup.query.delete()
+    if totals:
+        db.session.execute(db.insert(VoteRollup), [
+            {'poll_id': p, 'option_id': o, 'granularity': g, 'bucket_start': b, 'count': c}
+            for (p, o, g, b), c in totals.items()
+        ])
+    db.session.commit()
+    print(f"✓ Rebuilt {len(totals)} rollup buckets from raw and archived votes")
+
+
+# -------------------- GLOBAL STATS --------------------
+GLOBAL_STAT_MODELS = {'users': User, 'polls': Poll, 'votes': Vote, 'comments': Comment}
+
+global_stats_cache = TTLCache(maxsize=1, ttl=app.config['STATS_CACHE_TTL_SECONDS'])
+
+
+def adjust_global_stat(key, amount, connection=None):
+    # Rows are created by recount_global_stats(); until then there is nothing to keep current
+    write_counter(connection or db.session, GlobalStat.__table__, {'key': key}, {'value': amount})
+
+
+def _global_stat_listener(key, amount):
+    def listener(mapper, connection, target):
+        # Every vote on every poll lands on the same 'votes' row, so it goes through the buffer
+        add_to_counter(connection, target, GlobalStat.__table__, {'key': key}, {'value': amount})
+
+    return listener
+
+
+for _key, _model in GLOBAL_STAT_MODELS.items():
+    event.listen(_model, 'after_insert', _global_stat_listener(_key, 1))
+    event.listen(_model, 'after_delete', _global_stat_listener(_key, -1))
+
+
+def recount_global_stats():
+    """Rewrite every global stat from a real COUNT(*) and drop the cached copy"""
+    # Increments already counted below must not be added again by the next flush
+    flush_counters()
+    now = datetime.utcnow()
+    counts = {key: model.query.count() for key, model in GLOBAL_STAT_MODELS.items()}
+    # Archived votes were cast all the same; rows not yet deleted after archiving are counted from the file
+    counts['votes'] = Vote.query.outerjoin(ArchivedPoll, ArchivedPoll.poll_id == Vote.poll_id) \
+        .filter(ArchivedPoll.poll_id.is_(None)).count() \
+        + db.session.query(db.func.coalesce(db.func.sum(ArchivedPoll.vote_count), 0)).scalar()
+    for key, value in counts.items():
+        stat = db.session.get(GlobalStat, key)
+        if stat is None:
+            db.session.add(GlobalStat(key=key, value=value, updated_at=now))
+        else:
+            stat.value = value
+            stat.updated_at = now
+    db.session.commit()
+    global_stats_cache.clear()
+    return counts
+
+
+def _load_global_stats():
+    stats = dict(db.session.query(GlobalStat.key, GlobalStat.value).all())
+    if any(key not in stats for key in GLOBAL_STAT_MODELS):
+        return recount_global_stats()
+    for key in stats:
+        stats[key] += pending_counter(GlobalStat.__table__, {'key': key}).get('value', 0)
+    return stats
+
+
+def get_global_stats():
+    return global_stats_cache.get_or_load('global', _load_global_stats)
+
+
+@app.cli.command('recount-stats')
+def recount_stats_command():
+    """Recount global statistics from the base tables"""
+    print(f"✓ Global stats recounted: {recount_global_stats()}")
+    print(f"✓ Category counts recounted: {recount_category_stats()}")
+
+
+# -------------------- CATEGORY FACETS & TITLE SUGGESTIONS --------------------
+# Polls that appear on the home page; scheduled and deleting polls are not listed
+LISTED_STATUSES = (POLL_OPEN, POLL_CLOSED)
+
+
+def _category_counters(status):
+    return {'open_count': int(status == POLL_OPEN), 'total_count': int(status in LISTED_STATUSES)}
+
+
+def move_category_counts(category, old_status, new_status, amount=1, connection=None):
+    """Account for `amount` polls of a category going from old_status to new_status (None: no poll)"""
+    old, new = _category_counters(old_status), _category_counters(new_status)
+    increments = {counter: (new[counter] - old[counter]) * amount for counter in new}
+    if any(increments.values()):
+        upsert_increment(connection or db.session.connection(), CategoryStat.__table__,
+                         {'category': category}, increments)
+
+
+@event.listens_for(Poll, 'after_insert')
+def count_inserted_poll(mapper, connection, target):
+    move_category_counts(target.category, None, target.status, connection=connection)
+
+
+@event.listens_for(Poll, 'after_update')
+def count_updated_poll(mapper, connection, target):
+    state = db.inspect(target)
+    status, category = state.attrs.status.history, state.attrs.category.history
+    if not (status.has_changes() or category.has_changes()):
+        return
+    old_status = status.deleted[0] if status.deleted else target.status
+    old_category = category.deleted[0] if category.deleted else target.category
+    move_category_counts(old_category, old_status, None, connection=connection)
+    move_category_counts(target.category, None, target.status, connection=connection)
+
+
+@event.listens_for(Poll, 'after_delete')
+def count_deleted_poll(mapper, connection, target):
+    move_category_counts(target.category, target.status, None, connection=connection)
+
+
+def recount_category_stats():
+    """Rewrite the category counts from a GROUP BY over polls"""
+    counts = {}
+    rows = db.session.query(Poll.category, Poll.status, db.func.count(Poll.id)) \
+        .filter(Poll.status.in_(LISTED_STATUSES)).group_by(Poll.category, Poll.status)
+    for category, status, count in rows:
+        entry = counts.setdefault(category, {'category': category, 'open_count': 0, 'total_count': 0})
+        for counter, included in _category_counters(status).items():
+            entry[counter] += included * count
+    db.session.execute(db.delete(CategoryStat.__table__))
+    if counts:
+        db.session.execute(db.insert(CategoryStat.__table__), list(counts.values()))
+    db.session.commit()
+    return {category: (entry['open_count'], entry['total_count']) for category, entry in counts.items()}
+
+
+def category_facets():
+    """Every category with its open and total poll counts, known categories first"""
+    counts = {row.category: row for row in CategoryStat.query}
+    if not counts and Poll.query.filter(Poll.status.in_(LISTED_STATUSES)).first() is not None:
+        recount_category_stats()
+        counts = {row.category: row for row in CategoryStat.query}
+    names = POLL_CATEGORIES + sorted(name for name, row in counts.items()
+                                     if name not in POLL_CATEGORIES and row.total_count > 0)
+    return [{'name': name,
+             'open': counts[name].open_count if name in counts else 0,
+             'total': counts[name].total_count if name in counts else 0} for name in names]
+
+
+# Built on the first suggestion request; kept current from poll.listed / poll.deleting events
+title_index = TitleIndex()
+title_index_state = {'built': False}
+title_index_lock = threading.Lock()
+
+
+def rebuild_title_index():
+    rows = db.session.query(Poll.id, Poll.title).filter(Poll.status.in_(LISTED_STATUSES)).all()
+    title_index.build(rows)
+    title_index_state['built'] = True
+    return len(rows)
+
+
+def get_title_index():
+    if not title_index_state['built']:
+        with title_index_lock:
+            if not title_index_state['built']:
+                rebuild_title_index()
+    return title_index
+
+
+def refresh_title_index():
+    # Heals events a worker missed; workers that never served a suggestion have nothing to refresh
+    if title_index_state['built']:
+        rebuild_title_index()
+
+
+def announce_listed_polls(polls):
+    """Tell every worker's title index about polls that just became visible: [(poll_id, title)]"""
+    polls = [[poll_id, title] for poll_id, title in polls]
+    # Chunked so one event stays well inside a datagram
+    for start in range(0, len(polls), 200):
+        publish_event('poll.listed', polls=polls[start:start + 200])
+
+
+def _index_listed_polls(event):
+    for poll_id, title in event['polls']:
+        title_index.add(poll_id, title)
+
+
+def _unindex_polls(event):
+    for poll_id in event['poll_ids']:
+        title_index.remove(poll_id)
+
+
+# -------------------- USER ACTIVITY --------------------
+# Model -> (column holding the acting user's id, UserActivity counter)
+USER_ACTIVITY_COLUMNS = {
+    Vote: (Vote.user_id, 'vote_count'),
+    Poll: (Poll.created_by, 'poll_count'),
+    Comment: (Comment.user_id, 'comment_count'),
+    Reaction: (Reaction.user_id, 'reaction_count'),
+}
+
+
+def adjust_user_activity(user_id, counter, amount, connection=None):
+    # Rows are created with the user (or backfilled by get_user_activity); missing rows are left alone
+    write_counter(connection or db.session, UserActivity.__table__, {'user_id': user_id}, {counter: amount})
+
+
+def _user_activity_listener(column, counter, amount):
+    def listener(mapper, connection, target):
+        user_id = getattr(target, column.key)
+        if user_id is not None:
+            add_to_counter(connection, target, UserActivity.__table__, {'user_id': user_id}, {counter: amount})
+
+    return listener
+
+
+for _model, (_column, _counter) in USER_ACTIVITY_COLUMNS.items():
+    event.listen(_model, 'after_insert', _user_activity_listener(_column, _counter, 1))
+    event.listen(_model, 'after_delete', _user_activity_listener(_column, _counter, -1))
+
+
+@event.listens_for(User, 'after_insert')
+def create_user_activity(mapper, connection, target):
+    connection.execute(db.insert(UserActivity.__table__).values(user_id=target.id))
+
+
+def _count_user_activity(user_ids=None):
+    """Real per-user counts from the base tables: {user_id: {counter: count}}"""
+    counts = {}
+    for column, counter in USER_ACTIVITY_COLUMNS.values():
+        query = db.session.query(column, db.func.count()).filter(column.isnot(None)).group_by(column)
+        if user_ids is not None:
+            query = query.filter(column.in_(user_ids))
+        if counter == 'vote_count':
+            # Rows an interrupted archive run left behind are already in the archived counts
+            query = query.filter(Vote.poll_id.not_in(db.session.query(ArchivedPoll.poll_id)))
+        for user_id, count in query:
+            counts.setdefault(user_id, {})[counter] = count
+    for user_id, count in archived_votes_by_user(user_ids).items():
+        entry = counts.setdefault(user_id, {})
+        entry['vote_count'] = entry.get('vote_count', 0) + count
+    return counts
+
+
+def get_user_activity(user_id):
+    """The user's activity row, backfilled from real counts the first time it is needed"""
+    activity = db.session.get(UserActivity, user_id, populate_existing=True)
+    if activity is None:
+        # The count below sees committed rows whose increments may still be buffered here; written
+        # first, they land on the missing row as no-ops instead of being added again after the insert
+        flush_counters()
+        counts = {'vote_count': 0, 'poll_count': 0, 'comment_count': 0, 'reaction_count': 0}
+        counts.update(_count_user_activity([user_id]).get(user_id, {}))
+        # Two first reads may backfill at once; whichever row lands first is kept
+        insert_if_missing(UserActivity.__table__, {'user_id': user_id, **counts}, ['user_id'])
+        db.session.commit()
+        activity = db.session.get(UserActivity, user_id)
+    # This worker's unflushed increments; the reload above keeps them from being added twice
+    for counter, amount in pending_counter(UserActivity.__table__, {'user_id': user_id}).items():
+        set_committed_value(activity, counter, getattr(activity, counter) + amount)
+    return activity
+
+
+def recount_user_activity():
+    """Rewrite every user's activity counters from the base tables"""
+    flush_counters()
+    counts = _count_user_activity()
+    rows = [{'user_id': user_id, 'vote_count': 0, 'poll_count': 0, 'comment_count': 0, 'reaction_count': 0}
+            for (user_id,) in db.session.query(User.id)]
+    for row in rows:
+        row.update(counts.get(row['user_id'], {}))
+    db.session.execute(db.delete(UserActivity.__table__))
+    if rows:
+        db.session.execute(db.insert(UserActivity.__table__), rows)
+    db.session.commit()
+    return len(counts)
+
+
+@app.cli.command('recount-activity')
+def recount_activity_command():
+    """Recount per-user activity counters from the base tables"""
+    print(f"✓ Activity recounted for {recount_user_activity()} active users")
+
+
+# -------------------- GUEST VOTE FILTERS --------------------
+def _poll_voter_ids(poll_id):
+    query = db.session.query(Vote.voter_id).filter(Vote.poll_id == poll_id, Vote.voter_id.isnot(None))
+    return (voter_id for (voter_id,) in query.yield_per(10000))
+
+
+voter_filters = VoterFilterRegistry(_poll_voter_ids,
+                                    initial_capacity=app.config['VOTER_FILTER_INITIAL_CAPACITY'],
+                                    error_rate=app.config['VOTER_FILTER_ERROR_RATE'])
+
+
+def rebuild_voter_filters():
+    """Rebuild the guest voter filter of every open poll from the votes table"""
+    voter_filters.clear()
+    if not app.config['VOTER_FILTER_ENABLED']:
+        return 0
+    rows = db.session.query(Vote.poll_id, Vote.voter_id).join(Poll, Poll.id == Vote.poll_id) \
+        .filter(Poll.status == POLL_OPEN, Vote.voter_id.isnot(None)) \
+        .order_by(Vote.poll_id).yield_per(10000)
+    built = 0
+    for poll_id, group in groupby(rows, key=lambda row: row[0]):
+        voter_filters.build(poll_id, (voter_id for _, voter_id in group))
+        built += 1
+    return built
+
+
+def guest_may_have_voted(poll_id, voter_id):
+    """
+    False only when the voter has definitely not voted on this poll yet.
+    Possible duplicates are confirmed against the database.
+    """
+    if not app.config['VOTER_FILTER_ENABLED']:
+        return db.session.query(Vote.id).filter_by(poll_id=poll_id, voter_id=voter_id).first() is not None
+    if not voter_filters.might_contain(poll_id, voter_id):
+        return False
+    if db.session.query(Vote.id).filter_by(poll_id=poll_id, voter_id=voter_id).first() is not None:
+        return True
+    voter_filters.record_false_positive(poll_id)
+    return False
+
+
+def remember_guest_vote(poll_id, voter_id):
+    # A rolled-back insert left in the filter only costs one extra exact check later
+    if app.config['VOTER_FILTER_ENABLED']:
+        voter_filters.add(poll_id, voter_id)
+
+
+@on_poll_closed
+def drop_voter_filters(poll_ids):
+    for poll_id in poll_ids:
+        voter_filters.discard(poll_id)
+
+
+# -------------------- POLL DELETION --------------------
+# Serial executor for long-running admin maintenance jobs
+maintenance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='maintenance')
+# Delete jobs this process has queued or is running, so the resume tick does not queue them twice
+local_delete_jobs = set()
+local_delete_jobs_lock = threading.Lock()
+
+# Deleted children-first in this order: (model, poll id column, global stat to decrement, extra filter)
+POLL_CHILD_TABLES = [
+    (VoteRollup, VoteRollup.poll_id, None, None),
+    (PollTally, PollTally.poll_id, None, None),
+    (BallotRanking, BallotRanking.poll_id, None, None),
+    (Vote, Vote.poll_id, 'votes', None),
+    (Reaction, Reaction.poll_id, None, None),
+    # Replies go before their parents so the self-referencing cascade never removes uncounted rows
+    (Comment, Comment.poll_id, 'comments', Comment.parent_id.isnot(None)),
+    (Comment, Comment.poll_id, 'comments', Comment.parent_id.is_(None)),
+    (Option, Option.poll_id, None, None),
+    (PollResultSnapshot, PollResultSnapshot.poll_id, None, None),
+    (PollSentiment, PollSentiment.poll_id, None, None),
+    (PollViewStats, PollViewStats.poll_id, None, None),
+    (ArchivedPoll, ArchivedPoll.poll_id, None, None),
+]
+
+
+def _delete_rows(model, pk, ids):
+    """
+    Core-delete rows by primary key and return how many went. Core deletes
+    bypass the mapper events, so per-user counts are given back by hand,
+    from the rows this statement actually removed.
+    """
+    if model not in USER_ACTIVITY_COLUMNS:
+        return db.session.execute(db.delete(model.__table__).where(pk.in_(ids))).rowcount
+    column, counter = USER_ACTIVITY_COLUMNS[model]
+    user_ids = db.session.execute(
+        db.delete(model.__table__).where(pk.in_(ids)).returning(model.__table__.c[column.key])
+    ).scalars().all()
+    counts = {}
+    for user_id in user_ids:
+        if user_id is not None:
+            counts[user_id] = counts.get(user_id, 0) + 1
+    for user_id, count in counts.items():
+        adjust_user_activity(user_id, counter, -count)
+    return len(user_ids)
+
+
+def start_poll_delete_job(poll_ids):
+    """Hide the polls immediately and queue a background job that deletes them in chunks"""
+    rows = db.session.query(Poll.id, Poll.category, Poll.status).filter(
+        Poll.id.in_(poll_ids), Poll.status != POLL_DELETING).all()
+    if not rows:
+        return None
+
+    poll_ids = [poll_id for poll_id, _, _ in rows]
+    groups = {}
+    for poll_id, category, status in rows:
+        groups.setdefault((category, status), []).append(poll_id)
+    for (category, status), ids in groups.items():
+        result = db.session.execute(
+            db.update(Poll).where(Poll.id.in_(ids), Poll.status == status).values(status=POLL_DELETING)
+        )
+        move_category_counts(category, status, POLL_DELETING, result.rowcount)
+    job = PollDeleteJob(id=uuid.uuid4().hex[:12], poll_ids_json=json.dumps(poll_ids))
+    db.session.add(job)
+    db.session.commit()
+    queue_poll_delete_job(job.id)
+    return job.to_dict()
+
+
+def queue_poll_delete_job(job_id):
+    with local_delete_jobs_lock:
+        if job_id in local_delete_jobs:
+            return
+        local_delete_jobs.add(job_id)
+    maintenance_executor.submit(run_in_app_context(run_poll_delete_job), job_id)
+
+
+class DeleteJobLost(Exception):
+    """Another worker took the job over while this one was stalled"""
+
+
+def _claim_delete_job(job_id, runner):
+    """
+    Take a job nobody is running, or whose runner has not reported for
+    POLL_DELETE_JOB_STALE_SECONDS. Jobs waiting out a retry backoff, and
+    jobs that gave up, are left alone.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=app.config['POLL_DELETE_JOB_STALE_SECONDS'])
+    result = db.session.execute(
+        db.update(PollDeleteJob)
+        .where(PollDeleteJob.id == job_id, PollDeleteJob.state.not_in(['done', 'failed']),
+               db.or_(PollDeleteJob.retry_at.is_(None), PollDeleteJob.retry_at <= now),
+               db.or_(PollDeleteJob.runner.is_(None), PollDeleteJob.updated_at < stale_before))
+        .values(runner=runner, state='running', retry_at=None, updated_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _report_delete_progress(job_id, runner, values):
+    """Record progress in the current transaction; fails it if the job is no longer ours"""
+    result = db.session.execute(
+        db.update(PollDeleteJob).where(PollDeleteJob.id == job_id, PollDeleteJob.runner == runner)
+        .values(updated_at=datetime.utcnow(), **values)
+    )
+    if result.rowcount != 1:
+        raise DeleteJobLost(job_id)
+
+
+def run_poll_delete_job(job_id, chunk_size=None):
+    chunk_size = chunk_size or app.config['POLL_DELETE_CHUNK_SIZE']
+    runner = uuid.uuid4().hex
+    state, poll_ids = None, []
+    try:
+        if not _claim_delete_job(job_id, runner):
+            return
+        poll_ids = db.session.get(PollDeleteJob, job_id).poll_ids
+        # Archived votes are no longer rows, so their counts are given back from what was recorded
+        archive_files = release_archived_votes(poll_ids)
+        steps = []
+        for model, column, stat, criterion in POLL_CHILD_TABLES:
+            pk = model.__mapper__.primary_key[0]
+            query = db.session.query(pk).filter(column.in_(poll_ids))
+            if criterion is not None:
+                query = query.filter(criterion)
+            steps.append((model, pk, query, stat))
+        # A resumed job counts what is left on top of what it already removed
+        remaining = len(poll_ids) + sum(query.count() for _, _, query, _ in steps)
+        _report_delete_progress(job_id, runner, {'total': PollDeleteJob.deleted + remaining})
+        db.session.commit()
+
+        for model, pk, query, stat in steps:
+            while True:
+                ids = [row[0] for row in query.limit(chunk_size)]
+                if not ids:
+                    break
+                # One short transaction per chunk keeps the write lock brief
+                deleted = _delete_rows(model, pk, ids)
+                if stat:
+                    adjust_global_stat(stat, -deleted)
+                _report_delete_progress(job_id, runner, {'table_name': model.__tablename__,
+                                                         'deleted': PollDeleteJob.deleted + deleted})
+                db.session.commit()
+
+        deleted = _delete_rows(Poll, Poll.id, poll_ids)
+        adjust_global_stat('polls', -deleted)
+        state = 'done'
+        _report_delete_progress(job_id, runner, {'table_name': Poll.__tablename__, 'state': state, 'runner': None,
+                                                 'error': None, 'deleted': PollDeleteJob.deleted + deleted,
+                                                 'finished_at': datetime.utcnow()})
+        db.session.commit()
+        # Anything left behind here is picked up by collect_archive_garbage()
+        remove_archive_files(archive_files)
+    except DeleteJobLost:
+        db.session.rollback()
+        app.logger.warning("Poll delete job %s was taken over by another worker", job_id)
+    except Exception as e:
+        db.session.rollback()
+        app.logger.exception("Poll delete job %s failed", job_id)
+        now = datetime.utcnow()
+        attempts = (db.session.query(PollDeleteJob.attempts).filter(PollDeleteJob.id == job_id).scalar() or 0) + 1
+        # A job that keeps failing backs off exponentially, then waits for an admin instead of retrying forever
+        if attempts >= app.config['POLL_DELETE_MAX_ATTEMPTS']:
+            state, retry_at = 'failed', None
+        else:
+            state = 'retrying'
+            retry_at = now + timedelta(seconds=app.config['POLL_DELETE_RETRY_BASE_SECONDS'] * 2 ** (attempts - 1))
+        db.session.execute(db.update(PollDeleteJob).where(PollDeleteJob.id == job_id, PollDeleteJob.runner == runner)
+                           .values(state=state, error=str(e), runner=None, attempts=attempts, retry_at=retry_at,
+                                   updated_at=now))
+        db.session.commit()
+    finally:
+        with local_delete_jobs_lock:
+            local_delete_jobs.discard(job_id)
+        if state is not None:
+            # Drops voter filters and cached totals here and in every other worker
+            publish_event('poll.deleted', poll_ids=poll_ids, state=state)
+
+
+def resume_poll_delete_jobs():
+    """
+    Queue every unfinished job nobody is running and whose retry backoff
+    has passed, and a new job for polls left in 'deleting' without one
+    (e.g. by a release that predates persisted jobs). Runs on every
+    worker's scheduler; claims keep a job from running twice.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=app.config['POLL_DELETE_JOB_STALE_SECONDS'])
+    covered = set()
+    for job in PollDeleteJob.query.filter(PollDeleteJob.state != 'done'):
+        # A job that gave up still owns its polls; only an admin retry queues it again
+        covered.update(job.poll_ids)
+        if job.state == 'failed' or (job.retry_at is not None and job.retry_at > now):
+            continue
+        if job.runner is None or job.updated_at < stale_before:
+            queue_poll_delete_job(job.id)
+
+    orphans = sorted(poll_id for (poll_id,) in db.session.query(Poll.id).filter(Poll.status == POLL_DELETING)
+                     if poll_id not in covered)
+    if orphans:
+        # Derived from the poll ids, so workers recovering the same polls insert the same job once
+        job_id = hashlib.sha1(','.join(map(str, orphans)).encode()).hexdigest()[:12]
+        db.session.add(PollDeleteJob(id=job_id, poll_ids_json=json.dumps(orphans)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return
+        queue_poll_delete_job(job_id)
+
+
+lifecycle_scheduler.add_periodic(run_in_app_context(resume_poll_delete_jobs),
+                                 app.config['POLL_DELETE_RESUME_INTERVAL_SECONDS'], name='resume_poll_delete_jobs')
+
+
+def recent_delete_jobs(limit=10):
+    jobs = PollDeleteJob.query.order_by(PollDeleteJob.started_at.desc()).limit(limit)
+    return [job.to_dict() for job in jobs]
+
+
+# -------------------- EVENT BUS --------------------
+# Write routes publish domain events after commit; every worker's caches and live streams subscribe
+event_bus = create_event_bus(app.config)
+
+# Event types forwarded to browsers on a poll's live stream, and the fields they may see
+LIVE_EVENT_TYPES = ('vote.cast', 'reaction.changed', 'comment.added', 'comment.deleted', 'poll.deleting')
+PUBLIC_EVENT_FIELDS = ('type', 'poll_id', 'action', 'reactions', 'comment_id', 'ts')
+
+
+def publish_event(event_type, **data):
+    try:
+        event_bus.publish(event_type, **data)
+    except Exception:
+        # A lost event only leaves other workers' caches stale until their TTL runs out
+        app.logger.exception("Could not publish %s event", event_type)
+
+
+def _remember_remote_guest_vote(event):
+    if event['origin'] != event_bus.origin and event.get('voter_id') and app.config['VOTER_FILTER_ENABLED']:
+        voter_filters.add_if_loaded(event['poll_id'], event['voter_id'])
+
+
+def _forget_deleted_polls(event):
+    for poll_id in event['poll_ids']:
+        voter_filters.discard(poll_id)
+        tally_shard_counts.pop(poll_id)
+    global_stats_cache.clear()
+
+
+def _forget_global_stats(event):
+    global_stats_cache.clear()
+
+
+def _forget_cached_user(event):
+    user_cache.pop(event['user_id'])
+
+
+def _learn_shard_count(event):
+    tally_shard_counts.set(event['poll_id'], event['shards'])
+
+
+event_bus.subscribe(_remember_remote_guest_vote, ['vote.cast'])
+event_bus.subscribe(_forget_deleted_polls, ['poll.deleting', 'poll.deleted'])
+event_bus.subscribe(_forget_global_stats, ['comment.deleted'])
+event_bus.subscribe(_forget_cached_user, ['user.updated'])
+event_bus.subscribe(_learn_shard_count, ['poll.sharded'])
+
+
+def poll_event_stream(poll_id):
+    """Server-sent events for one poll until the client leaves or EVENT_STREAM_MAX_SECONDS pass"""
+    events = queue.Queue(maxsize=app.config['EVENT_STREAM_QUEUE_SIZE'])
+
+    def enqueue(event):
+        if event.get('poll_id') != poll_id and poll_id not in event.get('poll_ids', ()):
+            return
+        public = {field: event[field] for field in PUBLIC_EVENT_FIELDS if field in event}
+        public.setdefault('poll_id', poll_id)
+        try:
+            events.put_nowait(public)
+        except queue.Full:
+            pass  # A client this far behind reloads the page anyway
+
+    heartbeat = app.config['EVENT_STREAM_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + app.config['EVENT_STREAM_MAX_SECONDS']
+    unsubscribe = event_bus.subscribe(enqueue, LIVE_EVENT_TYPES)
+
+    def generate():
+        try:
+            # Browsers reconnect on their own once the stream ends
+            yield 'retry: 5000\n\n'
+            while time.monotonic() < deadline:
+                try:
+                    event = events.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            unsubscribe()
+
+    return generate()
+
+
+event_bus.subscribe(_index_listed_polls, ['poll.listed'])
+event_bus.subscribe(_unindex_polls, ['poll.deleting', 'poll.deleted'])
+lifecycle_scheduler.add_periodic(run_in_app_context(refresh_title_index),
+                                 app.config['SUGGEST_INDEX_REFRESH_SECONDS'], name='refresh_title_index')
+
+
+# -------------------- POLL VIEWS --------------------
+view_buffer = ViewBuffer(precision=app.config['VIEW_HLL_PRECISION'])
+
+
+def viewer_key():
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    # Guests have no stable id until they vote; address plus browser is close enough for an estimate
+    return f"guest:{request.remote_addr}:{request.headers.get('User-Agent', '')}"
+
+
+def record_poll_view(poll_id):
+    if app.config['VIEW_TRACKING_ENABLED']:
+        view_buffer.record(poll_id, viewer_key())
+
+
+def _merge_poll_views(drained, poll_ids):
+    """
+    Fold buffered views into stored rows; returns the poll ids another
+    worker wrote in between, which are left untouched for a retry.
+    """
+    table = PollViewStats.__table__
+    live = [row[0] for row in db.session.query(Poll.id).filter(Poll.id.in_(poll_ids), Poll.status != POLL_DELETING)]
+    for poll_id in live:
+        insert_if_missing(table, {'poll_id': poll_id, 'views': 0}, ['poll_id'])
+    stored = {poll_id: (sketch, updated_at) for poll_id, sketch, updated_at in db.session.query(
+        PollViewStats.poll_id, PollViewStats.viewer_sketch, PollViewStats.updated_at)
+        .filter(PollViewStats.poll_id.in_(live))}
+
+    now = datetime.utcnow()
+    conflicts = []
+    for poll_id in live:
+        views, sketch = drained[poll_id]
+        stored_sketch, seen_at = stored[poll_id]
+        merged = HyperLogLog(sketch.precision, sketch.to_bytes())
+        if stored_sketch:
+            merged.merge(HyperLogLog.from_bytes(stored_sketch))
+        # Sketches merge by register-wise max, so a sketch stored after our read must not be overwritten.
+        # Compare-and-swap on updated_at works everywhere; SQLite has no row locks to take instead.
+        result = db.session.execute(
+            table.update().where(table.c.poll_id == poll_id, table.c.updated_at.is_not_distinct_from(seen_at))
+            .values(views=table.c.views + views, viewer_sketch=merged.to_bytes(), updated_at=now))
+        if result.rowcount != 1:
+            conflicts.append(poll_id)
+    return len(live) - len(conflicts), conflicts
+
+
+def flush_poll_views(chunk_size=500, max_attempts=5):
+    """Write this worker's buffered views, one transaction per chunk of polls"""
+    drained = view_buffer.drain()
+    poll_ids = sorted(drained)
+    flushed = 0
+
+    for start in range(0, len(poll_ids), chunk_size):
+        pending = poll_ids[start:start + chunk_size]
+        try:
+            for _ in range(max_attempts):
+                written, conflicts = _merge_poll_views(drained, pending)
+                db.session.commit()
+                flushed += written
+                pending = conflicts
+                if not pending:
+                    break
+        except Exception:
+            db.session.rollback()
+            # Keep what was not written; the next flush retries
+            view_buffer.restore({poll_id: drained[poll_id] for poll_id in pending + poll_ids[start + chunk_size:]})
+            raise
+        if pending:
+            # Still contended after every attempt; these go back for the next flush
+            view_buffer.restore({poll_id: drained[poll_id] for poll_id in pending})
+    return flushed
+
+
+lifecycle_scheduler.add_periodic(run_in_app_context(flush_poll_views),
+                                 app.config['VIEW_FLUSH_INTERVAL_SECONDS'], name='flush_poll_views')
+
+
+def _forget_buffered_views(event):
+    for poll_id in event['poll_ids']:
+        view_buffer.discard(poll_id)
+
+
+event_bus.subscribe(_forget_buffered_views, ['poll.deleting'])
+
+
+def conversion_stats(views, unique_viewers, votes):
+    return {
+        'views': views,
+        'unique_viewers': unique_viewers,
+        'votes': votes,
+        # Votes also arrive through the widget and batch API without a page view, hence the cap
+        'conversion_rate': min(votes / unique_viewers * 100, 100.0) if unique_viewers else None,
+    }
+
+
+def get_poll_view_stats(poll_id, votes):
+    """Views, unique viewers and view-to-vote conversion, including views this worker has not flushed yet"""
+    stored = db.session.get(PollViewStats, poll_id)
+    views = stored.views if stored else 0
+    if stored and stored.viewer_sketch:
+        sketch = HyperLogLog.from_bytes(stored.viewer_sketch)
+    else:
+        sketch = HyperLogLog(app.config['VIEW_HLL_PRECISION'])
+    pending = view_buffer.pending(poll_id)
+    if pending:
+        views += pending[0]
+        sketch.merge(pending[1])
+    return conversion_stats(views, sketch.count(), votes)
+
+
+def most_viewed_polls(limit=10):
+    """Top polls by views with their unique viewers and conversion, for the admin dashboard"""
+    rows = db.session.query(PollViewStats, Poll.title).join(Poll, Poll.id == PollViewStats.poll_id) \
+        .filter(Poll.status != POLL_DELETING).order_by(PollViewStats.views.desc()).limit(limit).all()
+    votes = poll_vote_totals([stats.poll_id for stats, _ in rows])
+    return [{'poll_id': stats.poll_id, 'title': title,
+             **conversion_stats(stats.views, HyperLogLog.from_bytes(stats.viewer_sketch).count()
+                                if stats.viewer_sketch else 0, votes.get(stats.poll_id, 0))}
+            for stats, title in rows]
+
+
+@app.cli.command('flush-views')
+def flush_views_command():
+    """Write this process's buffered poll views (mainly useful in development)"""
+    print(f"✓ Flushed views for {flush_poll_views()} polls")
+
+
+# -------------------- VOTE ARCHIVE --------------------
+def archive_path(filename):
+    return os.path.join(app.config['ARCHIVE_FOLDER'], filename)
+
+
+def open_vote_archive(archived):
+    return ArchiveReader(archive_path(archived.path))
+
+
+def archived_option_counts(archived):
+    with open_vote_archive(archived) as reader:
+        option_ids = reader.read('votes', ['option_id'], poll_id=archived.poll_id)['option_id']
+    values, counts = np.unique(option_ids, return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+def archived_votes_by_user(user_ids=None):
+    """{user_id: archived vote count}, from the per-account counts recorded when each poll was archived"""
+    query = db.session.query(ArchivedVoterCount.user_id, db.func.sum(ArchivedVoterCount.vote_count)) \
+        .group_by(ArchivedVoterCount.user_id)
+    if user_ids is not None:
+        query = query.filter(ArchivedVoterCount.user_id.in_(user_ids))
+    return {user_id: int(count) for user_id, count in query}
+
+
+def _count_voters(user_ids):
+    users = np.asarray(user_ids, dtype=np.int32)
+    values, counts = np.unique(users[users != -1], return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+def _record_archived_voters(poll_id, user_ids):
+    db.session.execute(db.delete(ArchivedVoterCount.__table__).where(ArchivedVoterCount.poll_id == poll_id))
+    rows = [{'poll_id': poll_id, 'user_id': user_id, 'vote_count': count}
+            for user_id, count in _count_voters(user_ids).items()]
+    if rows:
+        db.session.execute(db.insert(ArchivedVoterCount.__table__), rows)
+
+
+def release_archived_votes(poll_ids):
+    """
+    Give back the global and per-user vote counts of archived polls that
+    are being deleted. Returns their archive files, to remove once the
+    polls are gone.
+    """
+    archived_ids = [row[0] for row in db.session.query(ArchivedPoll.poll_id).filter(ArchivedPoll.poll_id.in_(poll_ids))]
+    if not archived_ids:
+        return []
+    # Rows an interrupted archive run left behind are already counted in the file
+    _delete_archived_rows(archived_ids, app.config['ARCHIVE_DELETE_CHUNK_SIZE'])
+    # Older shared files are split first, so each poll's votes can go with its own file
+    upgrade_archive_files({row[0] for row in db.session.query(ArchivedPoll.path)
+                           .filter(ArchivedPoll.poll_id.in_(archived_ids))})
+    voters = db.session.query(ArchivedVoterCount.user_id, ArchivedVoterCount.vote_count) \
+        .filter(ArchivedVoterCount.poll_id.in_(archived_ids)).all()
+    for user_id, count in voters:
+        adjust_user_activity(user_id, 'vote_count', -count)
+    # Dropped and zeroed so a retried delete job does not give the counts back twice
+    db.session.execute(db.delete(ArchivedVoterCount.__table__).where(ArchivedVoterCount.poll_id.in_(archived_ids)))
+    paths = []
+    for archived in ArchivedPoll.query.filter(ArchivedPoll.poll_id.in_(archived_ids)):
+        adjust_global_stat('votes', -archived.vote_count)
+        archived.vote_count = 0
+        paths.append(archived.path)
+    db.session.commit()
+    return paths
+
+
+def remove_archive_files(paths):
+    """Delete the archive files no archived poll refers to any more; returns how many were removed"""
+    referenced = {row[0] for row in db.session.query(ArchivedPoll.path).filter(ArchivedPoll.path.in_(paths))}
+    removed = 0
+    for path in set(paths) - referenced:
+        try:
+            os.remove(archive_path(path))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _epoch_micros(ts):
+    return int((ts - datetime(1970, 1, 1)).total_seconds() * 1_000_000) if ts else 0
+
+
+def _delete_archived_rows(poll_ids, chunk_size):
+    """Delete archived polls' vote rows a chunk per transaction; returns the number of votes removed"""
+    deleted = 0
+    for model, column in ((BallotRanking, BallotRanking.poll_id), (Vote, Vote.poll_id)):
+        query = db.session.query(model.id).filter(column.in_(poll_ids))
+        while True:
+            ids = [row[0] for row in query.limit(chunk_size)]
+            if not ids:
+                break
+            # Core deletes skip the mapper events: the votes still count in stats and user activity
+            result = db.session.execute(db.delete(model.__table__).where(model.id.in_(ids)))
+            db.session.commit()
+            if model is Vote:
+                deleted += result.rowcount
+    return deleted
+
+
+def _write_poll_archive(poll_id, votes, rankings):
+    """Write one poll's archive file and check it reads back whole; returns its name"""
+    filename = f"votes-{poll_id}-{uuid.uuid4().hex[:8]}.pva"
+    path = archive_path(filename)
+    write_archive(path, {'votes': votes, 'ballot_rankings': rankings},
+                  meta={'poll_id': poll_id, 'created_at': datetime.utcnow().isoformat()})
+    with ArchiveReader(path) as reader:
+        if reader.rows('votes') != len(votes['id']) or reader.rows('ballot_rankings') != len(rankings['vote_id']):
+            raise RuntimeError(f"Archive {filename} did not read back complete")
+    return filename
+
+
+def archive_poll_votes(poll, chunk_size):
+    """Write the poll's votes and ballots to its own archive file, record it, then delete the rows"""
+    # The snapshot is what results are served from once the raw votes are gone
+    freeze_poll_results(poll)
+
+    # Guest email and phone are not archived: the voter_id hash is all duplicate checks need
+    votes = {name: [] for name in ('id', 'poll_id', 'option_id', 'user_id', 'voter_id', 'timestamp',
+                                   'is_anonymous')}
+    query = db.session.query(Vote.id, Vote.poll_id, Vote.option_id, Vote.user_id, Vote.voter_id, Vote.timestamp,
+                             Vote.is_anonymous) \
+        .filter(Vote.poll_id == poll.id).order_by(Vote.id)
+    for row in query.yield_per(10000):
+        votes['id'].append(row.id)
+        votes['poll_id'].append(row.poll_id)
+        votes['option_id'].append(row.option_id)
+        votes['user_id'].append(row.user_id if row.user_id is not None else -1)
+        votes['voter_id'].append(row.voter_id if row.voter_id is not None else -1)
+        votes['timestamp'].append(_epoch_micros(row.timestamp))
+        votes['is_anonymous'].append(1 if row.is_anonymous else 0)
+
+    rankings = {'vote_id': [], 'poll_id': [], 'option_id': [], 'rank': []}
+    query = db.session.query(BallotRanking.vote_id, BallotRanking.poll_id, BallotRanking.option_id,
+                             BallotRanking.rank) \
+        .filter(BallotRanking.poll_id == poll.id).order_by(BallotRanking.vote_id, BallotRanking.rank)
+    for row in query.yield_per(10000):
+        for name in rankings:
+            rankings[name].append(getattr(row, name))
+
+    filename = _write_poll_archive(poll.id, votes, rankings)
+    # Recorded before any row is deleted, so readers switch to the file while the rows still exist
+    db.session.add(ArchivedPoll(poll_id=poll.id, path=filename, vote_count=len(votes['id']),
+                                ranking_count=len(rankings['vote_id'])))
+    db.session.flush()
+    _record_archived_voters(poll.id, votes['user_id'])
+    db.session.commit()
+    return _delete_archived_rows([poll.id], chunk_size)
+
+
+def upgrade_archive_files(paths=None):
+    """
+    Rewrite archive files from before one-file-per-poll: every poll still
+    archived in one gets its own file without the guest email / phone
+    columns, and its voter counts recorded. Returns the files rewritten.
+    """
+    if paths is None:
+        paths = {row[0] for row in db.session.query(ArchivedPoll.path).distinct()}
+    upgraded = 0
+    for path in sorted(paths):
+        with ArchiveReader(archive_path(path)) as reader:
+            if 'poll_id' in reader.meta:
+                continue
+            for archived in ArchivedPoll.query.filter_by(path=path).order_by(ArchivedPoll.poll_id):
+                votes = reader.read('votes', list(VOTE_COLUMNS), poll_id=archived.poll_id)
+                rankings = reader.read('ballot_rankings', list(RANKING_COLUMNS), poll_id=archived.poll_id)
+                archived.path = _write_poll_archive(archived.poll_id, votes, rankings)
+                _record_archived_voters(archived.poll_id, votes['user_id'])
+        # Polls deleted since the file was written go with it
+        db.session.commit()
+        remove_archive_files([path])
+        upgraded += 1
+    return upgraded
+
+
+def collect_archive_garbage(grace_seconds=None):
+    """Delete archive files no poll refers to, once they are older than the grace period; returns how many"""
+    grace_seconds = app.config['ARCHIVE_GC_GRACE_SECONDS'] if grace_seconds is None else grace_seconds
+    folder = app.config['ARCHIVE_FOLDER']
+    if not os.path.isdir(folder):
+        return 0
+    cutoff = time.time() - grace_seconds
+    # A file is written before its polls are recorded, so young ones may still be claimed
+    candidates = [name for name in os.listdir(folder) if (name.endswith('.pva') or name.endswith('.tmp'))
+                  and os.path.getmtime(os.path.join(folder, name)) < cutoff]
+    return remove_archive_files(candidates)
+
+
+def archive_cold_votes(older_than_days=None, now=None):
+    """
+    Move the votes of polls closed more than older_than_days ago into one
+    archive file per poll. Returns (polls archived, votes removed from the database).
+    """
+    older_than_days = app.config['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    chunk_size = app.config['ARCHIVE_DELETE_CHUNK_SIZE']
+
+    # Finish deleting rows for polls archived by an interrupted run
+    leftover = [row[0] for row in db.session.query(Vote.poll_id).join(ArchivedPoll, ArchivedPoll.poll_id == Vote.poll_id)
+                .distinct()]
+    removed = _delete_archived_rows(leftover, chunk_size) if leftover else 0
+
+    polls = Poll.query.outerjoin(ArchivedPoll, ArchivedPoll.poll_id == Poll.id) \
+        .filter(Poll.status == POLL_CLOSED, Poll.expires_at <= cutoff, ArchivedPoll.poll_id.is_(None)) \
+        .order_by(Poll.id).all()
+    for poll in polls:
+        removed += archive_poll_votes(poll, chunk_size)
+    return len(polls), removed
+
+
+def run_scheduled_archive():
+    if app.config['ARCHIVE_ENABLED']:
+        archive_cold_votes()
+        upgrade_archive_files()
+        collect_archive_garbage()
+
+
+lifecycle_scheduler.add_periodic(run_in_app_context(run_scheduled_archive),
+                                 app.config['ARCHIVE_INTERVAL_SECONDS'], name='archive_cold_votes')
+
+
+@app.cli.command('archive-votes')
+@click.option('--days', type=int, default=None, help='Archive polls closed more than this many days ago')
+def archive_votes_command(days):
+    """Move votes of long-closed polls into compressed archive files"""
+    polls, votes = archive_cold_votes(days)
+    print(f"✓ Archived {polls} polls; {votes} vote rows removed from the database")
+
+
+@app.cli.command('compact-archives')
+def compact_archives_command():
+    """Split older shared archive files per poll and delete files no poll refers to"""
+    upgraded = upgrade_archive_files()
+    print(f"✓ Rewrote {upgraded} archive files; removed {collect_archive_garbage()} unreferenced files")
+
+
+@app.cli.command('export-archived-votes')
+@click.argument('poll_id', type=int)
+@click.argument('output', type=click.File('w'), default='-')
+def export_archived_votes_command(poll_id, output):
+    """Write an archived poll's votes as CSV (for audits)"""
+    archived = db.session.get(ArchivedPoll, poll_id)
+    if archived is None:
+        print(f"❌ Poll {poll_id} is not archived")
+        return
+    with open_vote_archive(archived) as reader:
+        columns = reader.read('votes', poll_id=poll_id)
+    writer = csv.writer(output)
+    writer.writerow(list(columns))
+    for row in zip(*columns.values()):
+        writer.writerow([datetime.utcfromtimestamp(value / 1_000_000).isoformat() if name == 'timestamp'
+                         else '' if value is None or (name in ('user_id', 'voter_id') and value == -1) else value
+                         for name, value in zip(columns, row)])
+
+
+# -------------------- RESULT BREAKDOWNS --------------------
+# (poll_id, version) -> breakdown; like tabulations, a poll's version is its ballot count
+breakdown_cache = TTLCache(maxsize=256, ttl=app.config['BREAKDOWN_CACHE_TTL_SECONDS'])
+
+
+def _as_micros(timestamps):
+    """Epoch microseconds, 0 where the timestamp is missing"""
+    values = np.asarray(timestamps, dtype='datetime64[us]')
+    return np.where(np.isnat(values), 0, values.astype(np.int64))
+
+
+def epoch_micros(column):
+    """column as epoch microseconds computed by the database (0 for NULL), or None if it cannot"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # Whole seconds are plenty for hour-of-day and account-age buckets
+        micros = db.cast(db.func.strftime('%s', column), db.BigInteger) * 1_000_000
+    elif dialect == 'postgresql':
+        micros = db.cast(db.extract('epoch', column) * 1_000_000, db.BigInteger)
+    else:
+        return None
+    return db.func.coalesce(micros, 0)
+
+
+def _account_created_micros(user_ids):
+    """created_at of each entry's account in epoch microseconds (0 where there is none)"""
+    wanted = [int(user_id) for user_id in np.unique(user_ids) if user_id != NO_ACCOUNT]
+    created = {}
+    for start in range(0, len(wanted), 500):
+        created.update(db.session.query(User.id, User.created_at).filter(User.id.in_(wanted[start:start + 500])))
+    lookup = {user_id: ts for user_id, ts in created.items() if ts is not None}
+    return _as_micros([lookup.get(int(user_id)) for user_id in user_ids])
+
+
+def load_breakdown_columns(poll):
+    """
+    The vote columns a breakdown needs, one entry per counted choice: each
+    approval of an approval ballot, otherwise the vote's (first) choice.
+    """
+    if poll.archive is not None:
+        with open_vote_archive(poll.archive) as reader:
+            votes = reader.read('votes', ['id', 'option_id', 'user_id', 'timestamp', 'is_anonymous'],
+                                poll_id=poll.id)
+            if poll.voting_method == APPROVAL:
+                approvals = reader.read('ballot_rankings', ['vote_id', 'option_id'], poll_id=poll.id)
+                rows = np.searchsorted(votes['id'], approvals['vote_id'])
+                votes = {name: values[rows] for name, values in votes.items()}
+                votes['option_id'] = approvals['option_id']
+        return {
+            'ballot_id': votes['id'],
+            'option_id': votes['option_id'],
+            'user_id': votes['user_id'].astype(np.int64),
+            'is_anonymous': votes['is_anonymous'].astype(bool),
+            'timestamp': votes['timestamp'],
+            'created_at': _account_created_micros(votes['user_id']),
+        }
+
+    # Guests get NO_ACCOUNT and timestamps arrive as integers where the database can do it,
+    # so every column converts straight to a typed array
+    in_sql = epoch_micros(Vote.timestamp) is not None
+    timestamps = (epoch_micros(Vote.timestamp), epoch_micros(User.created_at)) if in_sql \
+        else (Vote.timestamp, User.created_at)
+    columns = (db.func.coalesce(Vote.user_id, NO_ACCOUNT), db.func.coalesce(Vote.is_anonymous, False), *timestamps)
+    if poll.voting_method == APPROVAL:
+        query = db.session.query(Vote.id, BallotRanking.option_id, *columns) \
+            .join(Vote, Vote.id == BallotRanking.vote_id).filter(BallotRanking.poll_id == poll.id)
+    else:
+        query = db.session.query(Vote.id, Vote.option_id, *columns).filter(Vote.poll_id == poll.id)
+    # Plain tuples streamed a partition at a time into columns; no Vote objects are built
+    time_dtype = np.int64 if in_sql else 'datetime64[us]'
+    ballot_ids, option_ids, user_ids, anonymous, timestamps, created_at = stream_columns(
+        query.outerjoin(User, User.id == Vote.user_id), (np.int64, np.int64, np.int64, bool, time_dtype, time_dtype))
+    return {
+        'ballot_id': ballot_ids,
+        'option_id': option_ids,
+        'user_id': user_ids,
+        'is_anonymous': anonymous,
+        'timestamp': timestamps if in_sql else _as_micros(timestamps),
+        'created_at': created_at if in_sql else _as_micros(created_at),
+    }
+
+
+def poll_breakdown(poll, version):
+    """Results by voter type, account age and time of day, cached until the ballot count changes"""
+    def load():
+        option_ids = sorted(option.id for option in poll.options)
+        data = load_breakdown_columns(poll)
+        return compute_breakdown(option_ids, np.searchsorted(option_ids, data['option_id']), data['ballot_id'],
+                                 data['user_id'], data['is_anonymous'], data['timestamp'], data['created_at'],
+                                 # Account age could single out voters who chose to stay anonymous
+                                 include_account_age=not poll.is_anonymous_voting)
+
+    return breakdown_cache.get_or_load((poll.id, version), load)
+
+
+# -------------------- BULK POLL IMPORT --------------------
+image_executor = ThreadPoolExecutor(max_workers=app.config['BULK_IMAGE_WORKERS'], thread_name_prefix='poll-images')
+
+
+def fetch_remote_image(url):
+    """Download an image URL into the poll uploads folder and return the stored filename"""
+    basename = os.path.basename(urllib.parse.urlparse(url).path)
+    if os.path.splitext(basename)[1].lower().lstrip('.') not in app.config['ALLOWED_EXTENSIONS']:
+        raise ValueError(f"Unsupported image type: {basename}")
+
+    # Only public hosts, on every redirect too, and only bytes that really are an image
+    data, kind = fetch_image(url, app.config['BULK_IMAGE_TIMEOUT_SECONDS'], app.config['MAX_CONTENT_LENGTH'])
+    if kind not in app.config['ALLOWED_EXTENSIONS']:
+        raise ValueError(f"Unsupported image type: {kind}")
+
+    # Named after what the bytes are, not what the URL claimed
+    stem = os.path.splitext(basename)[0]
+    filename = secure_filename(f"{datetime.utcnow().timestamp()}_{stem}.{kind}")
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'polls', filename), 'wb') as f:
+        f.write(data)
+    return filename
+
+
+def attach_remote_image(model, row_id, url):
+    """Runs on the image executor: fetch the image, then point the poll/option row at it"""
+    try:
+        filename = fetch_remote_image(url)
+    except Exception as e:
+        app.logger.warning("Could not attach image %s to %s %s: %s", url, model.__tablename__, row_id, e)
+        return
+    with app.app_context():
+        db.session.execute(db.update(model).where(model.id == row_id).values(image=filename))
+        db.session.commit()
+        db.session.remove()
+
+
+def bulk_create_polls(records, creator, atomic=False, batch_size=None):
+    """
+    Validate and insert polls from an iterable of import records.
+
+    Non-atomic imports commit every batch_size polls and skip invalid
+    records; atomic imports run in one transaction and insert nothing if
+    any record is invalid. Images are attached in the background once
+    their rows are committed.
+    """
+    batch_size = batch_size or app.config['BULK_POLL_BATCH_SIZE']
+    created, errors, image_jobs, batch = [], [], [], []
+    listed = []  # (poll_id, title) per created poll, None for scheduled ones
+    committed = 0
+    schedule_changed = False
+
+    def insert_batch():
+        nonlocal schedule_changed
+        polls = [Poll(created_by=creator.id, status=compute_poll_status(fields['scheduled_for'], fields['expires_at']),
+                      **fields) for fields, _, _ in batch]
+        db.session.add_all(polls)
+        db.session.flush()
+
+        option_rows, option_images = [], []
+        for poll, (fields, options, image_url) in zip(polls, batch):
+            created.append(poll.id)
+            listed.append((poll.id, poll.title) if poll.status in LISTED_STATUSES else None)
+            schedule_changed = schedule_changed or bool(fields['scheduled_for'] or fields['expires_at'])
+            if image_url:
+                image_jobs.append((Poll, poll.id, image_url))
+            for opt in options:
+                option_rows.append({'poll_id': poll.id, 'option_text': opt['option_text']})
+                option_images.append(opt['image_url'])
+
+        option_ids = db.session.scalars(
+            db.insert(Option).returning(Option.id, sort_by_parameter_order=True), option_rows
+        ).all()
+        image_jobs.extend((Option, option_id, url) for option_id, url in zip(option_ids, option_images) if url)
+
+        for poll in polls:
+            db.session.expunge(poll)
+        batch.clear()
+
+    def submit_images():
+        for job in image_jobs:
+            image_executor.submit(attach_remote_image, *job)
+        image_jobs.clear()
+
+    try:
+        for index, record in enumerate(records):
+            try:
+                batch.append(validate_poll_record(record, POLL_CATEGORIES, app.config['MIN_POLL_OPTIONS'],
+                                                  app.config['MAX_POLL_OPTIONS'], voting_methods=VOTING_METHODS))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+                if atomic:
+                    break
+                continue
+
+            if len(batch) >= batch_size:
+                insert_batch()
+                if not atomic:
+                    db.session.commit()
+                    committed = len(created)
+                    submit_images()
+
+        if atomic and errors:
+            db.session.rollback()
+            return {'created': [], 'errors': errors, 'atomic': True}
+
+        if batch:
+            insert_batch()
+        db.session.commit()
+        submit_images()
+    except BulkImportError as e:
+        # Malformed payload: keep only what earlier batches already committed
+        db.session.rollback()
+        errors.append({'index': None, 'error': str(e)})
+        announce_listed_polls(poll for poll in listed[:committed] if poll is not None)
+        return {'created': created[:committed], 'errors': errors, 'atomic': atomic}
+    finally:
+        if schedule_changed:
+            lifecycle_scheduler.wake()
+
+    announce_listed_polls(poll for poll in listed if poll is not None)
+    if created:
+        check_and_award_badges(creator)
+    return {'created': created, 'errors': errors, 'atomic': atomic}
+
+
+@app.cli.command('import-polls')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--creator', 'creator_email', default=lambda: app.config['ADMIN_EMAIL'],
+              help='Email of the user the polls are created for')
+@click.option('--atomic', is_flag=True, help='Insert everything in one transaction, or nothing')
+@click.option('--batch-size', type=int, default=None)
+def import_polls_command(path, creator_email, atomic, batch_size):
+    """Bulk-import polls from a JSON array (.json) or NDJSON (.ndjson / .jsonl) file"""
+    creator = User.query.filter_by(email=creator_email).first()
+    if creator is None:
+        raise click.ClickException(f"No user with email {creator_email}")
+
+    with open(path, 'rb') as f:
+        records = iter_ndjson(f) if path.endswith(('.ndjson', '.jsonl')) else iter_json_array(f)
+        result = bulk_create_polls(records, creator, atomic=atomic, batch_size=batch_size)
+
+    for error in result['errors']:
+        print(f"! Record {error['index']}: {error['error']}")
+    print(f"✓ Created {len(result['created'])} polls ({len(result['errors'])} errors)")
+    image_executor.shutdown(wait=True)
+
+
+# -------------------- STATIC ASSETS & COMPRESSION --------------------
+asset_manifest = AssetManifest(app.static_folder, watch=lambda: app.debug)
+
+
+@app.template_global()
+def asset_url(name):
+    return url_for('static_bundle', filename=asset_manifest.filename(name))
+
+
+@app.route('/static/dist/<path:filename>')
+def static_bundle(filename):
+    """Serve a hashed bundle, pre-compressed when possible; its name changes with its content"""
+    dist = os.path.join(app.static_folder, DIST_DIR)
+    path = safe_join(dist, filename)
+    if path is None:
+        abort(404)
+    available = [encoding for encoding in SUPPORTED_ENCODINGS if os.path.exists(path + FILE_SUFFIXES[encoding])]
+    encoding = negotiate(request.headers.get('Accept-Encoding'), available)
+
+    response = send_from_directory(dist, filename + FILE_SUFFIXES[encoding] if encoding else filename,
+                                   mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=app.config['STATIC_BUNDLE_MAX_AGE'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """gzip / brotli for buffered HTML and JSON bodies above COMPRESS_MIN_SIZE"""
+    if not app.config['COMPRESS_ENABLED'] or response.direct_passthrough or response.is_streamed:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 304) or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in app.config['COMPRESS_MIMETYPES']:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if (response.content_length or 0) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    response.set_data(compress(response.get_data(), encoding, gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+                               brotli_quality=app.config['COMPRESS_BROTLI_QUALITY']))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Build hashed static bundles with pre-compressed .gz / .br variants"""
+    manifest = build_bundles(app.static_folder)
+    for name, filename in manifest.items():
+        print(f"✓ {name} -> {DIST_DIR}/{filename}")
+
+
+# -------------------- READ REPLICAS --------------------
+@app.before_request
+def route_reads_to_replica():
+    """Serve configured read-only endpoints from a replica unless this client wrote recently"""
+    if not REPLICA_BINDS or request.method not in ('GET', 'HEAD'):
+        return
+    if request.endpoint not in app.config['REPLICA_READ_ENDPOINTS']:
+        return
+    # Read-your-writes: a fresh vote or comment may not have reached the replicas yet
+    if session.get('db_sticky_until', 0) > time.time():
+        return
+    g.db_replica = random.choice(REPLICA_BINDS)
+
+
+@app.after_request
+def stick_to_primary_after_write(response):
+    if REPLICA_BINDS and g.get('db_wrote'):
+        session['db_sticky_until'] = time.time() + app.config['REPLICA_STICKY_SECONDS']
+    return response
+
+
+@app.cli.command('sync-replicas')
+def sync_replicas_command():
+    """Copy a SQLite primary onto SQLite replica files (for trying replica routing locally)"""
+    if db.engine.url.get_backend_name() != 'sqlite':
+        print("❌ sync-replicas only copies SQLite databases; use your database's replication instead")
+        return
+    source = sqlite3.connect(db.engine.url.database)
+    try:
+        for key in REPLICA_BINDS:
+            url = db.engines[key].url
+            if url.get_backend_name() != 'sqlite':
+                print(f"Skipping {key}: not a SQLite database")
+                continue
+            target = sqlite3.connect(url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+            print(f"✓ Copied primary to {key} ({url.database})")
+    finally:
+        source.close()
+
+
+# -------------------- EMBED WIDGET --------------------
+# poll_id -> widget payload (None for polls that cannot be embedded); votes and lifecycle changes drop it
+embed_cache = TTLCache(maxsize=app.config['EMBED_CACHE_SIZE'], ttl=app.config['EMBED_CACHE_TTL_SECONDS'])
+
+
+def build_embed_payload(poll_id):
+    poll = db.session.get(Poll, poll_id)
+    if poll is None or poll.status == POLL_DELETING:
+        return None
+    status = sync_poll_status(poll)
+    if status == POLL_SCHEDULED:
+        return None
+
+    closed = status == POLL_CLOSED
+    option_votes, total_votes, _ = get_poll_results(poll, closed=closed)
+    if poll.voting_method in (BORDA, APPROVAL):
+        option_votes, _ = build_option_votes(poll.options, tabulate_poll(poll, total_votes)['rounds'][-1]['counts'])
+    # The widget is served to everyone from shared caches, so masked results stay hidden until close
+    hidden = poll.is_masked and not closed
+
+    options = []
+    for option in poll.options:
+        entry = {'id': option.id, 'text': option.option_text}
+        if not hidden:
+            entry.update(votes=option_votes[option.id]['count'],
+                         percentage=round(option_votes[option.id]['percentage'], 1))
+        options.append(entry)
+    return {
+        'poll_id': poll.id,
+        'title': poll.title,
+        'status': status,
+        'voting_method': poll.voting_method,
+        'max_choices': poll.max_choices,
+        'results_hidden': hidden,
+        'total_votes': None if hidden else total_votes,
+        'options': options,
+        # Opaque so that the ETag of a masked poll does not reveal its vote count
+        'version': hashlib.sha1(f"{poll.id}:{status}:{total_votes}".encode()).hexdigest()[:16],
+    }
+
+
+def get_embed_payload(poll_id):
+    return embed_cache.get_or_load(poll_id, lambda: build_embed_payload(poll_id))
+
+
+def cacheable_embed(response, payload):
+    """Shared-cache headers for widget responses, revalidated against the poll version"""
+    response.set_etag(payload['version'])
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['EMBED_MAX_AGE']
+    response.cache_control.stale_while_revalidate = app.config['EMBED_STALE_WHILE_REVALIDATE']
+    response.cache_control.stale_if_error = app.config['EMBED_STALE_IF_ERROR']
+    return response.make_conditional(request)
+
+
+def _forget_embed_payloads(event):
+    for poll_id in event.get('poll_ids') or [event['poll_id']]:
+        embed_cache.pop(poll_id)
+
+
+event_bus.subscribe(_forget_embed_payloads, ['vote.cast', 'poll.deleting', 'poll.deleted'])
+
+
+@on_poll_closed
+def drop_closed_embed_payloads(poll_ids):
+    for poll_id in poll_ids:
+        embed_cache.pop(poll_id)
+
+
 # -------------------- ROUTES --------------------
 @app.route('/')
 def index():
@@ -178,7 +2976,7 @@ def index():
     sort_by = request.args.get('sort', 'trending')
     now = datetime.utcnow()
 
-    query = Poll.query.filter(db.or_(Poll.scheduled_for == None, Poll.scheduled_for <= now))
+    query = Poll.query.filter(Poll.status.in_([POLL_OPEN, POLL_CLOSED]))
 
     if search_query:
         query = query.filter(db.or_(Poll.title.contains(search_query), Poll.description.contains(search_query)))
@@ -187,19 +2985,19 @@ def index():
 
     if sort_by == 'trending':
         polls = query.all()
-        polls_with_votes = [(p, Vote.query.filter_by(poll_id=p.id).count()) for p in polls]
-        polls_with_votes.sort(key=lambda x: x[1], reverse=True)
-        polls = [p[0] for p in polls_with_votes]
+        votes = poll_vote_totals(query.with_entities(Poll.id))
+        polls.sort(key=lambda p: votes.get(p.id, 0), reverse=True)
     elif sort_by == 'recent':
         polls = query.order_by(Poll.created_at.desc()).all()
     else:
         polls = query.all()
 
-    categories = ['General', 'Politics', 'Sports', 'Technology', 'Entertainment', 'Health', 'Education', 'Business']
+    categories = category_facets()
 
     total_polls = len(polls)
-    total_votes = Vote.query.count()
-    total_comments = Comment.query.count()
+    stats = get_global_stats()
+    total_votes = stats['votes']
+    total_comments = stats['comments']
 
     return render_template('index.html', polls=polls, categories=categories,
                            current_category=category, search_query=search_query, now=now,
@@ -273,14 +3071,15 @@ def logout():
 def profile():
     if request.method == 'POST':
         action = request.form.get('action')
+        user = db.session.get(User, current_user.id)
         if action == 'update_name':
-            if current_user.name_changed:
+            if user.name_changed:
                 flash('You can only change your name once', 'warning')
             else:
                 new_name = request.form.get('name')
                 if new_name:
-                    current_user.name = new_name
-                    current_user.name_changed = True
+                    user.name = new_name
+                    user.name_changed = True
                     db.session.commit()
                     flash('Name updated successfully', 'success')
         elif action == 'upload_picture':
@@ -290,32 +3089,50 @@ def profile():
                     filename = secure_filename(f"user_{current_user.id}_{file.filename}")
                     filepath = os.path.join(app.config['UPLOAD_FOLDER'], 'profiles', filename)
                     file.save(filepath)
-                    current_user.profile_picture = filename
+                    user.profile_picture = filename
                     db.session.commit()
                     flash('Profile picture updated', 'success')
         return redirect(url_for('profile'))
 
-    user_polls = Poll.query.filter_by(created_by=current_user.id).all()
-    user_votes = Vote.query.filter_by(user_id=current_user.id).count()
-    user_comments = Comment.query.filter_by(user_id=current_user.id).count()
+    # Polls and their vote counts in one grouped query instead of loading each poll's votes
+    poll_rows = db.session.query(Poll, db.func.count(Vote.id)) \
+        .outerjoin(Vote, Vote.poll_id == Poll.id) \
+        .filter(Poll.created_by == current_user.id, Poll.status != POLL_DELETING) \
+        .group_by(Poll.id).order_by(Poll.created_at).all()
+    user_polls = [poll for poll, _ in poll_rows]
+    poll_vote_counts = {poll.id: count for poll, count in poll_rows}
+    # Votes of archived polls live in files; their counts were recorded when they moved
+    poll_vote_counts.update(db.session.query(ArchivedPoll.poll_id, ArchivedPoll.vote_count)
+                            .filter(ArchivedPoll.poll_id.in_(poll_vote_counts)))
+    activity = get_user_activity(current_user.id)
     user_badges = Badge.query.filter_by(user_id=current_user.id).all()
     now = datetime.utcnow()
 
-    return render_template('profile.html', user_polls=user_polls, user_votes=user_votes,
-                           user_comments=user_comments, user_badges=user_badges, now=now)
+    return render_template('profile.html', user_polls=user_polls, poll_vote_counts=poll_vote_counts,
+                           activity=activity, user_votes=activity.vote_count,
+                           user_comments=activity.comment_count, user_badges=user_badges, now=now)
 
 
 @app.route('/create_poll', methods=['GET', 'POST'])
 @login_required
 def create_poll():
-    categories = ['General', 'Politics', 'Sports', 'Technology', 'Entertainment', 'Health', 'Education', 'Business']
+    categories = POLL_CATEGORIES
 
     if request.method == 'POST':
         title = (request.form.get('title') or '').strip()
         description = (request.form.get('description') or '').strip()
         category = request.form.get('category') or 'General'
+        if category not in categories:
+            flash("Unknown category.", "danger")
+            return redirect(url_for('create_poll'))
         is_masked = bool(request.form.get('is_masked'))
         is_anonymous_voting = bool(request.form.get('is_anonymous_voting'))
+        voting_method = request.form.get('voting_method') or SINGLE
+        max_choices = request.form.get('max_choices', type=int) if voting_method == APPROVAL else None
+
+        if voting_method not in VOTING_METHODS:
+            flash("Unknown voting method.", "danger")
+            return redirect(url_for('create_poll'))
 
         options_text = request.form.getlist('options[]')
         options_text = [opt.strip() for opt in options_text if opt and opt.strip()]
@@ -361,10 +3178,15 @@ def create_poll():
             is_anonymous_voting=is_anonymous_voting,
             expires_at=expires_at,
             scheduled_for=scheduled_for,
-            image=poll_image_filename
+            image=poll_image_filename,
+            status=compute_poll_status(scheduled_for, expires_at),
+            voting_method=voting_method,
+            max_choices=max_choices if max_choices and max_choices > 0 else None
         )
         db.session.add(poll)
         db.session.commit()
+        if scheduled_for or expires_at:
+            lifecycle_scheduler.wake()
 
         for i, opt_text in enumerate(options_text):
             opt_image_file = option_images[i] if i < len(option_images) else None
@@ -377,32 +3199,40 @@ def create_poll():
             db.session.add(option)
 
         db.session.commit()
+        if poll.status in LISTED_STATUSES:
+            announce_listed_polls([(poll.id, poll.title)])
         check_and_award_badges(current_user)
         flash("Poll created successfully!", "success")
         return redirect(url_for('view_poll', poll_id=poll.id))
 
-    return render_template('create_poll.html', categories=categories)
+    return render_template('create_poll.html', categories=categories, voting_methods=VOTING_METHODS)
+
+
+@app.route('/api/polls/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_create_polls_api():
+    atomic = request.args.get('atomic', '').lower() in ['1', 'true', 'yes']
+    records = iter_records(request.stream, request.mimetype)
+    result = bulk_create_polls(records, current_user, atomic=atomic, batch_size=request.args.get('batch_size', type=int))
+
+    status = 201 if result['created'] else 400 if result['errors'] else 200
+    return jsonify({'success': status != 400, 'count': len(result['created']), **result}), status
 
 
 @app.route('/poll/<int:poll_id>')
 def view_poll(poll_id):
     poll = Poll.query.get_or_404(poll_id)
+    status = sync_poll_status(poll)
 
-    if poll.scheduled_for and poll.scheduled_for > datetime.utcnow():
+    if status == POLL_SCHEDULED:
         if not current_user.is_authenticated or current_user.id != poll.created_by:
             flash('This poll is scheduled for future', 'info')
             return redirect(url_for('index'))
 
-    is_expired = bool(poll.expires_at and poll.expires_at < datetime.utcnow())
-
-    total_votes = Vote.query.filter_by(poll_id=poll_id).count()
-    option_votes = {}
-    for option in poll.options:
-        c = Vote.query.filter_by(option_id=option.id).count()
-        option_votes[option.id] = {
-            'count': c,
-            'percentage': (c / total_votes * 100) if total_votes > 0 else 0
-        }
+    is_expired = status == POLL_CLOSED
+    option_votes, total_votes, reactions = get_poll_results(poll, closed=is_expired)
+    record_poll_view(poll_id)
 
     user_voted = False
     if current_user.is_authenticated:
@@ -410,36 +3240,135 @@ def view_poll(poll_id):
 
     comments = Comment.query.filter_by(poll_id=poll_id, parent_id=None).order_by(Comment.timestamp.desc()).all()
 
-    reactions = {}
-    for rt in ['like', 'love', 'wow', 'sad', 'angry']:
-        reactions[rt] = Reaction.query.filter_by(poll_id=poll_id, reaction_type=rt).count()
-
     user_reaction = None
     if current_user.is_authenticated:
         r = Reaction.query.filter_by(poll_id=poll_id, user_id=current_user.id).first()
         if r:
             user_reaction = r.reaction_type
 
+    sentiment = db.session.get(PollSentiment, poll_id)
+
+    view_stats = get_poll_view_stats(poll_id, total_votes)
+    is_creator = current_user.is_authenticated and current_user.id == poll.created_by
+    # The conversion rate would reveal the vote count of a masked poll
+    show_conversion = not poll.is_masked or is_expired or is_creator
+
+    tabulation = None
+    if poll.voting_method != SINGLE:
+        tabulation = tabulate_poll(poll, total_votes)
+        if poll.voting_method in (BORDA, APPROVAL):
+            # Bars show points / approvals rather than first preferences
+            option_votes, _ = build_option_votes(poll.options, tabulation['rounds'][-1]['counts'])
+
+    # Only computed when the results section is shown
+    breakdown = poll_breakdown(poll, total_votes) if (user_voted or is_expired) and total_votes else None
+
     return render_template('view_poll.html', poll=poll, option_votes=option_votes,
                            total_votes=total_votes, user_voted=user_voted,
                            is_expired=is_expired, comments=comments,
-                           reactions=reactions, user_reaction=user_reaction)
+                           reactions=reactions, user_reaction=user_reaction, sentiment=sentiment,
+                           creator_activity=get_user_activity(poll.created_by),
+                           tabulation=tabulation, voting_methods=VOTING_METHODS,
+                           view_stats=view_stats, show_conversion=show_conversion, breakdown=breakdown)
+
+
+@app.route('/api/poll/<int:poll_id>/timeline')
+def poll_timeline(poll_id):
+    poll = Poll.query.get_or_404(poll_id)
+    status = sync_poll_status(poll)
+    is_creator = current_user.is_authenticated and current_user.id == poll.created_by
+
+    if status == POLL_SCHEDULED and not is_creator:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    if poll.is_masked and status != POLL_CLOSED and not is_creator:
+        voted = current_user.is_authenticated and \
+            Vote.query.filter_by(poll_id=poll_id, user_id=current_user.id).first() is not None
+        if not voted:
+            return jsonify({'success': False, 'message': 'Results are hidden until you vote'}), 403
+
+    granularity = request.args.get('granularity', 'hour')
+    if granularity not in GRANULARITIES:
+        return jsonify({'success': False, 'message': 'Invalid granularity'}), 400
+
+    return jsonify({'success': True, **vote_timeline(poll, granularity)})
+
+
+@app.route('/api/poll/<int:poll_id>/results')
+def poll_results_api(poll_id):
+    poll = Poll.query.get_or_404(poll_id)
+    status = sync_poll_status(poll)
+    is_creator = current_user.is_authenticated and current_user.id == poll.created_by
+
+    if status == POLL_SCHEDULED and not is_creator:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    if poll.is_masked and status != POLL_CLOSED and not is_creator:
+        voted = current_user.is_authenticated and \
+            Vote.query.filter_by(poll_id=poll_id, user_id=current_user.id).first() is not None
+        if not voted:
+            return jsonify({'success': False, 'message': 'Results are hidden until you vote'}), 403
+
+    option_votes, total_votes, reactions = get_poll_results(poll, closed=status == POLL_CLOSED)
+    return jsonify(results_payload(poll.id, status, poll.options, option_votes, total_votes, reactions))
+
+
+@app.route('/api/suggest')
+def suggest_polls():
+    query = request.args.get('q', '')[:100]
+    matches = get_title_index().suggest(query, limit=app.config['SUGGEST_MAX_RESULTS'])
+    return jsonify({'query': query, 'suggestions': [
+        {'id': poll_id, 'title': title, 'url': url_for('view_poll', poll_id=poll_id)} for poll_id, title in matches
+    ]})
+
+
+@app.route('/api/poll/<int:poll_id>/breakdown')
+def poll_breakdown_api(poll_id):
+    poll = Poll.query.get_or_404(poll_id)
+    status = sync_poll_status(poll)
+    is_creator = current_user.is_authenticated and current_user.id == poll.created_by
+
+    if status == POLL_SCHEDULED and not is_creator:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    if poll.is_masked and status != POLL_CLOSED and not is_creator:
+        voted = current_user.is_authenticated and \
+            Vote.query.filter_by(poll_id=poll_id, user_id=current_user.id).first() is not None
+        if not voted:
+            return jsonify({'success': False, 'message': 'Results are hidden until you vote'}), 403
+
+    _, total_votes, _ = get_poll_results(poll, closed=status == POLL_CLOSED)
+    return jsonify({'success': True, 'poll_id': poll.id, 'voting_method': poll.voting_method,
+                    **poll_breakdown(poll, total_votes)})
+
+
+@app.route('/api/poll/<int:poll_id>/events')
+def poll_events(poll_id):
+    poll = Poll.query.get_or_404(poll_id)
+    if poll.status == POLL_DELETING:
+        abort(404)
+    if poll.status == POLL_SCHEDULED and not (current_user.is_authenticated and current_user.id == poll.created_by):
+        abort(404)
+    return Response(poll_event_stream(poll_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/vote/<int:poll_id>', methods=['POST'])
+@rate_limited('vote')
+@idempotent
 def vote(poll_id):
     poll = Poll.query.get_or_404(poll_id)
-    option_id = request.form.get('option_id', type=int)
-
-    if not option_id:
-        flash('Please select an option', 'warning')
+    try:
+        choices = parse_ballot(poll, request.form)
+    except ValueError as e:
+        flash(str(e), 'warning')
         return redirect(url_for('view_poll', poll_id=poll_id))
+    option_id = choices[0]
 
-    if poll.expires_at and poll.expires_at < datetime.utcnow():
+    status = sync_poll_status(poll)
+
+    if status == POLL_CLOSED:
         flash('This poll has expired', 'danger')
         return redirect(url_for('view_poll', poll_id=poll_id))
 
-    if poll.scheduled_for and poll.scheduled_for > datetime.utcnow():
+    if status == POLL_SCHEDULED:
         if not current_user.is_authenticated or current_user.id != poll.created_by:
             flash('This poll is scheduled for future', 'info')
             return redirect(url_for('index'))
@@ -452,8 +3381,10 @@ def vote(poll_id):
 
         vote = Vote(poll_id=poll_id, option_id=option_id, user_id=current_user.id,
                     is_anonymous=poll.is_anonymous_voting)
+        attach_ballot(vote, poll, choices)
         db.session.add(vote)
         db.session.commit()
+        publish_event('vote.cast', poll_id=poll_id)
         check_and_award_badges(current_user)
     else:
         email = request.form.get('email')
@@ -461,23 +3392,241 @@ def vote(poll_id):
             flash('Email is required for voting', 'warning')
             return redirect(url_for('view_poll', poll_id=poll_id))
 
-        existing_vote = Vote.query.filter_by(poll_id=poll_id, email=email).first()
-        if existing_vote:
+        voter_id = get_or_create_voter(email=email)
+        if voter_id is None:
+            flash('Please enter a valid email address', 'warning')
+            return redirect(url_for('view_poll', poll_id=poll_id))
+
+        if guest_may_have_voted(poll_id, voter_id):
             flash('This email has already voted on this poll', 'warning')
             return redirect(url_for('view_poll', poll_id=poll_id))
 
-        vote = Vote(poll_id=poll_id, option_id=option_id, email=email)
+        # uq_votes_poll_voter catches duplicates the filter could not see (e.g. other workers)
+        vote = Vote(poll_id=poll_id, option_id=option_id, voter_id=voter_id)
+        attach_ballot(vote, poll, choices)
         db.session.add(vote)
-        db.session.commit()
+        remember_guest_vote(poll_id, voter_id)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash('This email has already voted on this poll', 'warning')
+            return redirect(url_for('view_poll', poll_id=poll_id))
+        publish_event('vote.cast', poll_id=poll_id, voter_id=voter_id)
 
     flash('Vote recorded successfully!', 'success')
     return redirect(url_for('view_poll', poll_id=poll_id))
 
 
+def _json_option_ids(item, field):
+    """item[field] as a list of distinct option ids ([] when absent); raises ValueError otherwise"""
+    value = item.get(field)
+    if value is None:
+        return []
+    # bool is an int subclass, but true is not an option id
+    if not isinstance(value, list) or any(type(option_id) is not int for option_id in value):
+        raise ValueError(f'{field} must be a list of option ids')
+    if len(set(value)) != len(value):
+        raise ValueError(f'{field} lists the same option more than once')
+    return value
+
+
+def ballot_form(item):
+    """Translate one JSON batch item into the form fields parse_ballot reads; raises ValueError if malformed"""
+    form = MultiDict()
+    if item.get('option_id') is not None:
+        if type(item['option_id']) is not int:
+            raise ValueError('option_id must be an option id')
+        form['option_id'] = item['option_id']
+    for option_id in _json_option_ids(item, 'option_ids'):
+        form.add('option_ids', option_id)
+    # A ranking lists option ids from most to least preferred
+    for rank, option_id in enumerate(_json_option_ids(item, 'ranking'), start=1):
+        form[f'rank_{option_id}'] = rank
+    return form
+
+
+def json_email(data):
+    email = data.get('email')
+    return email if isinstance(email, str) else None
+
+
+def batch_vote_cost():
+    """A batch is charged one token per vote in it"""
+    data = request.get_json(silent=True)
+    votes = data.get('votes') if isinstance(data, dict) else None
+    return min(len(votes), app.config['BATCH_VOTE_MAX_ITEMS']) if isinstance(votes, list) and votes else 1
+
+
+@app.route('/api/votes/batch', methods=['POST'])
+@rate_limited('vote', cost=batch_vote_cost)
+@idempotent
+def batch_vote():
+    """
+    Vote on many polls at once, e.g. a survey page.
+    Body: {"email": ... (guests only), "votes": [{"poll_id": 1, "option_id": 2}, ...]};
+    ranked polls take "ranking" and approval polls "option_ids" instead of "option_id".
+    """
+    data = request.get_json(silent=True)
+    items = data.get('votes') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'message': 'votes must be a non-empty list'}), 400
+    if len(items) > app.config['BATCH_VOTE_MAX_ITEMS']:
+        return jsonify({'success': False,
+                        'message': f"At most {app.config['BATCH_VOTE_MAX_ITEMS']} votes per request"}), 400
+
+    user_id = voter_id = None
+    if current_user.is_authenticated:
+        user_id = current_user.id
+    else:
+        voter_id = get_or_create_voter(email=json_email(data))
+        if voter_id is None:
+            return jsonify({'success': False, 'message': 'A valid email is required for voting'}), 400
+
+    # Anything but a plain integer poll_id is reported as invalid below
+    poll_ids = {item['poll_id'] for item in items if isinstance(item, dict) and type(item.get('poll_id')) is int}
+    # One query each for the polls (with options) and for the voter's existing votes among them
+    polls = {poll.id: poll for poll in Poll.query.filter(Poll.id.in_(poll_ids), Poll.status != POLL_DELETING)
+             .options(db.selectinload(Poll.options))}
+    voter_filter = Vote.user_id == user_id if user_id else Vote.voter_id == voter_id
+    already_voted = {row[0] for row in db.session.query(Vote.poll_id).filter(Vote.poll_id.in_(polls), voter_filter)}
+
+    now = datetime.utcnow()
+    statuses = {poll_id: compute_poll_status(poll.scheduled_for, poll.expires_at, now) for poll_id, poll in polls.items()}
+    # The scheduler may not have closed these yet; close them together so their snapshots freeze
+    overdue = [poll_id for poll_id, status in statuses.items()
+               if status == POLL_CLOSED and polls[poll_id].status != POLL_CLOSED]
+    if overdue:
+        close_polls(overdue)
+
+    results, pending, seen = [], [], set()
+    for item in items:
+        poll_id = item.get('poll_id') if isinstance(item, dict) else None
+        poll = polls.get(poll_id) if type(poll_id) is int else None
+        outcome = {'poll_id': poll_id}
+        results.append(outcome)
+        if poll_id is not None and type(poll_id) is not int:
+            outcome.update(status='invalid', message='poll_id must be a poll id')
+        elif poll is None:
+            outcome.update(status='not_found', message='Poll not found')
+        elif poll_id in seen:
+            outcome.update(status='duplicate', message='This poll appears more than once in the batch')
+        elif statuses[poll_id] == POLL_CLOSED:
+            outcome.update(status='closed', message='This poll has expired')
+        elif statuses[poll_id] == POLL_SCHEDULED and user_id != poll.created_by:
+            outcome.update(status='not_found', message='Poll not found')
+        elif poll_id in already_voted:
+            outcome.update(status='already_voted', message='You have already voted on this poll')
+        else:
+            try:
+                choices = parse_ballot(poll, ballot_form(item))
+            except ValueError as e:
+                outcome.update(status='invalid', message=str(e))
+            else:
+                vote = Vote(poll_id=poll_id, option_id=choices[0], user_id=user_id, voter_id=voter_id,
+                            is_anonymous=bool(user_id and poll.is_anonymous_voting))
+                attach_ballot(vote, poll, choices)
+                pending.append((outcome, vote))
+        if poll is not None:
+            seen.add(poll_id)
+
+    # All votes in one transaction; if a concurrent request won a race, settle each vote on its own savepoint
+    db.session.add_all(vote for _, vote in pending)
+    try:
+        db.session.commit()
+        recorded = pending
+    except IntegrityError:
+        db.session.rollback()
+        recorded = []
+        for outcome, vote in pending:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(vote)
+                recorded.append((outcome, vote))
+            except IntegrityError:
+                outcome.update(status='already_voted', message='You have already voted on this poll')
+        db.session.commit()
+
+    for outcome, vote in recorded:
+        outcome['status'] = 'recorded'
+        if voter_id is not None:
+            remember_guest_vote(vote.poll_id, voter_id)
+        publish_event('vote.cast', poll_id=vote.poll_id, voter_id=voter_id)
+    if recorded and user_id is not None:
+        check_and_award_badges(current_user)
+
+    return jsonify({'success': True, 'recorded': len(recorded), 'results': results})
+
+
+@app.route('/embed/<int:poll_id>')
+def embed_poll(poll_id):
+    """Minimal poll widget for partner sites to load in an iframe"""
+    payload = get_embed_payload(poll_id)
+    if payload is None:
+        abort(404)
+    response = make_response(render_template('embed.html', poll=payload))
+    return cacheable_embed(response, payload)
+
+
+@app.route('/embed/<int:poll_id>.json')
+def embed_poll_json(poll_id):
+    payload = get_embed_payload(poll_id)
+    if payload is None:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    response = jsonify({'success': True, **payload})
+    # Public results only, so partner pages may render the widget themselves
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return cacheable_embed(response, payload)
+
+
+@app.route('/embed/<int:poll_id>/vote', methods=['POST'])
+@rate_limited('vote')
+@idempotent
+def embed_vote(poll_id):
+    """JSON vote from the widget: {"email": ..., "option_id" | "option_ids": ...}; answers with fresh counts"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'message': 'Expected a JSON object'}), 400
+    poll = db.session.get(Poll, poll_id)
+    if poll is None or poll.status == POLL_DELETING:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    status = sync_poll_status(poll)
+    if status == POLL_SCHEDULED:
+        return jsonify({'success': False, 'message': 'Poll not found'}), 404
+    if status == POLL_CLOSED:
+        return jsonify({'success': False, 'message': 'This poll has expired'}), 403
+    try:
+        choices = parse_ballot(poll, ballot_form(data))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    voter_id = get_or_create_voter(email=json_email(data))
+    if voter_id is None:
+        return jsonify({'success': False, 'message': 'A valid email is required for voting'}), 400
+    if guest_may_have_voted(poll_id, voter_id):
+        return jsonify({'success': False, 'message': 'This email has already voted on this poll'}), 409
+
+    vote = Vote(poll_id=poll_id, option_id=choices[0], voter_id=voter_id)
+    attach_ballot(vote, poll, choices)
+    db.session.add(vote)
+    remember_guest_vote(poll_id, voter_id)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'This email has already voted on this poll'}), 409
+    publish_event('vote.cast', poll_id=poll_id, voter_id=voter_id)
+
+    return jsonify({'success': True, 'message': 'Vote recorded successfully!', 'poll': get_embed_payload(poll_id)})
+
+
 @app.route('/comment/<int:poll_id>', methods=['POST'])
 @login_required
+@rate_limited('comment')
 def add_comment(poll_id):
     poll = Poll.query.get_or_404(poll_id)
+    # A poll being deleted 404s, so no comment lands after its comment chunks have run
+    sync_poll_status(poll)
     comment_text = request.form.get('comment')
     parent_id = request.form.get('parent_id', type=int)
 
@@ -490,33 +3639,40 @@ def add_comment(poll_id):
         flash('Maximum 5 comments per poll allowed', 'warning')
         return redirect(url_for('view_poll', poll_id=poll_id))
 
-    sentiment_score = 0.0
-    positive_words = ['good', 'great', 'excellent', 'awesome', 'love', 'best', 'amazing']
-    negative_words = ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'poor']
-    txt = comment_text.lower()
-    for w in positive_words:
-        if w in txt:
-            sentiment_score += 0.1
-    for w in negative_words:
-        if w in txt:
-            sentiment_score -= 0.1
+    sentiment_score = sentiment_lexicon.score(comment_text)
 
     comment = Comment(poll_id=poll_id, user_id=current_user.id, comment_text=comment_text,
                       sentiment_score=sentiment_score, parent_id=parent_id)
     db.session.add(comment)
+    record_comment_sentiment(poll_id, sentiment_score)
     db.session.commit()
+    publish_event('comment.added', poll_id=poll_id, comment_id=comment.id)
 
     check_and_award_badges(current_user)
     flash('Comment added successfully!', 'success')
     return redirect(url_for('view_poll', poll_id=poll_id))
 
 
+def reaction_changed(poll_id, action, message=None):
+    """Publish the poll's new reaction counts and build the JSON reply"""
+    publish_event('reaction.changed', poll_id=poll_id, action=action, reactions=read_poll_tallies(poll_id)[1])
+    response = {'success': True, 'action': action}
+    if message:
+        response['message'] = message
+    return jsonify(response)
+
+
 @app.route('/react/<int:poll_id>', methods=['POST'])
+@rate_limited('react')
+@idempotent
 def add_reaction(poll_id):
     poll = Poll.query.get_or_404(poll_id)
+    # Reaction counts are frozen into the result snapshot when the poll closes
+    if sync_poll_status(poll) != POLL_OPEN:
+        return jsonify({'success': False, 'message': 'Reactions are closed for this poll'}), 403
     reaction_type = request.form.get('reaction_type')
 
-    if reaction_type not in ['like', 'love', 'wow', 'sad', 'angry']:
+    if reaction_type not in REACTION_TYPES:
         return jsonify({'success': False, 'message': 'Invalid reaction type'})
 
     if current_user.is_authenticated:
@@ -526,16 +3682,16 @@ def add_reaction(poll_id):
             if existing.reaction_type == reaction_type:
                 db.session.delete(existing)
                 db.session.commit()
-                return jsonify({'success': True, 'action': 'removed'})
+                return reaction_changed(poll_id, 'removed')
             else:
                 existing.reaction_type = reaction_type
                 db.session.commit()
-                return jsonify({'success': True, 'action': 'updated'})
+                return reaction_changed(poll_id, 'updated')
         else:
             r = Reaction(poll_id=poll_id, user_id=current_user.id, reaction_type=reaction_type)
             db.session.add(r)
             db.session.commit()
-            return jsonify({'success': True, 'action': 'added'})
+            return reaction_changed(poll_id, 'added')
     else:
         email = request.form.get('email')
 
@@ -545,22 +3701,23 @@ def add_reaction(poll_id):
         if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
             return jsonify({'success': False, 'message': 'Invalid email format', 'require_email': True})
 
-        existing = Reaction.query.filter_by(poll_id=poll_id, email=email).first()
+        voter_id = get_or_create_voter(email=email)
+        existing = Reaction.query.filter_by(poll_id=poll_id, voter_id=voter_id).first()
 
         if existing:
             if existing.reaction_type == reaction_type:
                 db.session.delete(existing)
                 db.session.commit()
-                return jsonify({'success': True, 'action': 'removed', 'message': 'Reaction removed'})
+                return reaction_changed(poll_id, 'removed', 'Reaction removed')
             else:
                 existing.reaction_type = reaction_type
                 db.session.commit()
-                return jsonify({'success': True, 'action': 'updated', 'message': 'Reaction updated'})
+                return reaction_changed(poll_id, 'updated', 'Reaction updated')
         else:
-            r = Reaction(poll_id=poll_id, email=email, reaction_type=reaction_type)
+            r = Reaction(poll_id=poll_id, voter_id=voter_id, reaction_type=reaction_type)
             db.session.add(r)
             db.session.commit()
-            return jsonify({'success': True, 'action': 'added', 'message': 'Reaction added successfully'})
+            return reaction_changed(poll_id, 'added', 'Reaction added successfully')
 
 
 @app.route('/export_results/<int:poll_id>')
@@ -578,8 +3735,16 @@ def export_results(poll_id):
     p.drawString(50, height - 80, f"Category: {poll.category}")
     p.drawString(50, height - 100, f"Created: {poll.created_at.strftime('%Y-%m-%d %H:%M')}")
 
-    total_votes = Vote.query.filter_by(poll_id=poll_id).count()
-    p.drawString(50, height - 130, f"Total Votes: {total_votes}")
+    if sync_poll_status(poll) == POLL_CLOSED:
+        snapshot = poll.result_snapshot or freeze_poll_results(poll)
+        summary = snapshot.summary
+    else:
+        option_votes, total_votes = build_option_votes(poll.options, read_poll_tallies(poll_id)[0])
+        tabulation = tabulate_poll(poll, total_votes) if poll.voting_method != SINGLE else None
+        summary = render_results_summary(poll, option_votes, total_votes, tabulation)
+
+    total_line, *result_lines = summary.split("\n")
+    p.drawString(50, height - 130, total_line)
 
     y_position = height - 170
     p.setFont("Helvetica-Bold", 14)
@@ -587,10 +3752,8 @@ def export_results(poll_id):
     y_position -= 30
 
     p.setFont("Helvetica", 11)
-    for option in poll.options:
-        count = Vote.query.filter_by(option_id=option.id).count()
-        percentage = (count / total_votes * 100) if total_votes > 0 else 0
-        p.drawString(60, y_position, f"{option.option_text}: {count} votes ({percentage:.1f}%)")
+    for line in result_lines:
+        p.drawString(60, y_position, line)
         y_position -= 20
         if y_position < 100:
             p.showPage()
@@ -604,8 +3767,9 @@ def export_results(poll_id):
 
 @app.route('/leaderboard')
 def leaderboard():
-    top_voters = db.session.query(User, db.func.count(Vote.id).label('vote_count')) \
-        .join(Vote).group_by(User.id).order_by(db.desc('vote_count')).limit(10).all()
+    # Activity counters include votes on archived polls, which are no longer rows
+    top_voters = db.session.query(User, UserActivity.vote_count).join(UserActivity, UserActivity.user_id == User.id) \
+        .filter(UserActivity.vote_count > 0).order_by(UserActivity.vote_count.desc()).limit(10).all()
 
     top_creators = db.session.query(User, db.func.count(Poll.id).label('poll_count')) \
         .join(Poll, Poll.created_by == User.id).group_by(User.id).order_by(db.desc('poll_count')).limit(10).all()
@@ -613,8 +3777,9 @@ def leaderboard():
     top_commenters = db.session.query(User, db.func.count(Comment.id).label('comment_count')) \
         .join(Comment).group_by(User.id).order_by(db.desc('comment_count')).limit(10).all()
 
-    polls = Poll.query.all()
-    polls_with_votes = [(p, Vote.query.filter_by(poll_id=p.id).count()) for p in polls]
+    query = Poll.query.filter(Poll.status.in_([POLL_OPEN, POLL_CLOSED]))
+    votes = poll_vote_totals(query.with_entities(Poll.id))
+    polls_with_votes = [(p, votes.get(p.id, 0)) for p in query.all()]
     polls_with_votes.sort(key=lambda x: x[1], reverse=True)
     trending_polls = polls_with_votes[:10]
 
@@ -627,29 +3792,79 @@ def leaderboard():
 @login_required
 @admin_required
 def admin_dashboard():
-    total_users = User.query.count()
-    total_polls = Poll.query.count()
-    total_votes = Vote.query.count()
-    total_comments = Comment.query.count()
+    stats = get_global_stats()
+    total_users = stats['users']
+    total_polls = stats['polls']
+    total_votes = stats['votes']
+    total_comments = stats['comments']
     reported_comments = Comment.query.filter_by(is_reported=True).all()
 
-    recent_polls = Poll.query.order_by(Poll.created_at.desc()).limit(5).all()
+    recent_polls = Poll.query.filter(Poll.status != POLL_DELETING).order_by(Poll.created_at.desc()).limit(5).all()
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
 
     return render_template('admin_dashboard.html', total_users=total_users,
                            total_polls=total_polls, total_votes=total_votes,
                            total_comments=total_comments, reported_comments=reported_comments,
-                           recent_polls=recent_polls, recent_users=recent_users)
+                           recent_polls=recent_polls, recent_users=recent_users,
+                           delete_jobs=recent_delete_jobs(), most_viewed=most_viewed_polls())
 
 
 @app.route('/admin/delete_poll/<int:poll_id>', methods=['POST'])
 @login_required
 @admin_required
 def admin_delete_poll(poll_id):
-    poll = Poll.query.get_or_404(poll_id)
-    db.session.delete(poll)
+    Poll.query.get_or_404(poll_id)
+    job = start_poll_delete_job([poll_id])
+    if job:
+        publish_event('poll.deleting', poll_ids=job['poll_ids'])
+        flash('Poll is being deleted in the background', 'success')
+    else:
+        flash('Poll is already being deleted', 'info')
+    return redirect(url_for('admin_dashboard'))
+
+
+@app.route('/admin/delete_polls', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_polls():
+    poll_ids = set(request.form.getlist('poll_ids', type=int))
+    for part in re.split(r'[\s,]+', request.form.get('poll_id_list', '')):
+        if part.isdigit():
+            poll_ids.add(int(part))
+
+    job = start_poll_delete_job(sorted(poll_ids)) if poll_ids else None
+    if job:
+        publish_event('poll.deleting', poll_ids=job['poll_ids'])
+        flash(f"Deleting {len(job['poll_ids'])} polls in the background", 'success')
+    else:
+        flash('No matching polls to delete', 'warning')
+    return redirect(url_for('admin_dashboard'))
+
+
+@app.route('/admin/delete_jobs/<job_id>')
+@login_required
+@admin_required
+def admin_delete_job_status(job_id):
+    job = db.session.get(PollDeleteJob, job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/admin/delete_jobs/<job_id>/retry', methods=['POST'])
+@login_required
+@admin_required
+def admin_retry_delete_job(job_id):
+    result = db.session.execute(
+        db.update(PollDeleteJob).where(PollDeleteJob.id == job_id, PollDeleteJob.state == 'failed')
+        .values(state='queued', attempts=0, retry_at=None, error=None, updated_at=datetime.utcnow())
+    )
     db.session.commit()
-    flash('Poll deleted successfully', 'success')
+    if result.rowcount:
+        queue_poll_delete_job(job_id)
+        flash('Delete job queued again', 'success')
+    else:
+        flash('Only failed delete jobs can be retried', 'warning')
     return redirect(url_for('admin_dashboard'))
 
 
@@ -658,12 +3873,57 @@ def admin_delete_poll(poll_id):
 @admin_required
 def admin_delete_comment(comment_id):
     comment = Comment.query.get_or_404(comment_id)
+    poll_id = comment.poll_id
+    record_comment_sentiment(poll_id, comment.sentiment_score, direction=-1)
     db.session.delete(comment)
     db.session.commit()
+    publish_event('comment.deleted', poll_id=poll_id, comment_id=comment_id)
     flash('Comment deleted successfully', 'success')
     return redirect(url_for('admin_dashboard'))
 
 
+@app.route('/admin/rescore_sentiment', methods=['POST'])
+@login_required
+@admin_required
+def admin_rescore_sentiment():
+    rescored, polls = rescore_all_comments()
+    flash(f'Re-scored {rescored} comments across {polls} polls', 'success')
+    return redirect(url_for('admin_dashboard'))
+
+
+@app.route('/admin/recount_stats', methods=['POST'])
+@login_required
+@admin_required
+def admin_recount_stats():
+    recount_global_stats()
+    recount_user_activity()
+    flash('Platform statistics and user activity recounted', 'success')
+    return redirect(url_for('admin_dashboard'))
+
+
+@app.route('/admin/voter_filters')
+@login_required
+@admin_required
+def admin_voter_filter_stats():
+    return jsonify({'success': True, 'polls': voter_filters.stats()})
+
+
+@app.route('/admin/rebuild_snapshot/<int:poll_id>', methods=['POST'])
+@login_required
+@admin_required
+def admin_rebuild_snapshot(poll_id):
+    poll = Poll.query.get_or_404(poll_id)
+    if sync_poll_status(poll) != POLL_CLOSED:
+        flash('Only closed polls have result snapshots', 'warning')
+        return redirect(url_for('admin_dashboard'))
+    differences = rebuild_result_snapshot(poll)
+    if differences:
+        flash(f'Snapshot rebuilt; corrected: {", ".join(differences)}', 'warning')
+    else:
+        flash('Snapshot matches raw votes', 'success')
+    return redirect(url_for('admin_dashboard'))
+
+
 @app.route('/report_comment/<int:comment_id>', methods=['POST'])
 @login_required
 def report_comment(comment_id):
@@ -685,4 +3945,7 @@ if __name__ == '__main__':
             db.session.add(admin)
             db.session.commit()
             print("Default admin created: admin@polls.com / Admin@123")
+    # The debug reloader runs this block twice; only the serving child starts the scheduler
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Vote Archive Files
+A compact columnar file format for votes moved out of the database. Each
+column is stored in zlib-compressed blocks (ids and timestamps
+delta-encoded first), with a JSON footer describing every block, so a
+memory-mapped reader can decode only the columns and rows it needs.
+
+Layout: block bytes ... | footer JSON | footer length (8 bytes LE) | MAGIC
+"""
+
+import json
+import mmap
+import os
+import zlib
+
+import numpy as np
+
+MAGIC = b'PVA1'
+FORMAT_VERSION = 1
+BLOCK_ROWS = 64 * 1024
+NULL_ID = -1
+
+# Column name -> (dtype, encoding); 'delta' columns are sorted or nearly so within a block
+VOTE_COLUMNS = {
+    'id': ('int64', 'delta'),
+    'poll_id': ('int32', 'delta'),
+    'option_id': ('int32', 'plain'),
+    'user_id': ('int32', 'plain'),
+    'voter_id': ('int32', 'plain'),
+    'timestamp': ('int64', 'delta'),  # microseconds since the epoch, UTC
+    'is_anonymous': ('uint8', 'plain'),
+}
+RANKING_COLUMNS = {
+    'vote_id': ('int64', 'delta'),
+    'poll_id': ('int32', 'delta'),
+    'option_id': ('int32', 'plain'),
+    'rank': ('int16', 'plain'),
+}
+TABLES = {'votes': VOTE_COLUMNS, 'ballot_rankings': RANKING_COLUMNS}
+
+
+class ArchiveFormatError(ValueError):
+    """The file is not a vote archive or is truncated"""
+
+
+def _encode_block(values, dtype, encoding, level):
+    if encoding == 'json':
+        raw = json.dumps(list(values)).encode('utf-8')
+    else:
+        array = np.asarray(values, dtype=dtype)
+        if encoding == 'delta' and len(array):
+            array = np.concatenate([array[:1], np.diff(array)]).astype(dtype)
+        raw = array.tobytes()
+    return zlib.compress(raw, level)
+
+
+def _decode_block(data, dtype, encoding):
+    raw = zlib.decompress(data)
+    if encoding == 'json':
+        return np.array(json.loads(raw.decode('utf-8')), dtype=object)
+    array = np.frombuffer(raw, dtype=dtype)
+    if encoding == 'delta':
+        array = np.cumsum(array, dtype=dtype)
+    return array
+
+
+def write_archive(path, tables, meta=None, block_rows=BLOCK_ROWS, level=6):
+    """
+    Write {table: {column: values}} to path. Every table's columns must be
+    listed in TABLES and have equal lengths. The file appears atomically.
+    """
+    footer = {'version': FORMAT_VERSION, 'meta': meta or {}, 'tables': {}}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp, 'wb') as f:
+        for table, columns in tables.items():
+            schema = TABLES[table]
+            rows = len(next(iter(columns.values()))) if columns else 0
+            table_footer = footer['tables'][table] = {'rows': rows, 'columns': {}}
+            for name, (dtype, encoding) in schema.items():
+                values = columns[name]
+                if len(values) != rows:
+                    raise ValueError(f"{table}.{name} has {len(values)} rows, expected {rows}")
+                blocks = []
+                for start in range(0, rows, block_rows):
+                    data = _encode_block(values[start:start + block_rows], dtype, encoding, level)
+                    blocks.append([f.tell(), len(data), min(block_rows, rows - start)])
+                    f.write(data)
+                table_footer['columns'][name] = {'dtype': dtype, 'encoding': encoding, 'blocks': blocks}
+        encoded = json.dumps(footer).encode('utf-8')
+        f.write(encoded)
+        f.write(len(encoded).to_bytes(8, 'little'))
+        f.write(MAGIC)
+    os.replace(tmp, path)
+
+
+class ArchiveReader:
+    """
+    Memory-mapped read access to one archive file. Rows are sorted by
+    poll_id, so one poll's rows are found with a binary search and only
+    the blocks holding them are decompressed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ArchiveFormatError(f"{path} is empty")
+        if len(self._map) < 12 or self._map[-4:] != MAGIC:
+            self.close()
+            raise ArchiveFormatError(f"{path} is not a vote archive")
+        length = int.from_bytes(self._map[-12:-4], 'little')
+        data_end = len(self._map) - 12 - length
+        try:
+            if data_end < 0:
+                raise ValueError(f"footer of {length} bytes does not fit")
+            self._footer = json.loads(self._map[data_end:-12].decode('utf-8'))
+            # Every block must lie before the footer, or the file was cut or overwritten
+            for table in self._footer['tables'].values():
+                for spec in table['columns'].values():
+                    if any(position + size > data_end for position, size, _ in spec['blocks']):
+                        raise ValueError("a block runs past the data")
+        except (ValueError, KeyError, TypeError) as e:
+            self.close()
+            raise ArchiveFormatError(f"{path} has a corrupt footer: {e}")
+        self._poll_ids = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def meta(self):
+        return self._footer['meta']
+
+    def columns(self, table):
+        """Names of the columns stored for a table, which older files may have more of"""
+        return list(self._footer['tables'][table]['columns'])
+
+    def rows(self, table):
+        return self._footer['tables'][table]['rows']
+
+    def _read(self, table, name, start=0, stop=None):
+        spec = self._footer['tables'][table]['columns'][name]
+        stop = self.rows(table) if stop is None else stop
+        parts, offset = [], 0
+        for position, length, count in spec['blocks']:
+            if offset + count > start and offset < stop:
+                block = _decode_block(self._map[position:position + length], spec['dtype'], spec['encoding'])
+                parts.append(block[max(start - offset, 0):stop - offset])
+            offset += count
+            if offset >= stop:
+                break
+        if not parts:
+            return np.array([], dtype=object if spec['encoding'] == 'json' else spec['dtype'])
+        return np.concatenate(parts)
+
+    def poll_range(self, table, poll_id):
+        """[start, stop) row range of one poll in a table"""
+        poll_ids = self._poll_ids.get(table)
+        if poll_ids is None:
+            poll_ids = self._poll_ids[table] = self._read(table, 'poll_id')
+        return (int(np.searchsorted(poll_ids, poll_id, 'left')),
+                int(np.searchsorted(poll_ids, poll_id, 'right')))
+
+    def read(self, table, columns=None, poll_id=None):
+        """{column: array} for the whole table or for one poll's rows"""
+        start, stop = self.poll_range(table, poll_id) if poll_id is not None else (0, self.rows(table))
+        names = columns or self.columns(table)
+        return {name: self._read(table, name, start, stop) for name in names}
@@ -0,0 +1,284 @@
+"""
+ASGI Entry Point
+Async companion to the Flask app for read-heavy and long-lived requests:
+poll results JSON and live event streams. It shares the models, access
+rules and event bus with app.py but reads through async SQLAlchemy, so an
+open stream costs a coroutine instead of a worker thread.
+
+Run:
+    uvicorn asgi:application --host 0.0.0.0 --port 8001
+
+Route /api/poll/<id>/results and /api/poll/<id>/events to this server in
+the reverse proxy and everything else to the WSGI app; the paths and
+responses match the Flask routes, so either server can answer them. Votes
+are cast on the WSGI workers, so live events only reach this process when
+EVENT_BUS_BACKEND is unix or redis.
+"""
+
+import asyncio
+import json
+import re
+from collections import defaultdict
+from http.cookies import SimpleCookie
+
+from sqlalchemy import select, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import (app as flask_app, db, event_bus, Poll, Option, Vote, PollTally, PollResultSnapshot,
+                 REACTION_TYPES, POLL_CLOSED, POLL_DELETING, POLL_SCHEDULED, LIVE_EVENT_TYPES,
+                 PUBLIC_EVENT_FIELDS, compute_poll_status, build_option_votes, results_payload)
+from tallies import split_counts
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+def async_database_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _engine_url():
+    if flask_app.config['ASYNC_DATABASE_URL']:
+        return async_database_url(flask_app.config['ASYNC_DATABASE_URL'])
+    with flask_app.app_context():
+        # Flask-SQLAlchemy has already resolved relative SQLite paths against the instance folder
+        return async_database_url(db.engine.url)
+
+
+engine = create_async_engine(_engine_url(), pool_size=flask_app.config['ASYNC_DB_POOL_SIZE'], max_overflow=0)
+session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# -------------------- SESSION & ACCESS --------------------
+def session_user_id(scope):
+    """The Flask-Login user id from the signed Flask session cookie, if any"""
+    headers = dict(scope['headers'])
+    cookie = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+    morsel = cookie.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if morsel is None or session_serializer is None:
+        return None
+    max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+    try:
+        data = session_serializer.loads(morsel.value, max_age=max_age)
+    except Exception:
+        return None
+    user_id = data.get('_user_id')
+    return int(user_id) if user_id is not None else None
+
+
+async def load_visible_poll(conn, poll_id, user_id, results=False):
+    """The poll row and its effective status, applying the same visibility rules as the Flask routes"""
+    poll = (await conn.execute(
+        select(Poll.id, Poll.status, Poll.is_masked, Poll.created_by, Poll.scheduled_for, Poll.expires_at)
+        .where(Poll.id == poll_id))).first()
+    if poll is None or poll.status == POLL_DELETING:
+        raise HTTPError(404, 'Poll not found')
+
+    # Catch up with the clock without writing; the scheduler or the Flask app records the transition
+    status = poll.status if poll.status == POLL_CLOSED else compute_poll_status(poll.scheduled_for, poll.expires_at)
+    is_creator = user_id is not None and user_id == poll.created_by
+    if status == POLL_SCHEDULED and not is_creator:
+        raise HTTPError(404, 'Poll not found')
+    if results and poll.is_masked and status != POLL_CLOSED and not is_creator:
+        voted = user_id is not None and (await conn.execute(
+            select(Vote.id).where(Vote.poll_id == poll_id, Vote.user_id == user_id).limit(1))).first() is not None
+        if not voted:
+            raise HTTPError(403, 'Results are hidden until you vote')
+    return poll, status
+
+
+# -------------------- RESULTS --------------------
+async def read_results(conn, poll_id, status):
+    options = (await conn.execute(
+        select(Option.id, Option.option_text).where(Option.poll_id == poll_id).order_by(Option.id))).all()
+
+    snapshot = None
+    if status == POLL_CLOSED:
+        snapshot = (await conn.execute(
+            select(PollResultSnapshot.option_counts, PollResultSnapshot.reactions)
+            .where(PollResultSnapshot.poll_id == poll_id))).first()
+
+    reactions = {rt: 0 for rt in REACTION_TYPES}
+    if snapshot is not None:
+        option_counts = {int(option_id): count for option_id, count in snapshot.option_counts.items()}
+        reactions.update(snapshot.reactions)
+    else:
+        # A poll closed moments ago may not have its snapshot yet; its tallies are still exact
+        rows = await conn.execute(select(PollTally.counter, func.sum(PollTally.count))
+                                  .where(PollTally.poll_id == poll_id).group_by(PollTally.counter))
+        option_counts, reaction_counts = split_counts(dict(rows.all()))
+        reactions.update(reaction_counts)
+
+    option_votes, total_votes = build_option_votes(options, option_counts)
+    return results_payload(poll_id, status, options, option_votes, total_votes, reactions)
+
+
+async def poll_results(scope, receive, send, poll_id):
+    user_id = session_user_id(scope)
+    async with engine.connect() as conn:
+        _, status = await load_visible_poll(conn, poll_id, user_id, results=True)
+        payload = await read_results(conn, poll_id, status)
+    await send_json(send, 200, payload)
+
+
+# -------------------- LIVE STREAMS --------------------
+class LiveHub:
+    """
+    One event bus subscription for the whole process, fanned out to an
+    asyncio queue per open stream. Bus handlers run on the bus thread, so
+    events are handed to the event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.watchers = defaultdict(set)
+        self.loop = None
+        self._unsubscribe = None
+
+    def attach(self, loop):
+        self.loop = loop
+        self._unsubscribe = event_bus.subscribe(self._from_bus, LIVE_EVENT_TYPES)
+
+    def detach(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _from_bus(self, event):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event):
+        public = {field: event[field] for field in PUBLIC_EVENT_FIELDS if field in event}
+        poll_ids = event.get('poll_ids') or [event.get('poll_id')]
+        for poll_id in poll_ids:
+            for queue in self.watchers.get(poll_id, ()):
+                try:
+                    queue.put_nowait({**public, 'poll_id': poll_id})
+                except asyncio.QueueFull:
+                    pass  # A client this far behind reloads the page anyway
+
+    def watch(self, poll_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.watchers[poll_id].add(queue)
+        return queue
+
+    def unwatch(self, poll_id, queue):
+        watchers = self.watchers.get(poll_id)
+        if watchers is not None:
+            watchers.discard(queue)
+            if not watchers:
+                del self.watchers[poll_id]
+
+    def stats(self):
+        return {'polls': len(self.watchers), 'streams': sum(len(w) for w in self.watchers.values())}
+
+
+hub = LiveHub(flask_app.config['EVENT_STREAM_QUEUE_SIZE'])
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def poll_events(scope, receive, send, poll_id):
+    async with engine.connect() as conn:
+        await load_visible_poll(conn, poll_id, session_user_id(scope))
+
+    loop = asyncio.get_running_loop()
+    heartbeat = flask_app.config['EVENT_STREAM_HEARTBEAT_SECONDS']
+    deadline = loop.time() + flask_app.config['EVENT_STREAM_MAX_SECONDS']
+    queue = hub.watch(poll_id)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        # Browsers reconnect on their own once the stream ends
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        while loop.time() < deadline:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, disconnected}, timeout=heartbeat,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                getter.cancel()
+                return
+            if getter in done:
+                event = getter.result()
+                chunk = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                getter.cancel()
+                chunk = ': keepalive\n\n'
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        disconnected.cancel()
+        hub.unwatch(poll_id, queue)
+
+
+async def live_stats(scope, receive, send):
+    await send_json(send, 200, {'success': True, **hub.stats()})
+
+
+# -------------------- ASGI APPLICATION --------------------
+ROUTES = [
+    (re.compile(r'^/api/poll/(?P<poll_id>\d+)/results$'), poll_results),
+    (re.compile(r'^/api/poll/(?P<poll_id>\d+)/events$'), poll_events),
+    (re.compile(r'^/api/live/stats$'), live_stats),
+]
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('ascii')),
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            hub.attach(asyncio.get_running_loop())
+            event_bus.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            hub.detach()
+            event_bus.close()
+            await engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    if scope['method'] not in ('GET', 'HEAD'):
+        return await send_json(send, 405, {'success': False, 'message': 'Method not allowed'})
+    for pattern, handler in ROUTES:
+        match = pattern.match(scope['path'])
+        if match:
+            try:
+                return await handler(scope, receive, send, **{k: int(v) for k, v in match.groupdict().items()})
+            except HTTPError as e:
+                return await send_json(send, e.status, {'success': False, 'message': e.message})
+    return await send_json(send, 404, {'success': False, 'message': 'Not found'})
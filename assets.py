@@ -0,0 +1,113 @@
+"""
+Static Asset Bundles
+Builds content-hashed CSS / JS bundles from static/src into static/dist,
+with pre-compressed .gz / .br variants and a manifest.json that templates
+resolve bundle names through
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:  # Optional: bundles are then only pre-compressed with gzip
+    brotli = None
+
+SOURCE_DIR = 'src'
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Bundle name -> source files (relative to static/src), concatenated in order
+BUNDLES = {
+    'app.css': ['css/base.css', 'css/index.css'],
+    'leaderboard.css': ['css/leaderboard.css'],
+    'index.js': ['js/index.js'],
+    'view_poll.js': ['js/view_poll.js'],
+    'create_poll.js': ['js/create_poll.js'],
+    'register.js': ['js/register.js'],
+    'admin_dashboard.js': ['js/admin_dashboard.js'],
+    'embed.css': ['css/embed.css'],
+    'embed.js': ['js/embed.js'],
+}
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_bundles(static_folder, bundles=BUNDLES, precompress=True):
+    """Write every bundle (and its compressed variants) to static/dist; returns the manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+    manifest = {}
+    for name, sources in bundles.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, SOURCE_DIR, source), 'rb') as f:
+                parts.append(f.read())
+        content = b'\n'.join(parts)
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        path = os.path.join(dist, filename)
+
+        if not os.path.exists(path):
+            _write_atomic(path, content)
+        if precompress:
+            # mtime=0 keeps the .gz byte-identical across builds
+            _write_atomic(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_atomic(path + '.br', brotli.compress(content, quality=11))
+        manifest[name] = filename
+
+    _write_atomic(os.path.join(dist, MANIFEST_NAME), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+class AssetManifest:
+    """
+    Maps bundle names to hashed file names under static/dist.
+
+    Without a built manifest the bundles are built on first use. While
+    watch() returns True (e.g. debug mode) they are rebuilt whenever a
+    source file is newer than the manifest.
+    """
+
+    def __init__(self, static_folder, bundles=BUNDLES, watch=None):
+        self.static_folder = static_folder
+        self.bundles = bundles
+        self.watch = watch
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.static_folder, DIST_DIR, MANIFEST_NAME)
+
+    def _stale(self):
+        try:
+            built = os.path.getmtime(self.path)
+        except OSError:
+            return True
+        return any(os.path.getmtime(os.path.join(self.static_folder, SOURCE_DIR, source)) > built
+                   for sources in self.bundles.values() for source in sources)
+
+    def _load(self):
+        with self._lock:
+            if self._manifest is not None and not (self.watch and self.watch() and self._stale()):
+                return self._manifest
+            if self._stale():
+                self._manifest = build_bundles(self.static_folder, self.bundles, precompress=False)
+            else:
+                with open(self.path, encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            return self._manifest
+
+    def filename(self, name):
+        """Hashed file name of a bundle inside static/dist, e.g. app.1a2b3c4d5e6f.css"""
+        return self._load()[name]
@@ -0,0 +1,184 @@
+"""
+ASGI Load Test
+Starts the async app (asgi.py) under uvicorn on a scratch SQLite database,
+holds thousands of live event streams open against one poll, publishes
+votes on the unix event bus and measures how long each event takes to
+reach every watcher. It then measures results endpoint throughput.
+
+Usage:
+    python bench_asgi.py [--watchers 2000] [--events 20] [--concurrency 100] [--seconds 5]
+
+Needs uvicorn and aiosqlite. Every watcher is one socket, so raise the
+open-file limit (ulimit -n) above --watchers.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from app import db, User, Poll, Option, PollTally, option_counter
+from events import UnixSocketEventBus
+
+
+def setup_database(path, num_options=4):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(db.insert(User.__table__).values(
+            name='Bench', email='bench@example.com', password_hash='x')).inserted_primary_key[0]
+        poll_id = conn.execute(db.insert(Poll.__table__).values(
+            title='Watched poll', created_by=user_id, category='General', status='open')).inserted_primary_key[0]
+        for i in range(num_options):
+            option_id = conn.execute(db.insert(Option.__table__).values(
+                poll_id=poll_id, option_text=f'Option {i}')).inserted_primary_key[0]
+            conn.execute(db.insert(PollTally.__table__).values(
+                poll_id=poll_id, counter=option_counter(option_id), shard=0, count=100 * (i + 1)))
+    engine.dispose()
+    return poll_id
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("uvicorn did not start")
+
+
+class Watcher:
+    def __init__(self):
+        self.arrivals = []
+        self.ready = asyncio.Event()
+
+    async def run(self, port, poll_id, stop):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET /api/poll/{poll_id}/events HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        await writer.drain()
+        buffer = b''
+        while not stop.is_set():
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            if b'retry:' in buffer:
+                self.ready.set()
+            # Chunked framing may split a line, so count only complete markers and keep the tail
+            while b'event: vote.cast' in buffer:
+                self.arrivals.append(time.perf_counter())
+                buffer = buffer.split(b'event: vote.cast', 1)[1]
+            buffer = buffer[-64:]
+        writer.close()
+
+
+async def watch_and_publish(port, poll_id, socket_dir, num_watchers, num_events, server_pid):
+    stop = asyncio.Event()
+    watchers = [Watcher() for _ in range(num_watchers)]
+    tasks = [asyncio.ensure_future(w.run(port, poll_id, stop)) for w in watchers]
+    started = time.perf_counter()
+    await asyncio.wait_for(asyncio.gather(*(w.ready.wait() for w in watchers)), 120)
+    print(f"{num_watchers} streams open in {time.perf_counter() - started:.2f}s; "
+          f"server RSS {rss_mb(server_pid):.1f} MB")
+
+    bus = UnixSocketEventBus(socket_dir)
+    spreads = []
+    for i in range(num_events):
+        sent = time.perf_counter()
+        bus.publish('vote.cast', poll_id=poll_id)
+        deadline = time.perf_counter() + 10
+        while sum(len(w.arrivals) > i for w in watchers) < num_watchers and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+        arrived = [w.arrivals[i] - sent for w in watchers if len(w.arrivals) > i]
+        spreads.append((len(arrived), statistics.median(arrived) if arrived else None, max(arrived, default=None)))
+        await asyncio.sleep(0.05)
+    bus.close()
+
+    delivered = sum(n for n, _, _ in spreads)
+    medians = [m for _, m, _ in spreads if m is not None]
+    worst = [m for _, _, m in spreads if m is not None]
+    print(f"Fan-out: {delivered}/{num_events * num_watchers} deliveries; "
+          f"median {statistics.median(medians) * 1000:.1f} ms, "
+          f"last watcher {statistics.median(worst) * 1000:.1f} ms (median over events), "
+          f"worst {max(worst) * 1000:.1f} ms")
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _results_client(port, poll_id, deadline, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = f'GET /api/poll/{poll_id}/results HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(request)
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = int(next(line.split(b':')[1] for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length')))
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def results_load(port, poll_id, concurrency, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(_results_client(port, poll_id, deadline, latencies) for _ in range(concurrency)))
+    latencies.sort()
+    print(f"Results API: {len(latencies) / seconds:.0f} req/s with {concurrency} connections; "
+          f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--watchers', type=int, default=2000)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-asgi-')
+    socket_dir = os.path.join(workdir, 'events')
+    db_path = os.path.join(workdir, 'bench.db')
+    poll_id = setup_database(db_path)
+
+    env = dict(os.environ, ASYNC_DATABASE_URL=f'sqlite:///{db_path}', EVENT_BUS_BACKEND='unix',
+               EVENT_BUS_SOCKET_DIR=socket_dir, SCHEDULER_ENABLED='false')
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'asgi:application', '--port', str(args.port),
+                               '--log-level', 'warning', '--backlog', str(max(2048, args.watchers))],
+                              env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        wait_for_port(args.port)
+        print(f"uvicorn pid {server.pid}, idle RSS {rss_mb(server.pid):.1f} MB")
+        asyncio.run(watch_and_publish(args.port, poll_id, socket_dir, args.watchers, args.events, server.pid))
+        asyncio.run(results_load(args.port, poll_id, args.concurrency, args.seconds))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
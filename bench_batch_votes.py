@@ -0,0 +1,118 @@
+"""
+Batch Vote Benchmark
+Creates a survey of polls on a running server through the bulk import API,
+then has guest voters answer it two ways: one POST /vote/<id> per poll, and
+one POST /api/votes/batch per voter. Reports voters and votes per second
+for each and the speedup of the batch endpoint.
+
+Usage:
+    python bench_batch_votes.py [--base-url http://localhost:5000] [--polls 20] [--voters 50]
+                                [--email admin@polls.com --password Admin@123]
+
+Every run votes with fresh guest emails, so it can be repeated against the
+same database.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import random
+import time
+import urllib.parse
+import urllib.request
+import uuid
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def opener(cookies=None):
+    handlers = [NoRedirect()]
+    if cookies is not None:
+        handlers.append(urllib.request.HTTPCookieProcessor(cookies))
+    return urllib.request.build_opener(*handlers)
+
+
+def post(client, url, data=None, json_body=None):
+    if json_body is not None:
+        request = urllib.request.Request(url, data=json.dumps(json_body).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+    else:
+        request = urllib.request.Request(url, data=urllib.parse.urlencode(data, doseq=True).encode('utf-8'))
+    try:
+        with client.open(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        # Form posts answer with a redirect, which is the success case here
+        return e.code, e.read()
+
+
+def create_survey(base_url, email, password, num_polls, num_options):
+    admin = opener(http.cookiejar.CookieJar())
+    status, _ = post(admin, f'{base_url}/login', {'email': email, 'password': password})
+    if status != 302:
+        raise SystemExit(f"Login as {email} failed (HTTP {status})")
+
+    tag = uuid.uuid4().hex[:8]
+    records = [{'title': f'Survey {tag} question {i}', 'options': [f'Answer {j}' for j in range(num_options)]}
+               for i in range(num_polls)]
+    status, body = post(admin, f'{base_url}/api/polls/bulk', json_body=records)
+    if status != 201:
+        raise SystemExit(f"Creating the survey failed (HTTP {status}): {body[:200]}")
+
+    survey = {}
+    for poll_id in json.loads(body)['created']:
+        with urllib.request.urlopen(f'{base_url}/api/poll/{poll_id}/results') as response:
+            survey[poll_id] = [option['id'] for option in json.load(response)['options']]
+    return survey
+
+
+def sequential_votes(base_url, survey, email):
+    client = opener()
+    for poll_id, option_ids in survey.items():
+        status, _ = post(client, f'{base_url}/vote/{poll_id}',
+                         {'email': email, 'option_id': random.choice(option_ids)})
+        if status != 302:
+            raise SystemExit(f"Vote on poll {poll_id} failed (HTTP {status})")
+
+
+def batch_votes(base_url, survey, email):
+    votes = [{'poll_id': poll_id, 'option_id': random.choice(option_ids)} for poll_id, option_ids in survey.items()]
+    status, body = post(opener(), f'{base_url}/api/votes/batch', json_body={'email': email, 'votes': votes})
+    if status != 200 or json.loads(body)['recorded'] != len(votes):
+        raise SystemExit(f"Batch vote failed (HTTP {status}): {body[:200]}")
+
+
+def run(label, submit, base_url, survey, num_voters):
+    tag = uuid.uuid4().hex[:8]
+    started = time.perf_counter()
+    for i in range(num_voters):
+        submit(base_url, survey, f'bench-{tag}-{i}@example.com')
+    elapsed = time.perf_counter() - started
+    voters_per_s = num_voters / elapsed
+    print(f"{label:<12} {num_voters} voters x {len(survey)} polls in {elapsed:.2f}s: "
+          f"{voters_per_s:.1f} voters/s, {voters_per_s * len(survey):.0f} votes/s")
+    return voters_per_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--polls', type=int, default=20)
+    parser.add_argument('--options', type=int, default=4)
+    parser.add_argument('--voters', type=int, default=50)
+    parser.add_argument('--email', default='admin@polls.com')
+    parser.add_argument('--password', default='Admin@123')
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    survey = create_survey(base_url, args.email, args.password, args.polls, args.options)
+    sequential = run('sequential', sequential_votes, base_url, survey, args.voters)
+    batch = run('batch', batch_votes, base_url, survey, args.voters)
+    print(f"Batch endpoint: {batch / sequential:.1f}x the voters per second of sequential votes")
+
+
+if __name__ == '__main__':
+    main()
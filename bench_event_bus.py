@@ -0,0 +1,169 @@
+"""
+Event Bus Delivery Benchmark
+Measures publish-to-handler latency and sustained throughput of each event
+bus backend, with the subscriber in a separate process as it would be in a
+multi-worker deployment.
+
+Usage:
+    python bench_event_bus.py [--backends local,unix,redis] [--events 20000] [--redis-url URL]
+
+The local backend delivers inside the publishing process. The redis backend
+needs --redis-url; without it, fakeredis is used in-process when installed
+and the backend is skipped otherwise.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from events import EventBus, UnixSocketEventBus, RedisEventBus
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'p50': None, 'p99': None, 'max': None}
+    return {
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'max': latencies[-1],
+    }
+
+
+class Collector:
+    """Subscriber side: records latency per event and signals when the end marker arrives"""
+
+    def __init__(self, bus):
+        self.latencies = []
+        self.first = self.last = None
+        self.done = threading.Event()
+        bus.subscribe(self.on_event)
+
+    def on_event(self, event):
+        now = time.time()
+        if event['type'] == 'bench.end':
+            self.done.set()
+            return
+        self.first = self.first or now
+        self.last = now
+        self.latencies.append(now - event['ts'])
+
+    def report(self):
+        return {'received': len(self.latencies), 'first': self.first, 'last': self.last,
+                **summarize(self.latencies)}
+
+
+def _child(make_bus, conn, timeout):
+    bus = make_bus()
+    collector = Collector(bus)
+    bus.start()
+    conn.send('ready')
+    collector.done.wait(timeout)
+    conn.send(collector.report())
+    bus.close()
+
+
+def publish(bus, count, interval):
+    start = time.time()
+    for i in range(count):
+        bus.publish('vote.cast', poll_id=1, seq=i)
+        if interval:
+            time.sleep(interval)
+    return start, time.time()
+
+
+def finish(bus):
+    # Repeat the end marker in case a datagram is dropped under load
+    for _ in range(5):
+        bus.publish('bench.end')
+        time.sleep(0.05)
+
+
+def run_remote(make_bus, count, interval, timeout=60):
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_child, args=(make_bus, child, timeout))
+    proc.start()
+    parent.recv()
+    bus = make_bus()
+    start, end = publish(bus, count, interval)
+    finish(bus)
+    report = parent.recv()
+    proc.join()
+    bus.close()
+    return start, end, report
+
+
+def run_in_process(make_publisher, make_subscriber, count, interval, timeout=60):
+    subscriber = make_subscriber()
+    collector = Collector(subscriber)
+    subscriber.start()
+    publisher = make_publisher() if make_publisher else subscriber
+    start, end = publish(publisher, count, interval)
+    finish(publisher)
+    collector.done.wait(timeout)
+    report = collector.report()
+    subscriber.close()
+    if publisher is not subscriber:
+        publisher.close()
+    return start, end, report
+
+
+def print_row(name, phase, count, start, end, report):
+    delivered = report['received']
+    elapsed = (report['last'] or end) - start
+    rate = delivered / elapsed if elapsed > 0 else float('inf')
+    ms = lambda v: f"{v * 1000:.3f}" if v is not None else '-'
+    print(f"{name:<10} {phase:<11} {delivered:>8}/{count:<8} {rate:>12.0f} "
+          f"{ms(report['p50']):>10} {ms(report['p99']):>10} {ms(report['max']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default='local,unix,redis')
+    parser.add_argument('--events', type=int, default=20000, help='events in the throughput run')
+    parser.add_argument('--latency-events', type=int, default=2000, help='paced events in the latency run')
+    parser.add_argument('--interval-ms', type=float, default=0.5, help='gap between latency-run events')
+    parser.add_argument('--redis-url')
+    args = parser.parse_args()
+
+    # Dropped datagrams are reported in the delivered column rather than logged one by one
+    logging.basicConfig(level=logging.ERROR)
+    socket_dir = tempfile.mkdtemp(prefix='bench-events-')
+
+    print(f"{'backend':<10} {'run':<11} {'delivered':>17} {'events/s':>12} "
+          f"{'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    try:
+        for backend in args.backends.split(','):
+            runs = [('throughput', args.events, 0), ('latency', args.latency_events, args.interval_ms / 1000)]
+            for phase, count, interval in runs:
+                name = backend
+                if backend == 'local':
+                    result = run_in_process(None, EventBus, count, interval)
+                elif backend == 'unix':
+                    result = run_remote(lambda: UnixSocketEventBus(socket_dir), count, interval)
+                elif backend == 'redis' and args.redis_url:
+                    result = run_remote(lambda: RedisEventBus(args.redis_url), count, interval)
+                elif backend == 'redis':
+                    try:
+                        import fakeredis
+                    except ImportError:
+                        print(f"{'redis':<10} skipped: pass --redis-url or install fakeredis")
+                        break
+                    server = fakeredis.FakeServer()
+                    make = lambda: RedisEventBus(client=fakeredis.FakeStrictRedis(server=server))
+                    result = run_in_process(make, make, count, interval)
+                    name = 'fakeredis'
+                else:
+                    parser.error(f"unknown backend: {backend}")
+                print_row(name, phase, count, *result)
+    finally:
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Page Weight Measurement
+Fetches pages from a running server and reports the bytes on the wire for
+the HTML plus every same-origin stylesheet and script it references, for a
+first visit and for a repeat visit where immutable bundles are cached.
+
+Usage:
+    python bench_page_bytes.py [--base-url http://localhost:5000] [--path / --path /poll/1]
+"""
+
+import argparse
+import re
+import urllib.request
+
+ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+\.(?:css|js))"')
+ENCODINGS = [('identity', 'identity'), ('gzip', 'gzip'), ('br', 'br, gzip')]
+
+
+def fetch(url, accept_encoding):
+    request = urllib.request.Request(url, headers={'Accept-Encoding': accept_encoding})
+    with urllib.request.urlopen(request) as response:
+        # urllib does not decode Content-Encoding, so this is the wire size
+        return response.read(), response.headers
+
+
+def measure(base_url, path, accept_encoding):
+    html, headers = fetch(base_url + path, accept_encoding)
+    page = html
+    if headers.get('Content-Encoding') in ('gzip', 'br'):
+        # Asset links have to be read from the decoded page
+        page, _ = fetch(base_url + path, 'identity')
+    first = repeat = len(html)
+    for asset in sorted(set(ASSET_RE.findall(page.decode('utf-8')))):
+        body, asset_headers = fetch(base_url + asset, accept_encoding)
+        first += len(body)
+        if 'immutable' not in (asset_headers.get('Cache-Control') or ''):
+            repeat += len(body)
+    return len(html), headers.get('Content-Encoding') or 'identity', first, repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--path', action='append', dest='paths')
+    args = parser.parse_args()
+
+    print(f"{'path':<12} {'accept':<10} {'served as':<10} {'html':>9} {'first visit':>12} {'repeat visit':>13}")
+    for path in args.paths or ['/', '/poll/1']:
+        for label, accept in ENCODINGS:
+            html, served, first, repeat = measure(args.base_url.rstrip('/'), path, accept)
+            print(f"{path:<12} {label:<10} {served:<10} {html:>9} {first:>12} {repeat:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Ballot Tabulation Benchmark
+Times the vectorized instant-runoff, Borda and approval counts on synthetic
+ballots, including building the preference matrix from flat ranking rows.
+Unless --skip-load is given, a share of the ballots is also stored in a
+scratch SQLite database and read back through load_ballot_matrix, the path
+a results page takes before it can tabulate.
+
+Usage:
+    python bench_tabulation.py [--ballots 1000000] [--options 10] [--load-ballots 100000] [--skip-load]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from tabulation import IRV, BORDA, APPROVAL, ballot_matrix, tabulate
+
+
+def synthetic_rankings(num_ballots, num_options, seed=0):
+    """Flat (ballot_id, rank, column) arrays with a mild preference skew and partial rankings"""
+    rng = np.random.default_rng(seed)
+    skew = np.linspace(0, 0.5, num_options)
+    prefs = np.argsort(rng.random((num_ballots, num_options)) + skew, axis=1).astype(np.int32)
+    lengths = rng.integers(1, num_options + 1, num_ballots)
+    keep = np.arange(num_options)[np.newaxis, :] < lengths[:, np.newaxis]
+    ballot_ids = np.broadcast_to(np.arange(num_ballots)[:, np.newaxis], prefs.shape)[keep]
+    ranks = np.broadcast_to(np.arange(num_options)[np.newaxis, :], prefs.shape)[keep]
+    return ballot_ids, ranks, prefs[keep]
+
+
+def time_load(ballot_ids, ranks, columns, num_options):
+    """Store the rankings as ballot rows of one ranked poll and time reading them back into a matrix"""
+    # The app reads its database from the environment at import time
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    from app import app, db, User, Poll, Option, Vote, BallotRanking, load_ballot_matrix
+    from tabulation import IRV
+
+    with app.app_context():
+        db.create_all()
+        user = User(name='Bench', email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        poll = Poll(title='Ranked bench poll', created_by=user.id, voting_method=IRV, status='closed')
+        db.session.add(poll)
+        db.session.flush()
+        options = [Option(poll_id=poll.id, option_text=f'Option {i}') for i in range(num_options)]
+        db.session.add_all(options)
+        db.session.flush()
+        option_ids = np.array([option.id for option in options])
+
+        # Core inserts: the ORM listeners are not what is being measured here
+        start = time.perf_counter()
+        first = ranks == 0
+        vote_ids = ballot_ids + 1
+        db.session.execute(db.insert(Vote.__table__), [
+            {'id': int(v), 'poll_id': poll.id, 'option_id': int(o)}
+            for v, o in zip(vote_ids[first], option_ids[columns[first]])
+        ])
+        db.session.execute(db.insert(BallotRanking.__table__), [
+            {'vote_id': int(v), 'poll_id': poll.id, 'option_id': int(o), 'rank': int(r)}
+            for v, o, r in zip(vote_ids, option_ids[columns], ranks)
+        ])
+        db.session.commit()
+        print(f"{'store':>14}: {time.perf_counter() - start:.3f}s "
+              f"({int(first.sum())} ballots, {len(columns)} ranking rows in SQLite)")
+
+        start = time.perf_counter()
+        matrix = load_ballot_matrix(poll, sorted(option_ids.tolist()))
+        print(f"{'load':>14}: {time.perf_counter() - start:.3f}s, matrix {matrix.shape}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=1_000_000)
+    parser.add_argument('--options', type=int, default=10)
+    parser.add_argument('--load-ballots', type=int, default=100_000)
+    parser.add_argument('--skip-load', action='store_true')
+    args = parser.parse_args()
+
+    ballot_ids, ranks, columns = synthetic_rankings(args.ballots, args.options)
+    print(f"{args.ballots} ballots, {args.options} options, {len(columns)} ranking rows")
+
+    start = time.perf_counter()
+    matrix, _ = ballot_matrix(ballot_ids, ranks, columns, max_rank=args.options)
+    print(f"{'matrix build':>14}: {time.perf_counter() - start:.3f}s")
+
+    option_ids = list(range(1, args.options + 1))
+    for method in (IRV, BORDA, APPROVAL):
+        start = time.perf_counter()
+        result = tabulate(method, matrix, option_ids)
+        print(f"{method:>14}: {time.perf_counter() - start:.3f}s, "
+              f"{len(result['rounds'])} round(s), winner option {result['winner']}")
+
+    if not args.skip_load:
+        print(f"\nLoad path, {args.load_ballots} ballots")
+        time_load(*synthetic_rankings(args.load_ballots, args.options), args.options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Vote Write Contention Benchmark
+Casts votes on a single hot poll from several threads through the real
+write path: an ORM Vote insert and commit, with every mapper listener
+(tallies, rollups, global stats, user activity) firing. Each thread count
+runs twice: once writing every counter through in the vote transaction
+with a single tally row, and once with the tally spread over N shards and
+the stat / rollup / activity counters buffered and flushed in the
+background.
+
+Usage:
+    python bench_tallies.py [--database-url URL] [--shards 16] [--seconds 3] [--threads 1,2,4,8]
+
+SQLite serialises every writer on one database lock, so the gain there is
+only the smaller transactions; point --database-url at PostgreSQL to see
+the row-lock contention that shards and buffering remove.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def setup(num_threads):
+    from app import app, db, User, Poll, Option, recount_global_stats
+
+    with app.app_context():
+        db.create_all()
+        tag = time.time_ns()
+        author = User(name='Bench', email=f'bench-{tag}@example.com', password_hash='x')
+        voters = [User(name=f'Voter {i}', email=f'voter-{tag}-{i}@example.com', password_hash='x')
+                  for i in range(num_threads)]
+        db.session.add_all([author, *voters])
+        db.session.flush()
+        polls = {}
+        for mode in ('write-through', 'buffered'):
+            poll = Poll(title=f'Hot poll ({mode})', created_by=author.id, category='General', status='open')
+            db.session.add(poll)
+            db.session.flush()
+            option = Option(poll_id=poll.id, option_text='A')
+            db.session.add(option)
+            db.session.flush()
+            polls[mode] = (poll.id, option.id)
+        db.session.commit()
+        recount_global_stats()
+        return polls, [voter.id for voter in voters]
+
+
+def run(poll_id, option_id, voter_ids, threads, seconds):
+    from sqlalchemy.exc import OperationalError
+    from app import app, db, Vote
+
+    done = [0] * threads
+    failed = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                db.session.add(Vote(poll_id=poll_id, option_id=option_id, user_id=voter_ids[i]))
+                try:
+                    db.session.commit()
+                    done[i] += 1
+                except OperationalError:
+                    # SQLite gives up on its write lock after the busy timeout
+                    db.session.rollback()
+                    failed[i] += 1
+            db.session.remove()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(done) / seconds, sum(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--threads', default='1,2,4,8')
+    args = parser.parse_args()
+
+    # The app reads its database from the environment at import time
+    os.environ['DATABASE_URL'] = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ['SCHEDULER_ENABLED'] = 'true'
+    from app import app, db, Poll, PollTally, GlobalStat, flush_counters, lifecycle_scheduler
+
+    thread_counts = [int(t) for t in args.threads.split(',')]
+    polls, voter_ids = setup(max(thread_counts))
+    with app.app_context():
+        db.session.execute(db.update(Poll).where(Poll.id == polls['buffered'][0]).values(tally_shards=args.shards))
+        db.session.commit()
+        print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+    # Never promote the write-through poll, so it keeps its single tally row
+    app.config['TALLY_SHARD_WRITE_RATE'] = float('inf')
+    # The buffer is only used while the scheduler thread is there to flush it
+    lifecycle_scheduler.start()
+
+    print(f"{'threads':>8} {'write-through (votes/s)':>24} {f'{args.shards} shards + buffer (votes/s)':>30} "
+          f"{'speedup':>9}")
+    for threads in thread_counts:
+        app.config['COUNTER_BUFFER_ENABLED'] = False
+        single, single_failed = run(*polls['write-through'], voter_ids, threads, args.seconds)
+        app.config['COUNTER_BUFFER_ENABLED'] = True
+        buffered, buffered_failed = run(*polls['buffered'], voter_ids, threads, args.seconds)
+        failures = f"  ({single_failed} / {buffered_failed} lock timeouts)" if single_failed or buffered_failed else ''
+        print(f"{threads:>8} {single:>24.0f} {buffered:>30.0f} {buffered / single:>8.2f}x{failures}")
+
+    lifecycle_scheduler.stop()
+    with app.app_context():
+        flush_counters()
+        poll_ids = [poll_id for poll_id, _ in polls.values()]
+        tallied = db.session.query(db.func.sum(PollTally.count)).filter(PollTally.poll_id.in_(poll_ids)).scalar()
+        votes = db.session.get(GlobalStat, 'votes').value
+    print(f"\nTallied votes across shards: {tallied}; global vote counter after the final flush: {votes}")
+
+
+if __name__ == '__main__':
+    main()
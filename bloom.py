@@ -0,0 +1,191 @@
+"""
+Bloom Filters
+Per-poll membership filters for guest voter keys. A negative answer is
+exact, so definitely-new voters can skip the duplicate lookup; a positive
+answer only means "maybe" and falls back to the database.
+"""
+
+import hashlib
+import math
+import threading
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(x):
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _hash_pair(key):
+    """Two independent 64-bit hashes for double hashing"""
+    if isinstance(key, int):
+        h1 = _splitmix64(key & _MASK64)
+        return h1, _splitmix64(h1) | 1
+    digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` keys at `error_rate`"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        h1, h2 = _hash_pair(key)
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+    def estimated_fp_rate(self):
+        """(1 - e^(-kn/m))^k for the keys added so far"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class ScalableBloomFilter:
+    """
+    Grows by adding filters of doubling capacity and tightening error rate,
+    so the overall false-positive rate stays near `error_rate` however
+    many voters a poll ends up with.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity=1000, error_rate=0.01):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(initial_capacity, error_rate * (1 - self.TIGHTENING))]
+
+    def add(self, key):
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * self.GROWTH, current.error_rate * self.TIGHTENING)
+            self.filters.append(current)
+        current.add(key)
+
+    def __contains__(self, key):
+        return any(key in f for f in self.filters)
+
+    @property
+    def count(self):
+        return sum(f.count for f in self.filters)
+
+    @property
+    def memory_bytes(self):
+        return sum(f.memory_bytes for f in self.filters)
+
+    def estimated_fp_rate(self):
+        miss = 1.0
+        for f in self.filters:
+            miss *= 1 - f.estimated_fp_rate()
+        return 1 - miss
+
+
+class VoterFilterRegistry:
+    """
+    One ScalableBloomFilter per poll plus lookup outcome counters.
+
+    loader(poll_id) must return an iterable of every voter key already
+    recorded for the poll; it is used the first time a poll is touched.
+    """
+
+    def __init__(self, loader, initial_capacity=1000, error_rate=0.01):
+        self._loader = loader
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self._filters = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _new_stats(self):
+        return {'checks': 0, 'definitely_new': 0, 'possible_duplicates': 0, 'false_positives': 0}
+
+    def build(self, poll_id, keys):
+        bloom = ScalableBloomFilter(self.initial_capacity, self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        with self._lock:
+            self._filters[poll_id] = bloom
+            self._stats.setdefault(poll_id, self._new_stats())
+        return bloom
+
+    def _filter(self, poll_id):
+        bloom = self._filters.get(poll_id)
+        if bloom is None:
+            bloom = self.build(poll_id, self._loader(poll_id))
+        return bloom
+
+    def might_contain(self, poll_id, key):
+        bloom = self._filter(poll_id)
+        with self._lock:
+            found = key in bloom
+            stats = self._stats[poll_id]
+            stats['checks'] += 1
+            stats['possible_duplicates' if found else 'definitely_new'] += 1
+        return found
+
+    def add(self, poll_id, key):
+        bloom = self._filter(poll_id)
+        with self._lock:
+            bloom.add(key)
+
+    def add_if_loaded(self, poll_id, key):
+        """Add key only when the poll's filter is already in memory (never calls the loader)"""
+        with self._lock:
+            bloom = self._filters.get(poll_id)
+            if bloom is not None:
+                bloom.add(key)
+
+    def record_false_positive(self, poll_id):
+        with self._lock:
+            self._stats.setdefault(poll_id, self._new_stats())['false_positives'] += 1
+
+    def discard(self, poll_id):
+        with self._lock:
+            self._filters.pop(poll_id, None)
+            self._stats.pop(poll_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._filters.clear()
+            self._stats.clear()
+
+    def stats(self):
+        """Per-poll keys, memory, and estimated vs observed false-positive rate"""
+        with self._lock:
+            report = {}
+            for poll_id, bloom in self._filters.items():
+                stats = dict(self._stats.get(poll_id, self._new_stats()))
+                # Every lookup that was not a real duplicate is a negative for FPR purposes
+                negatives = stats['definitely_new'] + stats['false_positives']
+                stats.update({
+                    'keys': bloom.count,
+                    'layers': len(bloom.filters),
+                    'memory_bytes': bloom.memory_bytes,
+                    'estimated_fp_rate': round(bloom.estimated_fp_rate(), 6),
+                    'observed_fp_rate': round(stats['false_positives'] / negatives, 6) if negatives else 0.0,
+                })
+                report[poll_id] = stats
+            return report
@@ -0,0 +1,102 @@
+"""
+Result Breakdowns
+Vectorized cross-tabs of a poll's votes by voter segment. Votes arrive as
+flat NumPy columns (one entry per counted choice); each dimension maps
+them to segment codes and np.bincount does the group-by.
+"""
+
+import numpy as np
+
+MICROS_PER_DAY = 86400 * 1_000_000
+MICROS_PER_HOUR = 3600 * 1_000_000
+NO_ACCOUNT = -1
+
+VOTER_TYPES = ('registered', 'anonymous', 'guest')
+VOTER_TYPE_LABELS = {'registered': 'Registered', 'anonymous': 'Anonymous', 'guest': 'Guest'}
+
+# (upper bound in days, label); the last bucket is open-ended
+ACCOUNT_AGE_BUCKETS = ((7, 'Under a week'), (30, 'Under a month'), (365, 'Under a year'), (None, 'A year or more'))
+ACCOUNT_AGE_OTHER = 'No account shown'
+
+# (first hour, label), UTC
+TIME_OF_DAY_BUCKETS = ((0, 'Night (00-06 UTC)'), (6, 'Morning (06-12 UTC)'), (12, 'Afternoon (12-18 UTC)'),
+                       (18, 'Evening (18-24 UTC)'))
+
+
+def voter_type_codes(user_ids, is_anonymous):
+    """0 registered, 1 anonymous (registered but hidden), 2 guest"""
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    is_anonymous = np.asarray(is_anonymous, dtype=bool)
+    return np.where(user_ids == NO_ACCOUNT, 2, np.where(is_anonymous, 1, 0))
+
+
+def account_age_codes(timestamps, created_at, visible):
+    """
+    Bucket of the account's age when the vote was cast; votes without a
+    visible account (guests, anonymous votes) get the extra last code.
+    """
+    ages = (np.asarray(timestamps, dtype=np.int64) - np.asarray(created_at, dtype=np.int64)) / MICROS_PER_DAY
+    bounds = [days for days, _ in ACCOUNT_AGE_BUCKETS[:-1]]
+    codes = np.searchsorted(bounds, ages, side='right')
+    return np.where(np.asarray(visible, dtype=bool), codes, len(ACCOUNT_AGE_BUCKETS))
+
+
+def time_of_day_codes(timestamps):
+    hours = (np.asarray(timestamps, dtype=np.int64) // MICROS_PER_HOUR) % 24
+    starts = [hour for hour, _ in TIME_OF_DAY_BUCKETS]
+    return np.searchsorted(starts, hours, side='right') - 1
+
+
+def crosstab(segments, columns, num_segments, num_columns):
+    """(num_segments, num_columns) count matrix in one bincount"""
+    segments = np.asarray(segments, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int64)
+    flat = np.bincount(segments * num_columns + columns, minlength=num_segments * num_columns)
+    return flat.reshape(num_segments, num_columns)
+
+
+def _dimension(key, label, labels, counts, option_ids, ballots):
+    segments = []
+    for (segment_key, segment_label), row, voters in zip(labels, counts, ballots):
+        total = int(row.sum())
+        if not total:
+            continue
+        segments.append({
+            'key': segment_key,
+            'label': segment_label,
+            'voters': int(voters),
+            'total': total,
+            'options': {option_id: {'count': int(count), 'percentage': count / total * 100}
+                        for option_id, count in zip(option_ids, row)},
+        })
+    return {'key': key, 'label': label, 'segments': segments}
+
+
+def compute_breakdown(option_ids, columns, ballot_ids, user_ids, is_anonymous, timestamps, created_at,
+                      include_account_age=True):
+    """
+    Cross-tabs by voter type, account age and time of day.
+    Every array has one entry per counted choice (one per vote, or one per
+    approved option); ballot_ids tells which entries belong to the same
+    voter so segments also report how many voters they hold.
+    """
+    option_ids = list(option_ids)
+    columns = np.asarray(columns, dtype=np.int64)
+    ballot_ids = np.asarray(ballot_ids, dtype=np.int64)
+    _, first = np.unique(ballot_ids, return_index=True)
+
+    def dimension(key, label, labels, codes):
+        counts = crosstab(codes, columns, len(labels), len(option_ids))
+        ballots = np.bincount(codes[first], minlength=len(labels))
+        return _dimension(key, label, labels, counts, option_ids, ballots)
+
+    types = voter_type_codes(user_ids, is_anonymous)
+    dimensions = [dimension('voter_type', 'Voter type', [(t, VOTER_TYPE_LABELS[t]) for t in VOTER_TYPES], types)]
+    if include_account_age:
+        labels = [(f'age_{i}', text) for i, (_, text) in enumerate(ACCOUNT_AGE_BUCKETS)]
+        labels.append(('age_none', ACCOUNT_AGE_OTHER))
+        dimensions.append(dimension('account_age', 'Account age when voting', labels,
+                                    account_age_codes(timestamps, created_at, types == 0)))
+    labels = [(f'hour_{start}', text) for start, text in TIME_OF_DAY_BUCKETS]
+    dimensions.append(dimension('time_of_day', 'Time of day', labels, time_of_day_codes(timestamps)))
+    return {'voters': int(len(first)), 'dimensions': dimensions}
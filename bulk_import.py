@@ -0,0 +1,180 @@
+"""
+Bulk Poll Import
+Streaming JSON / NDJSON readers and record validation for the bulk poll
+creation API and the import-polls CLI command
+"""
+
+import codecs
+import json
+from datetime import datetime, timedelta, timezone
+
+READ_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = ' \t\r\n'
+
+
+class BulkImportError(ValueError):
+    """The payload itself is malformed (as opposed to one invalid record)"""
+
+
+def _decode_lines(stream):
+    for line_no, raw in enumerate(stream, start=1):
+        line = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+        yield line_no, line
+
+
+def iter_ndjson(stream):
+    """Yield one parsed record per non-blank line"""
+    for line_no, line in _decode_lines(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise BulkImportError(f"Line {line_no}: invalid JSON ({e})")
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array without loading the whole
+    document; only the element being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return
+        # Incremental decoding keeps multi-byte characters split across reads intact
+        buffer += utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+    while True:
+        buffer = buffer.lstrip(_WHITESPACE + (',' if started else ''))
+        if not buffer:
+            if eof:
+                raise BulkImportError("Unexpected end of JSON array")
+            fill()
+            continue
+
+        if not started:
+            if buffer[0] != '[':
+                raise BulkImportError("Expected a JSON array of polls")
+            buffer = buffer[1:]
+            started = True
+            continue
+
+        if buffer[0] == ']':
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except ValueError as e:
+            if eof:
+                raise BulkImportError(f"Invalid JSON in array ({e})")
+            fill()
+            continue
+
+        # A number at the very end of the buffer may have been cut mid-token
+        if end == len(buffer) and not eof and not isinstance(record, (dict, list, str)):
+            fill()
+            continue
+
+        buffer = buffer[end:]
+        yield record
+
+
+def iter_records(stream, content_type):
+    if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+        return iter_ndjson(stream)
+    return iter_json_array(stream)
+
+
+def _parse_datetime(value, field):
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{field} must be an ISO 8601 datetime")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def validate_poll_record(record, categories, min_options=2, max_options=10, now=None, voting_methods=('single',)):
+    """
+    Validate one import record and normalise it for insertion.
+    Returns (poll_fields, options, image_url); raises ValueError with a
+    human-readable message on invalid input.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Each poll must be a JSON object")
+
+    title = str(record.get('title') or '').strip()
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > 300:
+        raise ValueError("title must be at most 300 characters")
+
+    category = record.get('category') or 'General'
+    if category not in categories:
+        raise ValueError(f"category must be one of: {', '.join(categories)}")
+
+    options = []
+    for opt in record.get('options') or []:
+        if isinstance(opt, dict):
+            text, image_url = str(opt.get('text') or '').strip(), opt.get('image_url')
+        else:
+            text, image_url = str(opt or '').strip(), None
+        if text:
+            options.append({'option_text': text[:300], 'image_url': image_url})
+    if len(options) < min_options:
+        raise ValueError(f"at least {min_options} options are required")
+    if len(options) > max_options:
+        raise ValueError(f"at most {max_options} options are allowed")
+
+    now = now or datetime.utcnow()
+    expires_at = None
+    if record.get('expires_at'):
+        expires_at = _parse_datetime(record['expires_at'], 'expires_at')
+    elif record.get('expires_in_hours'):
+        try:
+            hours = float(record['expires_in_hours'])
+        except (TypeError, ValueError):
+            raise ValueError("expires_in_hours must be a number")
+        if hours <= 0:
+            raise ValueError("expires_in_hours must be positive")
+        expires_at = now + timedelta(hours=hours)
+
+    scheduled_for = None
+    if record.get('scheduled_for'):
+        scheduled_for = _parse_datetime(record['scheduled_for'], 'scheduled_for')
+
+    voting_method = record.get('voting_method') or 'single'
+    if voting_method not in voting_methods:
+        raise ValueError(f"voting_method must be one of: {', '.join(voting_methods)}")
+    max_choices = None
+    if voting_method == 'approval' and record.get('max_choices') is not None:
+        try:
+            max_choices = int(record['max_choices'])
+        except (TypeError, ValueError):
+            raise ValueError("max_choices must be an integer")
+        if max_choices < 1:
+            raise ValueError("max_choices must be positive")
+
+    poll_fields = {
+        'title': title,
+        'description': str(record.get('description') or '').strip(),
+        'category': category,
+        'is_masked': bool(record.get('is_masked')),
+        'is_anonymous_voting': bool(record.get('is_anonymous_voting')),
+        'expires_at': expires_at,
+        'scheduled_for': scheduled_for,
+        'voting_method': voting_method,
+        'max_choices': max_choices,
+    }
+    return poll_fields, options, record.get('image_url')
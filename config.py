@@ -34,9 +34,150 @@ class Config:
     MIN_POLL_OPTIONS = 2
     MAX_COMMENTS_PER_USER_PER_POLL = 5
 
+    # Poll lifecycle scheduler (scheduled -> open -> closed)
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SCHEDULER_MAX_SLEEP_SECONDS = 60
+
+    # Vote rollups (time-bucketed analytics)
+    ROLLUP_MINUTE_RETENTION_HOURS = 48
+    ROLLUP_HOUR_RETENTION_DAYS = 30
+    ROLLUP_COMPACT_INTERVAL_SECONDS = 3600
+
+    # Cached global statistics (admin dashboard and home page totals)
+    STATS_CACHE_TTL_SECONDS = 30
+
+    # Logged-in user identities cached by the login manager
+    USER_CACHE_SIZE = 10000
+    USER_CACHE_TTL_SECONDS = 300
+
+    # Bulk poll import
+    BULK_POLL_BATCH_SIZE = 500
+    BULK_IMAGE_WORKERS = 4
+    BULK_IMAGE_TIMEOUT_SECONDS = 10
+
+    # In-memory Bloom filters of guest voters per open poll
+    VOTER_FILTER_ENABLED = True
+    VOTER_FILTER_INITIAL_CAPACITY = 1000
+    VOTER_FILTER_ERROR_RATE = 0.01
+
+    # Buffered stat, rollup and user activity counters, written back by the scheduler thread
+    COUNTER_BUFFER_ENABLED = True
+    COUNTER_FLUSH_INTERVAL_SECONDS = 2
+
+    # Sharded vote / reaction tallies
+    TALLY_SHARDS = 16
+    TALLY_SHARD_WRITE_RATE = 20  # writes per second that promote a poll to sharded mode
+    TALLY_RATE_WINDOW_SECONDS = 10
+    TALLY_SHARD_CACHE_TTL_SECONDS = 30
+
+    # Ranked-choice / approval round results
+    TABULATION_CACHE_TTL_SECONDS = 3600
+
+    # Event bus shared by every worker process: local, unix (one host) or redis
+    EVENT_BUS_BACKEND = os.environ.get('EVENT_BUS_BACKEND', 'local')
+    EVENT_BUS_SOCKET_DIR = os.environ.get('EVENT_BUS_SOCKET_DIR', '/tmp/polling-system-events')
+    EVENT_BUS_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    EVENT_BUS_CHANNEL = 'polling-system:events'
+
+    # Live poll event streams (server-sent events)
+    EVENT_STREAM_HEARTBEAT_SECONDS = 15
+    EVENT_STREAM_MAX_SECONDS = 300
+    EVENT_STREAM_QUEUE_SIZE = 100
+
+    # Read replicas (comma-separated URLs) for GET requests to the endpoints below; empty uses the primary only
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_READ_ENDPOINTS = ['index', 'view_poll', 'leaderboard', 'poll_timeline', 'poll_results_api',
+                              'poll_events', 'export_results']
+    REPLICA_STICKY_SECONDS = 10  # a client that just wrote reads from the primary for this long
+
+    # Async companion app (asgi.py); defaults to the primary database with an async driver
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_DB_POOL_SIZE = 20
+
+    # Compression of HTML / JSON responses and caching of hashed static bundles
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller bodies gain little and cost CPU
+    COMPRESS_MIMETYPES = ['text/html', 'application/json', 'text/css', 'application/javascript', 'text/plain']
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4  # per-request; bundles are pre-compressed at the maximum
+    STATIC_BUNDLE_MAX_AGE = 365 * 24 * 3600
+
+    # Idempotency-Key support on vote / reaction submissions: memory (per process) or redis (shared)
+    IDEMPOTENCY_BACKEND = os.environ.get('IDEMPOTENCY_BACKEND', 'memory')
+    IDEMPOTENCY_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    IDEMPOTENCY_CACHE_SIZE = 100000
+    IDEMPOTENCY_TTL_SECONDS = 24 * 3600
+    IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+    # Survey batch voting (/api/votes/batch)
+    BATCH_VOTE_MAX_ITEMS = 100
+
+    # Embeddable poll widget (/embed/<poll_id>); shared caches may serve a stale
+    # copy for up to EMBED_STALE_WHILE_REVALIDATE seconds while refetching
+    EMBED_CACHE_SIZE = 10000
+    EMBED_CACHE_TTL_SECONDS = 5
+    EMBED_MAX_AGE = 5
+    EMBED_STALE_WHILE_REVALIDATE = 60
+    EMBED_STALE_IF_ERROR = 86400
+    EMBED_REFRESH_SECONDS = 30
+
+    # Poll view counting: each worker buffers views and flushes them in batches
+    VIEW_TRACKING_ENABLED = True
+    VIEW_FLUSH_INTERVAL_SECONDS = 10
+    VIEW_HLL_PRECISION = 12  # 2**12 one-byte registers per poll, ~1.6% error on unique viewers
+
+    # Write endpoint rate limits: bucket -> (tokens per second, burst) per user or guest email.
+    # Per-IP buckets get RATE_LIMIT_IP_MULTIPLIER times both; a batch vote costs one token per vote.
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_CACHE_SIZE = 100000
+    RATE_LIMITS = {
+        'vote': (1.0, 100),
+        'react': (1.0, 20),
+        'comment': (0.1, 5),
+    }
+    RATE_LIMIT_IP_MULTIPLIER = 5
+
+    # Admission control: shed writes (503) while this many are in flight in one worker,
+    # or while write statements average more than ADMISSION_MAX_DB_LATENCY_MS.
+    # The in-flight limit only applies to threaded workers (gunicorn gthread, or gevent):
+    # a sync worker runs one request at a time and relies on the latency signal alone.
+    ADMISSION_CONTROL_ENABLED = True
+    ADMISSION_MAX_PENDING_WRITES = 64
+    ADMISSION_MAX_DB_LATENCY_MS = 500
+    ADMISSION_LATENCY_WINDOW_SECONDS = 5
+
+    # Result breakdowns by voter segment; recomputed whenever the ballot count changes
+    BREAKDOWN_CACHE_TTL_SECONDS = 3600
+
+    # Search suggestions: every worker's title index is rebuilt this often in case it missed an event
+    SUGGEST_INDEX_REFRESH_SECONDS = 3600
+    SUGGEST_MAX_RESULTS = 8
+
+    # Cold vote archival: votes of polls closed ARCHIVE_AFTER_DAYS ago move to files in ARCHIVE_FOLDER
+    ARCHIVE_ENABLED = False  # Run on the scheduler; 'flask archive-votes' works either way
+    ARCHIVE_FOLDER = 'archive'
+    ARCHIVE_AFTER_DAYS = 90
+    ARCHIVE_INTERVAL_SECONDS = 24 * 3600
+    ARCHIVE_GC_GRACE_SECONDS = 3600  # Unreferenced files younger than this may belong to a run still in progress
+    ARCHIVE_DELETE_CHUNK_SIZE = 5000
+
+    # Background poll deletion
+    POLL_DELETE_CHUNK_SIZE = 5000
+    POLL_DELETE_RESUME_INTERVAL_SECONDS = 60
+    POLL_DELETE_JOB_STALE_SECONDS = 300  # A running job that has not reported for this long is taken over
+    POLL_DELETE_MAX_ATTEMPTS = 5  # Failed runs before a job stops retrying and waits for an admin
+    POLL_DELETE_RETRY_BASE_SECONDS = 60  # Backoff after the first failure, doubled after each further one
+
     # Sentiment analysis settings
     SENTIMENT_POSITIVE_THRESHOLD = 0.1
     SENTIMENT_NEGATIVE_THRESHOLD = -0.1
+    SENTIMENT_WORD_WEIGHT = 0.1
+    SENTIMENT_POSITIVE_WORDS = ['good', 'great', 'excellent', 'awesome', 'love', 'best', 'amazing']
+    SENTIMENT_NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'poor']
+    SENTIMENT_LEXICON_FILE = os.environ.get('SENTIMENT_LEXICON_FILE')  # JSON {"word": weight} overrides
+    SENTIMENT_RESCORE_CHUNK_SIZE = 1000
 
     # Badge thresholds
     BADGE_ACTIVE_VOTER_VOTES = 10
@@ -68,8 +209,6 @@ class ProductionConfig(Config):
 
     # Override with environment variables in production
     SECRET_KEY = os.environ.get('SECRET_KEY')
-    if not SECRET_KEY:
-        raise ValueError("No SECRET_KEY set for production")
 
 
 class TestingConfig(Config):
@@ -92,4 +231,8 @@ def get_config(config_name=None):
     """Get configuration based on environment"""
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
-    return config.get(config_name, DevelopmentConfig)
\ No newline at end of file
+    config_class = config.get(config_name, DevelopmentConfig)
+    # Checked here rather than in the class body so importing this module never fails
+    if config_class is ProductionConfig and not ProductionConfig.SECRET_KEY:
+        raise ValueError("No SECRET_KEY set for production")
+    return config_class
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+Event Bus
+Domain events (votes, reactions, comments, admin deletes) fanned out to
+every worker process so per-process caches and live streams stay current.
+
+Backends:
+    local  - handlers in this process only
+    unix   - one datagram socket per process in a shared directory; a
+             publisher sends to every socket it finds (single host, no broker)
+    redis  - Redis pub/sub (multi-host); pass client= to use a stand-in
+             such as fakeredis
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+MAX_DATAGRAM = 64 * 1024
+# How long a publisher waits for a slow peer's queue to drain before dropping the event
+SEND_TIMEOUT_SECONDS = 0.05
+
+
+class EventBus:
+    """In-process bus; also the base class that remote backends extend"""
+
+    backend = 'local'
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers = []
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def subscribe(self, handler, types=None):
+        """Call handler(event) for events of the given types (all when None); returns an unsubscribe function"""
+        entry = (handler, frozenset(types) if types else None)
+        with self._lock:
+            self._handlers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._handlers:
+                    self._handlers.remove(entry)
+
+        return unsubscribe
+
+    def publish(self, event_type, **data):
+        event = {'type': event_type, 'origin': self.origin, 'ts': time.time(), **data}
+        self.dispatch(event)
+        self._send(event)
+        return event
+
+    def dispatch(self, event):
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler, types in handlers:
+            if types is None or event['type'] in types:
+                try:
+                    handler(event)
+                except Exception:
+                    logger.exception("Event handler %r failed for %s", handler, event['type'])
+
+    def _receive(self, raw):
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            logger.warning("Dropping malformed event payload")
+            return
+        # Our own events were already dispatched when they were published
+        if event.get('origin') != self.origin:
+            self.dispatch(event)
+
+    def _send(self, event):
+        pass
+
+    def _join(self):
+        """
+        Give this process its own origin; False if it already joined. Under
+        gunicorn --preload the bus is built in the master, so every forked
+        worker that starts it must get an identity of its own.
+        """
+        if self._pid == os.getpid():
+            return False
+        self._pid = os.getpid()
+        self.origin = uuid.uuid4().hex
+        return True
+
+    def start(self):
+        self._join()
+
+    def close(self):
+        pass
+
+
+class UnixSocketEventBus(EventBus):
+    """Fan-out over Unix datagram sockets, one per process, in socket_dir"""
+
+    backend = 'unix'
+
+    def __init__(self, socket_dir):
+        super().__init__()
+        self.socket_dir = socket_dir
+        self.path = None  # Bound by start(); a bus that only publishes has no socket
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.settimeout(SEND_TIMEOUT_SECONDS)
+        self._receiver = None
+        self._thread = None
+
+    def start(self):
+        if not self._join():
+            return
+        if self._receiver is not None:
+            # Inherited from the parent across a fork; the parent keeps its socket file
+            self._receiver.close()
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self.path = os.path.join(self.socket_dir, f"{self._pid}-{self.origin[:8]}.sock")
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._thread = threading.Thread(target=self._listen, args=(self._receiver,), name='event-bus-unix',
+                                        daemon=True)
+        self._thread.start()
+
+    def _listen(self, receiver):
+        while True:
+            try:
+                raw = receiver.recv(MAX_DATAGRAM)
+            except OSError:
+                return
+            self._receive(raw)
+
+    def _send(self, event):
+        payload = json.dumps(event, default=str).encode('utf-8')
+        try:
+            peers = os.listdir(self.socket_dir)
+        except FileNotFoundError:
+            return
+        for name in peers:
+            peer = os.path.join(self.socket_dir, name)
+            if not name.endswith('.sock') or peer == self.path:
+                continue
+            try:
+                self._sender.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The process behind this socket has gone away
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+            except (BlockingIOError, socket.timeout):
+                logger.warning("Event bus peer %s is not keeping up; dropped %s", name, event['type'])
+
+    def close(self):
+        if self._receiver is not None:
+            self._receiver.close()
+            if self._pid == os.getpid():
+                try:
+                    os.unlink(self.path)
+                except OSError:
+                    pass
+        self._sender.close()
+
+
+class RedisEventBus(EventBus):
+    """Redis pub/sub on a single channel"""
+
+    backend = 'redis'
+
+    def __init__(self, url=None, channel='polls:events', client=None):
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("The redis event bus backend needs the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+
+    def start(self):
+        if not self._join():
+            return
+        # redis-py reconnects in a forked child on its own; the parent's pubsub is simply left behind
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+        self._thread = threading.Thread(target=self._listen, name='event-bus-redis', daemon=True)
+        self._thread.start()
+
+    def _listen(self):
+        while self._pubsub is not None:
+            try:
+                message = self._pubsub.get_message(timeout=1.0)
+            except Exception:
+                logger.exception("Redis event bus connection failed; retrying")
+                time.sleep(1)
+                continue
+            if message and message.get('type') == 'message':
+                self._receive(message['data'])
+
+    def _send(self, event):
+        try:
+            self.client.publish(self.channel, json.dumps(event, default=str))
+        except Exception:
+            logger.exception("Could not publish %s to Redis", event['type'])
+
+    def close(self):
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            pubsub.close()
+
+
+def create_event_bus(config):
+    backend = config.get('EVENT_BUS_BACKEND', 'local')
+    if backend == 'local':
+        return EventBus()
+    if backend == 'unix':
+        return UnixSocketEventBus(config['EVENT_BUS_SOCKET_DIR'])
+    if backend == 'redis':
+        return RedisEventBus(config['EVENT_BUS_REDIS_URL'], config['EVENT_BUS_CHANNEL'])
+    raise ValueError(f"Unknown event bus backend: {backend}")
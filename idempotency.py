@@ -0,0 +1,80 @@
+"""
+Idempotency Keys
+Stores the first response to a request carrying an Idempotency-Key header
+so client retries get the same response back without re-running the
+handler. Backed by the in-process TTL cache or by Redis when several
+workers share the traffic.
+"""
+
+import json
+import threading
+
+from caching import TTLCache
+
+PENDING = 'pending'
+DONE = 'done'
+
+
+class MemoryIdempotencyStore:
+    """Bounded per-process store; a retry routed to another worker is not recognised"""
+
+    def __init__(self, maxsize=100000, ttl=3600, pending_ttl=60):
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def reserve(self, key, fingerprint):
+        """Claim key for this request; returns None when claimed, otherwise the existing record"""
+        with self._lock:
+            record = self._cache.get(key)
+            if record is not None:
+                return record
+            self._cache.set(key, {'state': PENDING, 'fingerprint': fingerprint}, ttl=self.pending_ttl)
+            return None
+
+    def complete(self, key, record):
+        self._cache.set(key, {**record, 'state': DONE}, ttl=self.ttl)
+
+    def release(self, key):
+        self._cache.pop(key)
+
+
+class RedisIdempotencyStore:
+    """Shared store for multi-worker deployments; SET NX makes the claim atomic across processes"""
+
+    def __init__(self, url=None, ttl=3600, pending_ttl=60, prefix='idempotency:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("The redis idempotency backend needs the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.prefix = prefix
+
+    def reserve(self, key, fingerprint):
+        pending = json.dumps({'state': PENDING, 'fingerprint': fingerprint})
+        if self.client.set(self.prefix + key, pending, nx=True, ex=self.pending_ttl):
+            return None
+        raw = self.client.get(self.prefix + key)
+        # The claim expired between SET and GET; let the caller treat it as in progress
+        return json.loads(raw) if raw is not None else {'state': PENDING, 'fingerprint': fingerprint}
+
+    def complete(self, key, record):
+        self.client.set(self.prefix + key, json.dumps({**record, 'state': DONE}), ex=self.ttl)
+
+    def release(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def create_idempotency_store(config):
+    backend = config.get('IDEMPOTENCY_BACKEND', 'memory')
+    ttl = config['IDEMPOTENCY_TTL_SECONDS']
+    if backend == 'memory':
+        return MemoryIdempotencyStore(config['IDEMPOTENCY_CACHE_SIZE'], ttl)
+    if backend == 'redis':
+        return RedisIdempotencyStore(config['IDEMPOTENCY_REDIS_URL'], ttl)
+    raise ValueError(f"Unknown idempotency backend: {backend}")
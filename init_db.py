@@ -3,7 +3,7 @@ Database Initialization Script
 Run this script to create database tables and add sample data
 """
 
-from app import app, db, User, Poll, Option, Vote, Comment, Reaction, Badge
+from app import app, db, User, Poll, Option, Vote, Comment, Reaction, Badge, REACTION_TYPES
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 import random
@@ -239,7 +239,7 @@ def create_sample_reactions():
             print("! Need users and polls to create reactions")
             return
 
-        reaction_types = ['like', 'love', 'wow', 'sad', 'angry']
+        reaction_types = REACTION_TYPES
 
         print("Creating sample reactions...")
         reaction_count = 0
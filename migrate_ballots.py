@@ -0,0 +1,75 @@
+"""
+Database Migration Script for Ranked-Choice and Approval Polls
+Run this script to add poll voting methods and the ballot_rankings table
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add polls.voting_method / polls.max_choices and create ballot_rankings"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Ranked-Choice Ballots")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("PRAGMA table_info(polls)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if 'voting_method' in columns:
+            print("✓ voting_method column already exists in polls table")
+        else:
+            cursor.execute("ALTER TABLE polls ADD COLUMN voting_method VARCHAR(20) NOT NULL DEFAULT 'single'")
+            print("✓ voting_method column added (existing polls stay single choice)")
+
+        if 'max_choices' in columns:
+            print("✓ max_choices column already exists in polls table")
+        else:
+            cursor.execute("ALTER TABLE polls ADD COLUMN max_choices INTEGER")
+            print("✓ max_choices column added")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ballot_rankings (
+                id INTEGER NOT NULL PRIMARY KEY,
+                vote_id INTEGER NOT NULL REFERENCES votes (id) ON DELETE CASCADE,
+                poll_id INTEGER NOT NULL REFERENCES polls (id) ON DELETE CASCADE,
+                option_id INTEGER NOT NULL REFERENCES options (id) ON DELETE CASCADE,
+                rank SMALLINT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_ballot_rankings_vote_id ON ballot_rankings (vote_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_ballot_rankings_poll_id ON ballot_rankings (poll_id)")
+        print("✓ ballot_rankings table ready")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nPolls can now use instant runoff, Borda count or approval voting.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,69 @@
+"""
+Database Migration Script for Category Facet Counts
+Run this script to add the category_stats table behind the category
+badges on the home page and fill it from the existing polls
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add category_stats and count the open and closed polls of every category"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Category Facet Counts")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS category_stats (
+                category VARCHAR(50) NOT NULL PRIMARY KEY,
+                open_count BIGINT NOT NULL DEFAULT 0,
+                total_count BIGINT NOT NULL DEFAULT 0
+            )
+        """)
+        print("✓ category_stats table ready")
+
+        cursor.execute("DELETE FROM category_stats")
+        cursor.execute("""
+            INSERT INTO category_stats (category, open_count, total_count)
+            SELECT COALESCE(category, 'General'),
+                   SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END),
+                   COUNT(*)
+            FROM polls
+            WHERE status IN ('open', 'closed')
+            GROUP BY COALESCE(category, 'General')
+        """)
+        print(f"✓ Counted polls in {cursor.rowcount} categories")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nCategory counts are now kept current as polls are created, closed and deleted.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,86 @@
+"""
+Database Migration Script for Persisted Poll Delete Jobs
+Run this script to add the poll_delete_jobs table, so background poll
+deletes survive restarts and their progress is visible from every worker
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add poll_delete_jobs; polls already stuck in 'deleting' are picked up on the next start"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Poll Delete Jobs")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS poll_delete_jobs (
+                id VARCHAR(12) NOT NULL PRIMARY KEY,
+                poll_ids_json TEXT NOT NULL,
+                state VARCHAR(20) NOT NULL DEFAULT 'queued',
+                table_name VARCHAR(50),
+                total INTEGER,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                runner VARCHAR(32),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                retry_at DATETIME,
+                started_at DATETIME,
+                updated_at DATETIME,
+                finished_at DATETIME
+            )
+        """)
+        print("✓ poll_delete_jobs table ready")
+
+        cursor.execute("PRAGMA table_info(poll_delete_jobs)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if 'attempts' in columns:
+            print("✓ attempts column already exists in poll_delete_jobs table")
+        else:
+            cursor.execute("ALTER TABLE poll_delete_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            print("✓ attempts column added")
+
+        if 'retry_at' in columns:
+            print("✓ retry_at column already exists in poll_delete_jobs table")
+        else:
+            cursor.execute("ALTER TABLE poll_delete_jobs ADD COLUMN retry_at DATETIME")
+            print("✓ retry_at column added")
+
+        cursor.execute("SELECT COUNT(*) FROM polls WHERE status = 'deleting'")
+        stuck = cursor.fetchone()[0]
+        if stuck:
+            print(f"✓ {stuck} poll(s) still marked 'deleting' will be deleted when the app starts")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60 + "\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,143 @@
+"""
+Database Migration Script for Poll Delete Cascades
+Run this script to rebuild poll child tables with ON DELETE CASCADE foreign keys
+and index the poll_id columns that deletes are filtered on
+"""
+
+import sqlite3
+import os
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app import db
+
+# Tables whose rows belong to a poll, parents before children
+CHILD_TABLES = ['options', 'votes', 'comments', 'reactions', 'poll_sentiment',
+                'poll_result_snapshots', 'vote_rollups']
+
+
+# Foreign keys to these tables should cascade; user references are left alone
+CASCADE_PARENTS = {'polls', 'options', 'comments'}
+
+
+def needs_rebuild(cursor, table, tables):
+    cursor.execute(f"PRAGMA foreign_key_list({table})")
+    # (id, seq, table, from, to, on_update, on_delete, match)
+    foreign_keys = cursor.fetchall()
+    # A key pointing at a table that is gone was left by an earlier rename-based rebuild
+    return any((fk[2] in CASCADE_PARENTS and fk[6].upper() != 'CASCADE') or fk[2] not in tables
+               for fk in foreign_keys)
+
+
+def rebuild_table(cursor, table):
+    """
+    SQLite cannot alter a foreign key in place: copy the rows into a freshly
+    created table. This is SQLite's documented order (create new, copy, drop
+    old, rename new); renaming the old table away first would make SQLite
+    repoint other tables' foreign keys at it before it is dropped.
+    """
+    model_table = db.metadata.tables[table]
+
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = [column[1] for column in cursor.fetchall()]
+    common = ', '.join(c.name for c in model_table.columns if c.name in existing)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                   (table,))
+    for (index_name,) in cursor.fetchall():
+        cursor.execute(f"DROP INDEX {index_name}")
+
+    ddl = str(CreateTable(model_table).compile(dialect=sqlite.dialect())).strip()
+    cursor.execute(ddl.replace(f"CREATE TABLE {table} (", f"CREATE TABLE {table}_new (", 1))
+    cursor.execute(f"INSERT INTO {table}_new ({common}) SELECT {common} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def dangling_references(cursor):
+    """Tables whose schema still names a rebuild's temporary table"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE sql LIKE '%\\_old%' ESCAPE '\\' "
+                   "OR sql LIKE '%\\_new%' ESCAPE '\\'")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def create_indexes(cursor, table):
+    for index in db.metadata.tables[table].indexes:
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=sqlite.dialect()))
+        cursor.execute(ddl)
+
+
+def migrate_database():
+    """Rebuild poll child tables with cascading foreign keys and index their poll_id columns"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Poll Delete Cascades")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        # Foreign keys must be off while tables are renamed and recreated
+        cursor.execute("PRAGMA foreign_keys = OFF")
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        # Also repairs tables whose keys an earlier run of this script left pointing at '<table>_old'
+        repair = [table for table in db.metadata.tables if table in tables and table not in CHILD_TABLES
+                  and needs_rebuild(cursor, table, tables)]
+        for table in CHILD_TABLES + repair:
+            if table not in tables:
+                print(f"• {table} does not exist yet, skipping")
+                continue
+
+            if needs_rebuild(cursor, table, tables):
+                print(f"Rebuilding {table} with ON DELETE CASCADE...")
+                rebuild_table(cursor, table)
+                print(f"✓ {table} rebuilt")
+            else:
+                print(f"✓ {table} already cascades")
+
+            create_indexes(cursor, table)
+
+        print("✓ Poll child indexes created")
+
+        dangling = dangling_references(cursor)
+        if dangling:
+            raise RuntimeError(f"{', '.join(dangling)} still reference a temporary table")
+
+        cursor.execute("PRAGMA foreign_key_check")
+        orphans = cursor.fetchall()
+        if orphans:
+            print(f"⚠ {len(orphans)} rows reference missing parents; they were kept as-is")
+
+        conn.commit()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nDeleting a poll now removes its options, votes, comments and reactions in the database.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,74 @@
+"""
+Database Migration Script for Poll Lifecycle Status
+Run this script to add the indexed status column used by the lifecycle scheduler
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+
+def migrate_database():
+    """Add polls.status, backfill it from scheduled_for / expires_at and index it"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Poll Lifecycle Status")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("PRAGMA table_info(polls)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if 'status' in columns:
+            print("✓ Status column already exists in polls table")
+        else:
+            print("Adding status column to polls table...")
+            cursor.execute("ALTER TABLE polls ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'open'")
+            print("✓ Status column added successfully")
+
+        # Backfill from the timestamps the application used to check on every read
+        now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
+        cursor.execute("""
+            UPDATE polls SET status = CASE
+                WHEN expires_at IS NOT NULL AND expires_at <= ? THEN 'closed'
+                WHEN scheduled_for IS NOT NULL AND scheduled_for > ? THEN 'scheduled'
+                ELSE 'open'
+            END
+        """, (now, now))
+        print(f"✓ Backfilled status for {cursor.rowcount} polls")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_polls_status ON polls (status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_polls_expires_at ON polls (expires_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_polls_scheduled_for ON polls (scheduled_for)")
+        print("✓ Lifecycle indexes created")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nPolls now move through scheduled → open → closed in the background.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
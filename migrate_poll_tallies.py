@@ -0,0 +1,84 @@
+"""
+Database Migration Script for Sharded Poll Tallies
+Run this script to add the poll_tallies counter table and fill it from the
+existing votes and reactions
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add polls.tally_shards and poll_tallies, then backfill counters from raw rows"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Sharded Poll Tallies")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("PRAGMA table_info(polls)")
+        columns = [column[1] for column in cursor.fetchall()]
+
+        if 'tally_shards' in columns:
+            print("✓ tally_shards column already exists in polls table")
+        else:
+            cursor.execute("ALTER TABLE polls ADD COLUMN tally_shards INTEGER NOT NULL DEFAULT 1")
+            print("✓ tally_shards column added")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS poll_tallies (
+                id INTEGER NOT NULL PRIMARY KEY,
+                poll_id INTEGER NOT NULL REFERENCES polls (id) ON DELETE CASCADE,
+                counter VARCHAR(40) NOT NULL,
+                shard SMALLINT NOT NULL DEFAULT 0,
+                count BIGINT NOT NULL DEFAULT 0,
+                CONSTRAINT uq_poll_tally_shard UNIQUE (poll_id, counter, shard)
+            )
+        """)
+        print("✓ poll_tallies table ready")
+
+        # Recount from scratch so the script can be re-run safely
+        cursor.execute("DELETE FROM poll_tallies")
+        cursor.execute("""
+            INSERT INTO poll_tallies (poll_id, counter, shard, count)
+            SELECT poll_id, 'option:' || option_id, 0, COUNT(*) FROM votes GROUP BY poll_id, option_id
+        """)
+        vote_counters = cursor.rowcount
+        cursor.execute("""
+            INSERT INTO poll_tallies (poll_id, counter, shard, count)
+            SELECT poll_id, 'reaction:' || reaction_type, 0, COUNT(*) FROM reactions
+            GROUP BY poll_id, reaction_type
+        """)
+        print(f"✓ Backfilled {vote_counters} option and {cursor.rowcount} reaction counters")
+        cursor.execute("UPDATE polls SET tally_shards = 1")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nLive results are now read from the tally counters.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
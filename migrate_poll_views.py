@@ -0,0 +1,58 @@
+"""
+Database Migration Script for Poll View Counts
+Run this script to add the poll_view_stats table that buffered page views
+and unique-viewer sketches are flushed into
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add poll_view_stats; existing polls start counting from zero"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Poll View Counts")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS poll_view_stats (
+                poll_id INTEGER NOT NULL PRIMARY KEY REFERENCES polls (id) ON DELETE CASCADE,
+                views BIGINT NOT NULL DEFAULT 0,
+                viewer_sketch BLOB,
+                updated_at DATETIME
+            )
+        """)
+        print("✓ poll_view_stats table ready")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nPoll views are now counted; history before today is not available.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
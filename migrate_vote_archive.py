@@ -0,0 +1,73 @@
+"""
+Database Migration Script for Cold Vote Archival
+Run this script to add the archived_polls table that records which closed
+polls had their votes moved into archive files, and the per-account vote
+counts kept for them
+"""
+
+import sqlite3
+import os
+
+
+def migrate_database():
+    """Add archived_polls and archived_voter_counts; nothing is archived until 'flask archive-votes' runs"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Vote Archive")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archived_polls (
+                poll_id INTEGER NOT NULL PRIMARY KEY REFERENCES polls (id) ON DELETE CASCADE,
+                path VARCHAR(300) NOT NULL,
+                vote_count INTEGER NOT NULL DEFAULT 0,
+                ranking_count INTEGER NOT NULL DEFAULT 0,
+                archived_at DATETIME
+            )
+        """)
+        print("✓ archived_polls table ready")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archived_voter_counts (
+                poll_id INTEGER NOT NULL REFERENCES archived_polls (poll_id) ON DELETE CASCADE,
+                user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                vote_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (poll_id, user_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_archived_voter_counts_user_id "
+                       "ON archived_voter_counts (user_id)")
+        print("✓ archived_voter_counts table ready")
+
+        conn.commit()
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nRun 'flask archive-votes' to move votes of long-closed polls into archive files.")
+        print("Run 'flask compact-archives' to split files written before one-file-per-poll.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,141 @@
+"""
+Database Migration Script for Guest Voter Identities
+Run this script to move guest emails / phones on votes and reactions into the
+voters table and reference them by integer key
+"""
+
+import sqlite3
+import os
+
+from voters import canonical_identity
+
+BATCH_SIZE = 5000
+
+
+def add_column(cursor, table, column, ddl):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column in [c[1] for c in cursor.fetchall()]:
+        print(f"✓ {table}.{column} already exists")
+    else:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+        print(f"✓ Added {table}.{column}")
+
+
+def backfill(conn, table, identity_columns):
+    """Assign voter_id to guest rows in batches, clearing the raw strings as they are moved"""
+    cursor = conn.cursor()
+    columns = ', '.join(identity_columns)
+    has_identity = ' OR '.join(f"{c} IS NOT NULL" for c in identity_columns)
+    voter_ids = {}
+    moved = skipped = 0
+    last_id = 0
+
+    while True:
+        cursor.execute(f"""
+            SELECT id, {columns} FROM {table}
+            WHERE id > ? AND voter_id IS NULL AND ({has_identity})
+            ORDER BY id LIMIT ?
+        """, (last_id, BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        updates = []
+        for row_id, *values in rows:
+            canonical = canonical_identity(*values)
+            if canonical is None:
+                skipped += 1
+                continue
+            kind, identity = canonical
+            if identity not in voter_ids:
+                cursor.execute("INSERT OR IGNORE INTO voters (kind, identity, created_at) "
+                               "VALUES (?, ?, CURRENT_TIMESTAMP)", (kind, identity))
+                cursor.execute("SELECT id FROM voters WHERE identity = ?", (identity,))
+                voter_ids[identity] = cursor.fetchone()[0]
+            updates.append((voter_ids[identity], row_id))
+
+        nulls = ', '.join(f"{c} = NULL" for c in identity_columns)
+        cursor.executemany(f"UPDATE {table} SET voter_id = ?, {nulls} WHERE id = ?", updates)
+        # One transaction per batch keeps the database usable while the backfill runs
+        conn.commit()
+        moved += len(updates)
+        print(f"  … {table}: {moved} rows moved")
+
+    print(f"✓ {table}: {moved} guest rows now reference voters ({skipped} unusable identities left as-is)")
+
+
+def migrate_database():
+    """Create the voters table, add voter_id to votes and reactions and backfill them"""
+
+    db_path = 'polling_system.db'
+
+    if not os.path.exists(db_path):
+        print("❌ Database not found!")
+        print("Please run 'python app.py' first to create the database.")
+        return False
+
+    print("\n" + "=" * 60)
+    print("DATABASE MIGRATION - Adding Guest Voter Identities")
+    print("=" * 60 + "\n")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        print("✓ Connected to database")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS voters (
+                id INTEGER NOT NULL PRIMARY KEY,
+                kind VARCHAR(10) NOT NULL,
+                identity VARCHAR(120) NOT NULL UNIQUE,
+                created_at DATETIME
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_voters_identity_hash ON voters (identity)")
+        print("✓ Voters table ready")
+
+        add_column(cursor, 'votes', 'voter_id', 'INTEGER REFERENCES voters (id)')
+        add_column(cursor, 'reactions', 'voter_id', 'INTEGER REFERENCES voters (id)')
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_reactions_poll_voter ON reactions (poll_id, voter_id)")
+        conn.commit()
+        print("✓ voter_id indexes created\n")
+
+        backfill(conn, 'votes', ['email', 'phone'])
+        backfill(conn, 'reactions', ['email'])
+
+        # Guest votes are deduplicated by the database; case-variant emails may have voted twice before
+        cursor.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM votes WHERE voter_id IS NOT NULL
+                GROUP BY poll_id, voter_id HAVING COUNT(*) > 1
+            )
+        """)
+        duplicates = cursor.fetchone()[0]
+        if duplicates:
+            print(f"⚠ {duplicates} guests voted more than once on the same poll; "
+                  "remove the extra votes and run this script again to add uq_votes_poll_voter")
+        else:
+            cursor.execute("DROP INDEX IF EXISTS ix_votes_poll_voter")
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_votes_poll_voter ON votes (poll_id, voter_id)")
+            conn.commit()
+            print("✓ One guest vote per poll is now enforced by uq_votes_poll_voter")
+
+        conn.close()
+
+        print("\n" + "=" * 60)
+        print("✓ MIGRATION COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        print("\nGuest duplicate checks now compare integer voter keys.\n")
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        print("\nRestore your backup (polling_system_backup.db) and try again.\n")
+        return False
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,167 @@
+"""
+Rate Limiting & Admission Control
+Token buckets per client for the write endpoints, kept in process or in
+Redis when several workers share the traffic, and a per-process admission
+controller that sheds writes while the database is falling behind
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryRateLimiter:
+    """
+    Token buckets in an LRU dict. The least recently charged buckets are
+    evicted first; a forgotten client simply starts again with a full bucket.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, limits, cost=1, now=None):
+        """
+        Take `cost` tokens from every (key, rate, burst) bucket, or from none.
+        Returns 0 when allowed, otherwise the seconds until the request would be.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            levels = []
+            retry_after = 0.0
+            for key, rate, burst in limits:
+                tokens, updated = self._buckets.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - updated) * rate)
+                levels.append((key, tokens))
+                if tokens < cost:
+                    retry_after = max(retry_after, (cost - tokens) / rate)
+            if retry_after:
+                return retry_after
+
+            for key, tokens in levels:
+                self._buckets[key] = (tokens - cost, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# KEYS: bucket keys; ARGV: cost, then rate and burst per key. All-or-nothing like the memory backend.
+_REDIS_TOKEN_BUCKETS = """
+local cost = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        retry_after = math.max(retry_after, (cost - tokens) / rate)
+    end
+end
+if retry_after > 0 then
+    return tostring(retry_after)
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return '0'
+"""
+
+
+class RedisRateLimiter:
+    """Buckets shared by all workers; one script call checks and charges every key of a request"""
+
+    def __init__(self, url=None, prefix='ratelimit:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("The redis rate limit backend needs the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_TOKEN_BUCKETS)
+
+    def allow(self, limits, cost=1, now=None):
+        keys = [self.prefix + key for key, _, _ in limits]
+        args = [cost]
+        for _, rate, burst in limits:
+            args.extend([rate, burst])
+        return float(self._script(keys=keys, args=args))
+
+
+def create_rate_limiter(config):
+    backend = config.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend == 'memory':
+        return MemoryRateLimiter(config['RATE_LIMIT_CACHE_SIZE'])
+    if backend == 'redis':
+        return RedisRateLimiter(config['RATE_LIMIT_REDIS_URL'])
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class AdmissionController:
+    """
+    Sheds writes while this process already has max_pending of them in
+    flight, or while recent write statements averaged more than
+    max_latency seconds. The latency average is forgotten after `window`
+    seconds without a write, so shedding cannot keep itself going.
+
+    pending counts requests inside this process, so it only ever reaches
+    max_pending with threaded workers; with one request per process the
+    queue builds up in front of the database and shows as latency instead.
+    """
+
+    def __init__(self, max_pending=64, max_latency=0.5, window=5, smoothing=0.2):
+        self.max_pending = max_pending
+        self.max_latency = max_latency
+        self.window = window
+        self.smoothing = smoothing
+        self.pending = 0
+        self.latency = 0.0
+        self._observed_at = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Fold one write statement's duration into the moving average"""
+        with self._lock:
+            if time.monotonic() - self._observed_at > self.window:
+                self.latency = seconds
+            else:
+                self.latency += self.smoothing * (seconds - self.latency)
+            self._observed_at = time.monotonic()
+
+    def check(self):
+        """None if a new write may start, otherwise the reason it may not"""
+        if self.pending >= self.max_pending:
+            return 'Too many writes in progress'
+        if self.latency > self.max_latency and time.monotonic() - self._observed_at <= self.window:
+            return 'The database is responding slowly'
+        return None
+
+    def __enter__(self):
+        with self._lock:
+            self.pending += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.pending -= 1
+        return False
+
+    def stats(self):
+        return {'pending': self.pending, 'max_pending': self.max_pending,
+                'latency_ms': round(self.latency * 1000, 2), 'max_latency_ms': self.max_latency * 1000}
@@ -0,0 +1,114 @@
+"""
+Remote Image Fetching
+Downloads images named by URL in bulk import payloads. Connections are
+only made to public addresses, checked on the address actually dialled
+(so a DNS answer cannot change between the check and the request) and
+again for every redirect, and the bytes must be a known image format.
+"""
+
+import ipaddress
+import socket
+import urllib.parse
+import urllib.request
+
+# Format -> leading bytes; WebP is a RIFF container with 'WEBP' at offset 8
+IMAGE_SIGNATURES = {
+    'png': [b'\x89PNG\r\n\x1a\n'],
+    'jpeg': [b'\xff\xd8\xff'],
+    'gif': [b'GIF87a', b'GIF89a'],
+}
+
+
+class RemoteImageError(ValueError):
+    """The URL, its address or the downloaded bytes are not acceptable"""
+
+
+def is_public_address(address):
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def public_create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """socket.create_connection that refuses loopback, private, link-local and reserved addresses"""
+    host, port = address
+    candidates = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in candidates:
+        if not is_public_address(sockaddr[0]):
+            raise RemoteImageError(f"{host} resolves to a non-public address ({sockaddr[0]})")
+    error = None
+    for family, kind, proto, _, sockaddr in candidates:
+        sock = socket.socket(family, kind, proto)
+        try:
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            # The checked address is dialled directly instead of resolving the name again
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"Could not connect to {host}")
+
+
+class _PublicAddressMixin:
+    def do_open(self, http_class, req, **http_conn_args):
+        def connection(*args, **kwargs):
+            conn = http_class(*args, **kwargs)
+            conn._create_connection = public_create_connection
+            return conn
+
+        return super().do_open(connection, req, **http_conn_args)
+
+
+class _PublicHTTPHandler(_PublicAddressMixin, urllib.request.HTTPHandler):
+    pass
+
+
+class _PublicHTTPSHandler(_PublicAddressMixin, urllib.request.HTTPSHandler):
+    pass
+
+
+class _HTTPRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if urllib.parse.urlparse(newurl).scheme not in ('http', 'https'):
+            raise RemoteImageError(f"Redirect to unsupported URL: {newurl}")
+        # The new request goes through the same handlers, so its address is checked too
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+# No ProxyHandler: a proxy would dial the target for us, past the address check
+_opener = urllib.request.OpenerDirector()
+for _handler in (_PublicHTTPHandler(), _PublicHTTPSHandler(), _HTTPRedirectHandler(),
+                 urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor()):
+    _opener.add_handler(_handler)
+
+
+def image_type(data):
+    """'png', 'jpeg', 'gif' or 'webp' from the file's leading bytes, or None"""
+    for kind, signatures in IMAGE_SIGNATURES.items():
+        if any(data.startswith(signature) for signature in signatures):
+            return kind
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def fetch_image(url, timeout, limit):
+    """(bytes, format) of an http(s) image URL on a public host, at most limit bytes"""
+    if urllib.parse.urlparse(url).scheme not in ('http', 'https'):
+        raise RemoteImageError(f"Unsupported image URL scheme: {urllib.parse.urlparse(url).scheme}")
+    with _opener.open(url, timeout=timeout) as response:
+        content_type = response.headers.get_content_type()
+        if not content_type.startswith('image/'):
+            raise RemoteImageError(f"{url} is {content_type}, not an image")
+        data = response.read(limit + 1)
+    if len(data) > limit:
+        raise RemoteImageError(f"Image larger than {limit} bytes: {url}")
+    kind = image_type(data)
+    if kind is None:
+        raise RemoteImageError(f"{url} is not a PNG, JPEG, GIF or WebP image")
+    return data, kind
@@ -0,0 +1,28 @@
+"""
+Read Replica Routing
+Session class that sends the reads of read-only requests to a replica while
+flushes and DML statements always go to the primary
+"""
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+
+class ReplicaRoutingSession(Session):
+    """
+    Reads go to the bind named by g.db_replica when a request sets it.
+
+    The first write of a request clears g.db_replica, so the rest of that
+    request reads from the primary, and sets g.db_wrote so the response can
+    keep the client on the primary for a few more requests.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                g.db_replica = None
+                g.db_wrote = True
+            elif g.get('db_replica'):
+                return self._db.engines[g.db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,90 @@
+"""
+Vote Rollup Buckets
+Bucket arithmetic and chart series assembly for per-poll, per-option vote
+rollups kept at minute / hour / day granularity
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+GRANULARITIES = ['minute', 'hour', 'day']
+BUCKET_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Upper bound on points returned when gaps between buckets are filled in
+MAX_SERIES_POINTS = 2000
+
+
+def bucket_start(ts, granularity):
+    """Floor a datetime to the start of its bucket"""
+    if granularity == 'minute':
+        return ts.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def coarser(granularity):
+    """The next coarser granularity, or None for the coarsest"""
+    i = GRANULARITIES.index(granularity)
+    return GRANULARITIES[i + 1] if i + 1 < len(GRANULARITIES) else None
+
+
+def aggregate_rows(rows, granularity):
+    """
+    Fold (poll_id, option_id, bucket_start, count) rows into buckets of the given
+    granularity. Returns {(poll_id, option_id, bucket): count}
+    """
+    totals = {}
+    for poll_id, option_id, ts, count in rows:
+        key = (poll_id, option_id, bucket_start(ts, granularity))
+        totals[key] = totals.get(key, 0) + count
+    return totals
+
+
+def build_series(rows, option_ids, granularity):
+    """
+    Build velocity and cumulative series from rollup rows.
+
+    rows are (option_id, row_granularity, bucket_start, count) at any mix of
+    granularities. Rows finer than the requested granularity are floored into
+    it; coarser rows (already compacted) stay at their own bucket start since
+    they cannot be split.
+
+    Returns (bucket_datetimes, velocity, cumulative) where velocity and
+    cumulative are int64 arrays of shape (len(option_ids), len(buckets)).
+    """
+    order = {g: i for i, g in enumerate(GRANULARITIES)}
+    target = order[granularity]
+    column = {option_id: i for i, option_id in enumerate(option_ids)}
+
+    opt_idx, starts, counts = [], [], []
+    for option_id, row_granularity, ts, count in rows:
+        if option_id not in column:
+            continue
+        if order[row_granularity] < target:
+            ts = bucket_start(ts, granularity)
+        opt_idx.append(column[option_id])
+        starts.append(ts)
+        counts.append(count)
+
+    if not starts:
+        empty = np.zeros((len(option_ids), 0), dtype=np.int64)
+        return [], empty, empty
+
+    step = timedelta(seconds=BUCKET_SECONDS[granularity])
+    first, last = min(starts), max(starts)
+    if (last - first) / step < MAX_SERIES_POINTS:
+        buckets = [first + i * step for i in range(int((last - first) / step) + 1)]
+        # Coarser rows may not sit on the filled grid; add their starts explicitly
+        buckets = sorted(set(buckets).union(starts))
+    else:
+        buckets = sorted(set(starts))
+
+    position = {b: i for i, b in enumerate(buckets)}
+    velocity = np.zeros((len(option_ids), len(buckets)), dtype=np.int64)
+    np.add.at(velocity, (np.asarray(opt_idx), np.fromiter((position[t] for t in starts), dtype=np.int64)),
+              np.asarray(counts, dtype=np.int64))
+    return buckets, velocity, np.cumsum(velocity, axis=1)
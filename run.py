@@ -157,7 +157,9 @@ def start_application():
 
     try:
         # Import and run the app
-        from app import app
+        from app import app, start_background_services
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_background_services()
         app.run(debug=True, host='0.0.0.0', port=5000)
     except ImportError:
         print("\n❌ Error: Could not import app.py")
@@ -0,0 +1,97 @@
+"""
+Background Scheduler
+A single daemon thread that runs a lifecycle tick exactly when the next poll
+transition is due, plus any registered periodic housekeeping jobs
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class LifecycleScheduler:
+    """
+    Runs tick() whenever the next transition is due.
+
+    tick() does the work and returns the datetime of the next pending
+    transition (or None). wake() forces an early tick, e.g. right after a
+    poll is created with a schedule or expiry that is sooner than anything
+    currently pending.
+    """
+
+    def __init__(self, tick, max_sleep=60):
+        self._tick = tick
+        self._max_sleep = max_sleep
+        self._periodic = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_periodic(self, func, interval, name=None):
+        """Register func to run every `interval` seconds on the scheduler thread"""
+        with self._lock:
+            self._periodic.append({
+                'func': func,
+                'interval': interval,
+                'name': name or func.__name__,
+                'next_run': time.monotonic() + interval,
+            })
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='poll-lifecycle-scheduler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def _run_periodic(self):
+        now = time.monotonic()
+        next_run = None
+        for job in list(self._periodic):
+            if job['next_run'] <= now:
+                try:
+                    job['func']()
+                except Exception:
+                    logger.exception("Periodic job %s failed", job['name'])
+                job['next_run'] = time.monotonic() + job['interval']
+            if next_run is None or job['next_run'] < next_run:
+                next_run = job['next_run']
+        return next_run
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            next_due = None
+            try:
+                next_due = self._tick()
+            except Exception:
+                logger.exception("Lifecycle tick failed")
+
+            next_periodic = self._run_periodic()
+
+            timeout = self._max_sleep
+            if next_due is not None:
+                timeout = min(timeout, max((next_due - datetime.utcnow()).total_seconds(), 0))
+            if next_periodic is not None:
+                timeout = min(timeout, max(next_periodic - time.monotonic(), 0))
+            self._wake.wait(timeout)
@@ -0,0 +1,128 @@
+"""
+Sentiment Scoring for Poll Comments
+Lexicon-based scoring with whole-word matching through one compiled pattern,
+plus a NumPy batch scorer used to re-score stored comments
+"""
+
+import json
+import re
+
+import numpy as np
+
+DEFAULT_POSITIVE_WORDS = ['good', 'great', 'excellent', 'awesome', 'love', 'best', 'amazing']
+DEFAULT_NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'poor']
+
+POSITIVE = 'positive'
+NEUTRAL = 'neutral'
+NEGATIVE = 'negative'
+
+
+class SentimentLexicon:
+    """Word -> weight lexicon compiled into a single alternation pattern"""
+
+    def __init__(self, weights):
+        weights = {w.strip().lower(): float(v) for w, v in weights.items() if w and w.strip()}
+        # Longest entries first so multi-word phrases win over their prefixes
+        self.words = sorted(weights, key=lambda w: (-len(w), w))
+        self.index = {w: i for i, w in enumerate(self.words)}
+        self.weights = np.array([weights[w] for w in self.words], dtype=np.float64)
+        if self.words:
+            alternation = '|'.join(re.escape(w) for w in self.words)
+            self.pattern = re.compile(r"(?<![\w'])(?:%s)(?![\w'])" % alternation, re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the lexicon from SENTIMENT_* settings, with an optional JSON override file"""
+        weight = config.get('SENTIMENT_WORD_WEIGHT', 0.1)
+        weights = {w: weight for w in config.get('SENTIMENT_POSITIVE_WORDS', DEFAULT_POSITIVE_WORDS)}
+        weights.update({w: -weight for w in config.get('SENTIMENT_NEGATIVE_WORDS', DEFAULT_NEGATIVE_WORDS)})
+
+        lexicon_file = config.get('SENTIMENT_LEXICON_FILE')
+        if lexicon_file:
+            with open(lexicon_file, encoding='utf-8') as f:
+                weights.update(json.load(f))
+        return cls(weights)
+
+    def matches(self, text):
+        """Return the set of lexicon indices that occur in text"""
+        if not text or self.pattern is None:
+            return set()
+        return {self.index[m.group(0).lower()] for m in self.pattern.finditer(text)}
+
+    def score(self, text):
+        """Score one text; every distinct lexicon entry counts once"""
+        found = self.matches(text)
+        if not found:
+            return 0.0
+        return round(float(self.weights[list(found)].sum()), 4)
+
+    def score_many(self, texts):
+        """Score a batch of texts, returning a float64 array aligned with texts"""
+        n = len(texts)
+        if n == 0 or self.pattern is None:
+            return np.zeros(n, dtype=np.float64)
+
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for col in self.matches(text):
+                rows.append(row)
+                cols.append(col)
+
+        presence = np.zeros((n, len(self.words)), dtype=np.float64)
+        presence[rows, cols] = 1.0
+        return np.round(presence @ self.weights, 4)
+
+
+def classify_score(score, positive_threshold, negative_threshold):
+    """Map a single score to positive / neutral / negative"""
+    if score is None:
+        return NEUTRAL
+    if score >= positive_threshold:
+        return POSITIVE
+    if score <= negative_threshold:
+        return NEGATIVE
+    return NEUTRAL
+
+
+def classify_scores(scores, positive_threshold, negative_threshold):
+    """Vectorized classify_score: returns an int8 array of 1 / 0 / -1"""
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.zeros(scores.shape, dtype=np.int8)
+    labels[scores >= positive_threshold] = 1
+    labels[scores <= negative_threshold] = -1
+    return labels
+
+
+def aggregate_by_poll(poll_ids, scores, labels):
+    """
+    Group-by poll over one chunk of comments.
+    Returns {poll_id: [count, score_sum, positive, neutral, negative]}
+    """
+    if len(poll_ids) == 0:
+        return {}
+    poll_ids = np.asarray(poll_ids, dtype=np.int64)
+    uniq, inverse = np.unique(poll_ids, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=scores)
+    positive = np.bincount(inverse, weights=(labels == 1))
+    negative = np.bincount(inverse, weights=(labels == -1))
+    neutral = counts - positive - negative
+
+    return {
+        int(pid): [int(counts[i]), float(sums[i]), int(positive[i]), int(neutral[i]), int(negative[i])]
+        for i, pid in enumerate(uniq)
+    }
+
+
+def merge_aggregates(total, chunk):
+    """Fold one aggregate_by_poll() result into a running total, in place"""
+    for poll_id, values in chunk.items():
+        current = total.get(poll_id)
+        if current is None:
+            total[poll_id] = list(values)
+        else:
+            for i, v in enumerate(values):
+                current[i] += v
+    return total
@@ -0,0 +1,66 @@
+// Analytics Chart
+const ctx = document.getElementById('analyticsChart').getContext('2d');
+new Chart(ctx, {
+    type: 'bar',
+    data: {
+        labels: ['Users', 'Polls', 'Votes', 'Comments'],
+        datasets: [{
+            label: 'Platform Statistics',
+            data: JSON.parse(ctx.canvas.dataset.counts),
+            backgroundColor: [
+                'rgba(102, 126, 234, 0.8)',
+                'rgba(72, 187, 120, 0.8)',
+                'rgba(66, 153, 225, 0.8)',
+                'rgba(237, 137, 54, 0.8)'
+            ],
+            borderColor: [
+                'rgb(102, 126, 234)',
+                'rgb(72, 187, 120)',
+                'rgb(66, 153, 225)',
+                'rgb(237, 137, 54)'
+            ],
+            borderWidth: 2
+        }]
+    },
+    options: {
+        responsive: true,
+        plugins: {
+            legend: {
+                display: false
+            },
+            title: {
+                display: true,
+                text: 'Overall Platform Activity',
+                font: {
+                    size: 16
+                }
+            }
+        },
+        scales: {
+            y: {
+                beginAtZero: true
+            }
+        }
+    }
+});
+
+// Poll delete job progress
+const active = ['queued', 'running', 'retrying'];
+document.querySelectorAll('#deleteJobs [data-job-id]').forEach(item => {
+    const refresh = () => {
+        fetch(`/admin/delete_jobs/${item.dataset.jobId}`)
+            .then(response => response.json())
+            .then(job => {
+                if (!job.success) return;
+                item.querySelector('.job-state').textContent = job.state;
+                item.querySelector('.job-table').textContent = job.table || '';
+                item.querySelector('.job-count').textContent =
+                    job.deleted + (job.total ? ` / ${job.total}` : '') + ' rows';
+                const bar = item.querySelector('.progress-bar');
+                bar.style.width = (job.total ? Math.round(100 * job.deleted / job.total) : 0) + '%';
+                bar.classList.toggle('bg-danger', job.state === 'failed');
+                if (active.includes(job.state)) setTimeout(refresh, job.state === 'retrying' ? 10000 : 1000);
+            });
+    };
+    if (active.includes(item.dataset.state)) refresh();
+});
@@ -0,0 +1,73 @@
+let optionCount = 2;
+
+function addOption() {
+    optionCount++;
+    const container = document.getElementById('options-container');
+    const optionItem = document.createElement('div');
+    optionItem.className = 'option-item mb-3';
+    optionItem.innerHTML = `
+        <label class="form-label">Option ${optionCount} *</label>
+        <div class="input-group">
+            <input type="text" class="form-control" name="options[]" placeholder="Enter option text">
+            <input type="file" class="form-control" name="option_images[]" accept="image/*">
+            <button type="button" class="btn btn-danger" onclick="removeOption(this)">
+                <i class="fas fa-trash"></i>
+            </button>
+        </div>
+    `;
+    container.appendChild(optionItem);
+}
+
+function removeOption(btn) {
+    btn.closest('.option-item').remove();
+}
+
+function toggleCustomExpiration() {
+    const select = document.getElementById('expiration');
+    const customDiv = document.getElementById('custom-expiration');
+    if (select.value === 'custom') {
+        customDiv.style.display = 'block';
+    } else {
+        customDiv.style.display = 'none';
+    }
+}
+
+function toggleMaxChoices() {
+    const select = document.getElementById('voting_method');
+    document.getElementById('max-choices').style.display = select.value === 'approval' ? 'block' : 'none';
+}
+
+// -------------------- Front-End Validation --------------------
+document.getElementById('createPollForm').addEventListener('submit', function(event) {
+    let valid = true;
+
+    // Reset previous highlights
+    document.querySelectorAll('.form-control').forEach(el => el.style.borderColor = '');
+
+    // Check poll title
+    const title = document.getElementById('title');
+    if (!title.value.trim()) {
+        title.style.borderColor = 'red';
+        valid = false;
+    }
+
+    // Check all options
+    const options = document.querySelectorAll('input[name="options[]"]');
+    let filledOptions = 0;
+    options.forEach(opt => {
+        if (!opt.value.trim()) {
+            opt.style.borderColor = 'red';
+        } else {
+            filledOptions++;
+        }
+    });
+
+    if (filledOptions < 2) {
+        alert('Please enter at least 2 options.');
+        valid = false;
+    }
+
+    if (!valid) {
+        event.preventDefault();
+    }
+});
@@ -0,0 +1,70 @@
+// Page data rendered by embed.html
+const page = JSON.parse(document.getElementById('embed-page-data').textContent);
+let version = page.poll.version;
+
+function showMessage(text) {
+    document.getElementById('embed-message').textContent = text;
+}
+
+// Update counts in place; the option list itself never changes
+function render(poll) {
+    version = poll.version;
+    if (poll.results_hidden) {
+        return;
+    }
+    poll.options.forEach(function(option) {
+        const item = document.querySelector('.embed-option[data-option-id="' + option.id + '"]');
+        if (!item) {
+            return;
+        }
+        item.querySelector('.embed-count').textContent = option.votes + ' (' + option.percentage + '%)';
+        item.querySelector('.embed-fill').style.width = option.percentage + '%';
+    });
+    document.getElementById('embed-total').textContent = poll.total_votes + ' votes';
+}
+
+function refresh() {
+    fetch(page.jsonUrl)
+        .then(response => response.ok ? response.json() : null)
+        .then(data => {
+            if (data && data.version !== version) {
+                render(data);
+            }
+        })
+        .catch(() => {});
+}
+
+const form = document.getElementById('embed-form');
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
+    const email = document.getElementById('embed-email');
+    if (!email) {
+        return;
+    }
+    const chosen = Array.from(form.querySelectorAll('input[name="option"]:checked'), input => Number(input.value));
+    const body = {email: email.value.trim()};
+    if (page.poll.voting_method === 'approval') {
+        body.option_ids = chosen;
+    } else {
+        body.option_id = chosen[0];
+    }
+
+    fetch(page.voteUrl, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body)
+    })
+    .then(response => response.json())
+    .then(data => {
+        showMessage(data.message);
+        if (data.success) {
+            form.querySelectorAll('input, button').forEach(input => input.disabled = true);
+            render(data.poll);
+        }
+    })
+    .catch(() => showMessage('Could not record your vote, please try again'));
+});
+
+if (page.poll.status === 'open' && !page.poll.results_hidden) {
+    setInterval(refresh, page.refreshSeconds * 1000);
+}
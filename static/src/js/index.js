@@ -0,0 +1,54 @@
+// Search-box suggestions from the title prefix index
+const searchInput = document.getElementById('search-input');
+const suggestionList = document.getElementById('search-suggestions');
+let suggestTimer = null;
+let latestQuery = '';
+
+function hideSuggestions() {
+    suggestionList.hidden = true;
+    suggestionList.replaceChildren();
+}
+
+function showSuggestions(suggestions) {
+    suggestionList.replaceChildren(...suggestions.map(function(suggestion) {
+        const link = document.createElement('a');
+        link.className = 'list-group-item list-group-item-action';
+        link.href = suggestion.url;
+        link.textContent = suggestion.title;
+        return link;
+    }));
+    suggestionList.hidden = suggestions.length === 0;
+}
+
+searchInput.addEventListener('input', function() {
+    clearTimeout(suggestTimer);
+    const query = searchInput.value.trim();
+    latestQuery = query;
+    if (!query) {
+        hideSuggestions();
+        return;
+    }
+    suggestTimer = setTimeout(function() {
+        fetch(searchInput.dataset.suggestUrl + '?q=' + encodeURIComponent(query))
+            .then(response => response.ok ? response.json() : null)
+            .then(data => {
+                // Answers can arrive out of order; only the one for the current text is shown
+                if (data && data.query === latestQuery) {
+                    showSuggestions(data.suggestions);
+                }
+            })
+            .catch(() => {});
+    }, 150);
+});
+
+searchInput.addEventListener('keydown', function(e) {
+    if (e.key === 'Escape') {
+        hideSuggestions();
+    }
+});
+
+document.addEventListener('click', function(e) {
+    if (!suggestionList.contains(e.target) && e.target !== searchInput) {
+        hideSuggestions();
+    }
+});
@@ -0,0 +1,43 @@
+// Password strength checker
+document.getElementById('password').addEventListener('input', function(e) {
+    const password = e.target.value;
+    let strength = 0;
+
+    if (password.length >= 8) strength += 20;
+    if (password.length >= 12) strength += 10;
+    if (/[a-z]/.test(password)) strength += 20;
+    if (/[A-Z]/.test(password)) strength += 20;
+    if (/\d/.test(password)) strength += 15;
+    if (/[!@#$%^&*(),.?":{}|<>]/.test(password)) strength += 15;
+
+    const progressBar = document.querySelector('#password-strength .progress-bar');
+    const strengthText = document.getElementById('strength-text');
+
+    progressBar.style.width = strength + '%';
+
+    if (strength < 40) {
+        progressBar.className = 'progress-bar bg-danger';
+        strengthText.textContent = 'Weak password';
+        strengthText.className = 'text-danger';
+    } else if (strength < 70) {
+        progressBar.className = 'progress-bar bg-warning';
+        strengthText.textContent = 'Medium password';
+        strengthText.className = 'text-warning';
+    } else {
+        progressBar.className = 'progress-bar bg-success';
+        strengthText.textContent = 'Strong password';
+        strengthText.className = 'text-success';
+    }
+});
+
+// Password match validation
+document.getElementById('confirm_password').addEventListener('input', function(e) {
+    const password = document.getElementById('password').value;
+    const confirmPassword = e.target.value;
+
+    if (password !== confirmPassword) {
+        e.target.setCustomValidity('Passwords do not match');
+    } else {
+        e.target.setCustomValidity('');
+    }
+});
@@ -0,0 +1,215 @@
+// Page data rendered by view_poll.html
+const page = JSON.parse(document.getElementById('poll-page-data').textContent);
+
+let pendingReaction = null;
+let emailModal = null;
+
+// Initialize modal on page load
+document.addEventListener('DOMContentLoaded', function() {
+    if (page.isGuest) {
+        emailModal = new bootstrap.Modal(document.getElementById('emailModal'));
+    }
+});
+
+function copyLink() {
+    navigator.clipboard.writeText(window.location.href);
+    alert('Poll link copied to clipboard!');
+}
+
+function toggleReplyForm(commentId) {
+    const form = document.getElementById('reply-form-' + commentId);
+    form.style.display = form.style.display === 'none' ? 'block' : 'none';
+}
+
+function submitReaction(reactionType) {
+    if (!page.isGuest) {
+        // Registered user - submit directly
+        sendReaction(reactionType, null);
+    } else {
+        // Guest user - show email modal
+        pendingReaction = reactionType;
+        emailModal.show();
+    }
+}
+
+function confirmReaction() {
+    const email = document.getElementById('guestEmail').value.trim();
+    const errorDiv = document.getElementById('emailError');
+
+    // Basic email validation
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    if (!email) {
+        errorDiv.textContent = 'Email is required';
+        errorDiv.style.display = 'block';
+        return;
+    }
+    if (!emailRegex.test(email)) {
+        errorDiv.textContent = 'Please enter a valid email address';
+        errorDiv.style.display = 'block';
+        return;
+    }
+
+    errorDiv.style.display = 'none';
+    emailModal.hide();
+
+    // Send reaction with email
+    sendReaction(pendingReaction, email);
+}
+
+function sendReaction(reactionType, email) {
+    const formData = new FormData();
+    formData.append('reaction_type', reactionType);
+    if (email) {
+        formData.append('email', email);
+    }
+
+    fetch(page.reactUrl, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            if (data.message) {
+                // Show success message for guest users
+                const infoDiv = document.getElementById('reaction-info');
+                if (infoDiv) {
+                    infoDiv.className = 'alert alert-success mt-3';
+                    infoDiv.innerHTML = '<i class="fas fa-check-circle"></i> ' + data.message;
+                    setTimeout(() => {
+                        infoDiv.className = 'alert alert-info mt-3';
+                        infoDiv.innerHTML = '<i class="fas fa-info-circle"></i> <small>Guest users: Enter your email to react to this poll</small>';
+                    }, 3000);
+                }
+            }
+            // Reload page to show updated reaction counts
+            location.reload();
+        } else {
+            if (data.require_email) {
+                // This shouldn't happen if modal is working, but just in case
+                alert(data.message);
+            } else {
+                alert('Error: ' + data.message);
+            }
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred. Please try again.');
+    });
+}
+
+// Clear email input when modal is closed
+if (page.isGuest) {
+    document.getElementById('emailModal').addEventListener('hidden.bs.modal', function () {
+        document.getElementById('guestEmail').value = '';
+        document.getElementById('emailError').style.display = 'none';
+    });
+}
+
+const chartColors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b',
+                     '#fa709a', '#fee140', '#30cfd0', '#a8edea', '#fed6e3'];
+let timelineChart = null;
+
+// Vote timeline (cumulative votes per option, served from rollups)
+function loadTimeline(granularity) {
+    fetch(page.timelineUrl + '?granularity=' + granularity)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                return;
+            }
+            const datasets = data.options.map((option, i) => ({
+                label: option.text,
+                data: option.cumulative,
+                borderColor: chartColors[i % chartColors.length],
+                fill: false,
+                tension: 0.2
+            }));
+            if (timelineChart) {
+                timelineChart.destroy();
+            }
+            timelineChart = new Chart(document.getElementById('timelineChart').getContext('2d'), {
+                type: 'line',
+                data: {
+                    labels: data.buckets.map(b => new Date(b + 'Z').toLocaleString()),
+                    datasets: datasets
+                },
+                options: {
+                    responsive: true,
+                    plugins: { legend: { position: 'bottom' } },
+                    scales: { y: { beginAtZero: true } }
+                }
+            });
+        });
+}
+
+if (page.showResults) {
+    // Create chart
+    const ctx = document.getElementById('pollChart').getContext('2d');
+    new Chart(ctx, {
+        type: 'doughnut',
+        data: {
+            labels: page.chart.labels,
+            datasets: [{
+                data: page.chart.counts,
+                backgroundColor: chartColors
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: {
+                    position: 'bottom'
+                }
+            }
+        }
+    });
+
+    document.querySelectorAll('#timeline-granularity button').forEach(button => {
+        button.addEventListener('click', function () {
+            document.querySelectorAll('#timeline-granularity button').forEach(b => b.classList.remove('active'));
+            this.classList.add('active');
+            loadTimeline(this.dataset.granularity);
+        });
+    });
+    loadTimeline('hour');
+}
+
+// Live updates from other voters and commenters
+if (window.EventSource) {
+    const liveEvents = new EventSource(page.eventsUrl);
+    const pending = {votes: 0, comments: 0};
+
+    function showLiveActivity() {
+        const parts = [];
+        if (pending.votes) parts.push(pending.votes + (pending.votes === 1 ? ' new vote' : ' new votes'));
+        if (pending.comments) parts.push(pending.comments + (pending.comments === 1 ? ' new comment' : ' new comments'));
+        document.getElementById('live-activity-text').textContent = parts.join(', ') + ' since you opened this poll.';
+        document.getElementById('live-activity').classList.remove('d-none');
+    }
+
+    liveEvents.addEventListener('vote.cast', function () {
+        pending.votes += 1;
+        showLiveActivity();
+    });
+    liveEvents.addEventListener('comment.added', function () {
+        pending.comments += 1;
+        showLiveActivity();
+    });
+    liveEvents.addEventListener('reaction.changed', function (e) {
+        const reactions = JSON.parse(e.data).reactions || {};
+        let total = 0;
+        Object.keys(reactions).forEach(type => {
+            const count = document.getElementById('count-' + type);
+            if (count) count.textContent = reactions[type];
+            total += reactions[type];
+        });
+        document.getElementById('total-reactions').textContent = total;
+    });
+    liveEvents.addEventListener('poll.deleting', function () {
+        liveEvents.close();
+        document.getElementById('live-activity-text').textContent = 'This poll has been removed.';
+        document.getElementById('live-activity').classList.remove('d-none');
+    });
+}
@@ -0,0 +1,101 @@
+"""
+Title Suggestions
+In-memory prefix index over poll titles for search-box autocomplete.
+Every word of a title starts one sorted key (the title from that word on),
+so "tea" finds "Coffee or tea?". A lookup is a few bisects and reads only
+as many entries as it returns.
+"""
+
+import bisect
+import re
+import threading
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Lowercased words joined by single spaces; punctuation is dropped"""
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def _prefix_range(entries, prefix):
+    start = bisect.bisect_left(entries, (prefix,))
+    # Keys starting with prefix sort before prefix followed by the highest code point
+    return start, bisect.bisect_left(entries, (prefix + '\U0010ffff',), start)
+
+
+class TitleIndex:
+    """
+    Two sorted lists of (key, poll_id): whole normalized titles, and the
+    title from each later word on. add() and remove() keep them sorted in
+    place, so creating or deleting a poll never rebuilds the index.
+    """
+
+    def __init__(self):
+        self._titles = {}
+        self._leading = []
+        self._inner = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(title):
+        words = normalize(title).split(' ')
+        return ' '.join(words), [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def add(self, poll_id, title):
+        with self._lock:
+            self._remove(poll_id)
+            self._titles[poll_id] = title
+            leading, inner = self._keys(title)
+            bisect.insort(self._leading, (leading, poll_id))
+            for key in inner:
+                bisect.insort(self._inner, (key, poll_id))
+
+    def remove(self, poll_id):
+        with self._lock:
+            self._remove(poll_id)
+
+    def _remove(self, poll_id):
+        title = self._titles.pop(poll_id, None)
+        if title is None:
+            return
+        leading, inner = self._keys(title)
+        for entries, keys in ((self._leading, [leading]), (self._inner, inner)):
+            for key in keys:
+                i = bisect.bisect_left(entries, (key, poll_id))
+                if i < len(entries) and entries[i] == (key, poll_id):
+                    del entries[i]
+
+    def build(self, polls):
+        """Replace the contents with (poll_id, title) pairs, sorting once"""
+        titles = dict(polls)
+        leading, inner = [], []
+        for poll_id, title in titles.items():
+            whole, rest = self._keys(title)
+            leading.append((whole, poll_id))
+            inner.extend((key, poll_id) for key in rest)
+        leading.sort()
+        inner.sort()
+        with self._lock:
+            self._titles, self._leading, self._inner = titles, leading, inner
+
+    def suggest(self, prefix, limit=8):
+        """[(poll_id, title)] for titles starting with prefix, then titles with a later word that does"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = []
+        with self._lock:
+            start, stop = _prefix_range(self._leading, prefix)
+            found.extend(poll_id for _, poll_id in self._leading[start:min(stop, start + limit)])
+            start, stop = _prefix_range(self._inner, prefix)
+            for i in range(start, stop):
+                if len(found) >= limit:
+                    break
+                poll_id = self._inner[i][1]
+                if poll_id not in found:
+                    found.append(poll_id)
+            return [(poll_id, self._titles[poll_id]) for poll_id in found]
+
+    def __len__(self):
+        return len(self._titles)
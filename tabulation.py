@@ -0,0 +1,138 @@
+"""
+Ballot Tabulation
+Vectorized counting of ranked (instant runoff, Borda) and approval ballots.
+Ballots are held as an int32 matrix of option columns, one row per ballot,
+padded with -1 after the voter's last preference.
+"""
+
+import numpy as np
+
+SINGLE = 'single'
+IRV = 'irv'
+BORDA = 'borda'
+APPROVAL = 'approval'
+
+VOTING_METHODS = {
+    SINGLE: 'Single choice',
+    IRV: 'Ranked choice (instant runoff)',
+    BORDA: 'Ranked choice (Borda count)',
+    APPROVAL: 'Approve up to N',
+}
+RANKED_METHODS = (IRV, BORDA)
+
+
+def ballot_matrix(ballot_ids, ranks, columns, max_rank=None):
+    """
+    Build the (ballots, ranks) matrix from flat (ballot_id, rank, column)
+    arrays, e.g. straight from a query over stored rankings.
+    Returns (matrix, unique_ballot_ids).
+    """
+    ballot_ids = np.asarray(ballot_ids, dtype=np.int64)
+    ranks = np.asarray(ranks, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int32)
+    if ballot_ids.size == 0:
+        return np.full((0, max_rank or 1), -1, dtype=np.int32), ballot_ids
+
+    unique_ids, rows = np.unique(ballot_ids, return_inverse=True)
+    width = max_rank or int(ranks.max()) + 1
+    matrix = np.full((len(unique_ids), width), -1, dtype=np.int32)
+    keep = ranks < width
+    matrix[rows[keep], ranks[keep]] = columns[keep]
+    return matrix, unique_ids
+
+
+def _first_active(matrix, active):
+    """Column of each ballot's highest-ranked still-active option, -1 if exhausted"""
+    # Pad `active` so the -1 filler indexes a permanently inactive slot
+    lookup = np.append(active, False)
+    live = lookup[matrix]
+    has_live = live.any(axis=1)
+    first = np.argmax(live, axis=1)
+    top = matrix[np.arange(len(matrix)), first]
+    return np.where(has_live, top, -1)
+
+
+def instant_runoff(matrix, num_options):
+    """
+    Eliminate the weakest option round by round until one holds a majority
+    of the ballots still in play. Ties for elimination go to the option with
+    fewer first preferences, then to the later option.
+    """
+    active = np.ones(num_options, dtype=bool)
+    first_preferences = np.bincount(matrix[:, 0][matrix[:, 0] >= 0], minlength=num_options) \
+        if len(matrix) else np.zeros(num_options, dtype=np.int64)
+    rounds = []
+    winner = None
+
+    while active.any():
+        top = _first_active(matrix, active)
+        continuing = top >= 0
+        counts = np.bincount(top[continuing], minlength=num_options)
+        in_play = int(continuing.sum())
+        round_info = {
+            'counts': counts.tolist(),
+            'active': np.flatnonzero(active).tolist(),
+            'exhausted': int(len(top) - in_play),
+            'eliminated': None,
+        }
+        rounds.append(round_info)
+
+        leader = int(np.argmax(np.where(active, counts, -1)))
+        if in_play == 0:
+            break
+        if counts[leader] * 2 > in_play or active.sum() == 1:
+            winner = leader
+            break
+
+        # Lowest count, then fewest first preferences, then latest option
+        candidates = np.flatnonzero(active)
+        order = np.lexsort((-candidates, first_preferences[candidates], counts[candidates]))
+        loser = int(candidates[order[0]])
+        active[loser] = False
+        round_info['eliminated'] = loser
+
+    return {'rounds': rounds, 'winner': winner}
+
+
+def borda(matrix, num_options):
+    """n-1 points for a first preference, n-2 for a second, ... 0 for unranked"""
+    valid = matrix >= 0
+    points = (num_options - 1 - np.arange(matrix.shape[1]))[np.newaxis, :].repeat(len(matrix), axis=0)
+    scores = np.bincount(matrix[valid], weights=np.clip(points[valid], 0, None), minlength=num_options)
+    scores = scores.astype(np.int64)
+    winner = int(np.argmax(scores)) if scores.any() else None
+    return {'rounds': [{'counts': scores.tolist(), 'active': list(range(num_options)),
+                        'exhausted': 0, 'eliminated': None}], 'winner': winner}
+
+
+def approval(matrix, num_options):
+    """Each listed option gets one approval"""
+    valid = matrix >= 0
+    counts = np.bincount(matrix[valid], minlength=num_options).astype(np.int64)
+    winner = int(np.argmax(counts)) if counts.any() else None
+    return {'rounds': [{'counts': counts.tolist(), 'active': list(range(num_options)),
+                        'exhausted': 0, 'eliminated': None}], 'winner': winner}
+
+
+TABULATORS = {IRV: instant_runoff, BORDA: borda, APPROVAL: approval}
+
+
+def tabulate(method, matrix, option_ids):
+    """
+    Run the count and translate option columns back to option ids.
+    Rounds hold {'counts': {option_id: n}, 'eliminated': option_id, ...}.
+    """
+    result = TABULATORS[method](matrix, len(option_ids))
+
+    def to_id(column):
+        return option_ids[column] if column is not None else None
+
+    rounds = []
+    for i, r in enumerate(result['rounds']):
+        rounds.append({
+            'round': i + 1,
+            'counts': {option_ids[c]: int(r['counts'][c]) for c in r['active']},
+            'exhausted': r['exhausted'],
+            'eliminated': to_id(r['eliminated']),
+        })
+    return {'method': method, 'ballots': int(len(matrix)), 'rounds': rounds, 'winner': to_id(result['winner'])}
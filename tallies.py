@@ -0,0 +1,117 @@
+"""
+Sharded Tallies
+Counter naming, shard selection and write-rate tracking for per-poll vote
+and reaction totals that are spread over several rows when a poll runs hot,
+and a write-back buffer for the other counters every vote touches
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+OPTION_PREFIX = 'option:'
+REACTION_PREFIX = 'reaction:'
+
+
+def option_counter(option_id):
+    return f"{OPTION_PREFIX}{option_id}"
+
+
+def reaction_counter(reaction_type):
+    return f"{REACTION_PREFIX}{reaction_type}"
+
+
+def pick_shard(num_shards):
+    """Random shard so concurrent writers rarely touch the same row"""
+    return random.randrange(num_shards) if num_shards > 1 else 0
+
+
+def split_counts(totals):
+    """{counter: total} -> ({option_id: count}, {reaction_type: count})"""
+    options, reactions = {}, {}
+    for counter, total in totals.items():
+        if counter.startswith(OPTION_PREFIX):
+            options[int(counter[len(OPTION_PREFIX):])] = int(total)
+        elif counter.startswith(REACTION_PREFIX):
+            reactions[counter[len(REACTION_PREFIX):]] = int(total)
+    return options, reactions
+
+
+class WriteRateTracker:
+    """Writes per second for each key, averaged over a sliding window of one-second buckets"""
+
+    def __init__(self, window=10, max_keys=10000):
+        self.window = window
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, now=None):
+        """Count one write for key and return its current rate"""
+        second = int(now if now is not None else time.monotonic())
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()
+                entry = self._buckets[key] = [deque(), 0]
+            buckets, total = entry
+            if buckets and buckets[-1][0] == second:
+                buckets[-1][1] += 1
+            else:
+                buckets.append([second, 1])
+            total += 1
+            while buckets[0][0] <= second - self.window:
+                total -= buckets.popleft()[1]
+            entry[1] = total
+            return total / self.window
+
+    def forget(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class CounterBuffer:
+    """
+    Committed counter increments waiting to be written back, per row.
+    add() is a dict update under a lock, so a row every vote touches (the
+    global vote total, a poll's current minute bucket) is written once per
+    flush instead of once per vote.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row(table, key):
+        return table, tuple(sorted(key.items()))
+
+    def add(self, table, key, increments):
+        with self._lock:
+            entry = self._pending.setdefault(self._row(table, key), {})
+            for column, amount in increments.items():
+                entry[column] = entry.get(column, 0) + amount
+
+    def pending(self, table, key):
+        """{column: amount} not yet flushed for one row"""
+        with self._lock:
+            return dict(self._pending.get(self._row(table, key), {}))
+
+    def drain(self):
+        """Take everything pending: {(table, key items): {column: amount}}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, drained):
+        """Put back a drained batch whose flush failed, merging with increments added since"""
+        with self._lock:
+            for row, increments in drained.items():
+                entry = self._pending.setdefault(row, {})
+                for column, amount in increments.items():
+                    entry[column] = entry.get(column, 0) + amount
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,160 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import archive
+from archive import ArchiveFormatError, ArchiveReader, write_archive
+
+BLOCK_ROWS = 4
+
+
+def votes_table(poll_ids):
+    n = len(poll_ids)
+    return {
+        'id': np.arange(100, 100 + n, dtype=np.int64),
+        'poll_id': np.asarray(poll_ids, dtype=np.int32),
+        'option_id': np.arange(n, dtype=np.int32) % 3 + 7,
+        'user_id': np.where(np.arange(n) % 2 == 0, -1, np.arange(n)).astype(np.int32),
+        'voter_id': np.arange(n, dtype=np.int32)[::-1],
+        # Not sorted: delta encoding has to survive negative steps
+        'timestamp': np.array([1_700_000_000_000_000 + (i * 7919 % 13) * 1_000_000 for i in range(n)], dtype=np.int64),
+        'is_anonymous': (np.arange(n) % 3 == 0).astype(np.uint8),
+    }
+
+
+def rankings_table(poll_ids):
+    n = len(poll_ids)
+    return {
+        'vote_id': np.arange(100, 100 + n, dtype=np.int64),
+        'poll_id': np.asarray(poll_ids, dtype=np.int32),
+        'option_id': np.arange(n, dtype=np.int32) % 3 + 7,
+        'rank': (np.arange(n) % 3).astype(np.int16),
+    }
+
+
+def empty_rankings():
+    return {name: np.array([], dtype=dtype) for name, (dtype, _) in archive.RANKING_COLUMNS.items()}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'votes.pva')
+
+
+# Poll 2 runs from row 3 to row 10, across blocks [0, 4), [4, 8) and [8, 12)
+POLL_IDS = [1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 5, 5]
+
+
+def test_round_trip_across_blocks(path):
+    votes, rankings = votes_table(POLL_IDS), rankings_table(POLL_IDS)
+    write_archive(path, {'votes': votes, 'ballot_rankings': rankings}, meta={'poll_id': 2}, block_rows=BLOCK_ROWS)
+    with ArchiveReader(path) as reader:
+        assert reader.meta == {'poll_id': 2}
+        assert reader.rows('votes') == len(POLL_IDS) and reader.rows('ballot_rankings') == len(POLL_IDS)
+        assert reader.columns('votes') == list(archive.VOTE_COLUMNS)
+        read = reader.read('votes')
+        for name, values in votes.items():
+            assert read[name].dtype == values.dtype
+            np.testing.assert_array_equal(read[name], values)
+        np.testing.assert_array_equal(reader.read('ballot_rankings')['rank'], rankings['rank'])
+
+
+def test_poll_range_across_block_boundaries(path):
+    votes = votes_table(POLL_IDS)
+    write_archive(path, {'votes': votes, 'ballot_rankings': empty_rankings()}, block_rows=BLOCK_ROWS)
+    with ArchiveReader(path) as reader:
+        assert reader.poll_range('votes', 1) == (0, 3)
+        assert reader.poll_range('votes', 2) == (3, 11)
+        assert reader.poll_range('votes', 5) == (11, 13)
+        # Absent polls give an empty range where they would sort
+        assert reader.poll_range('votes', 3) == (11, 11)
+        assert reader.poll_range('votes', 9) == (13, 13)
+
+        poll = reader.read('votes', ['id', 'timestamp'], poll_id=2)
+        np.testing.assert_array_equal(poll['id'], votes['id'][3:11])
+        np.testing.assert_array_equal(poll['timestamp'], votes['timestamp'][3:11])
+        assert reader.read('votes', ['id'], poll_id=3)['id'].size == 0
+
+
+def test_block_boundary_exactly_at_a_poll(path):
+    poll_ids = [1] * BLOCK_ROWS + [2] * BLOCK_ROWS
+    votes = votes_table(poll_ids)
+    write_archive(path, {'votes': votes, 'ballot_rankings': empty_rankings()}, block_rows=BLOCK_ROWS)
+    with ArchiveReader(path) as reader:
+        assert reader.poll_range('votes', 2) == (BLOCK_ROWS, 2 * BLOCK_ROWS)
+        np.testing.assert_array_equal(reader.read('votes', ['voter_id'], poll_id=2)['voter_id'],
+                                      votes['voter_id'][BLOCK_ROWS:])
+
+
+def test_empty_tables(path):
+    write_archive(path, {'votes': votes_table([]), 'ballot_rankings': empty_rankings()})
+    with ArchiveReader(path) as reader:
+        assert reader.rows('votes') == 0 and reader.rows('ballot_rankings') == 0
+        assert reader.poll_range('votes', 1) == (0, 0)
+        read = reader.read('votes')
+        assert all(read[name].size == 0 for name in archive.VOTE_COLUMNS)
+        assert read['timestamp'].dtype == np.int64
+        assert reader.read('ballot_rankings', poll_id=1)['rank'].size == 0
+
+
+def test_columns_must_have_equal_lengths(path):
+    votes = votes_table([1, 1])
+    votes['user_id'] = votes['user_id'][:1]
+    with pytest.raises(ValueError, match='user_id'):
+        write_archive(path, {'votes': votes, 'ballot_rankings': empty_rankings()})
+    assert not os.path.exists(path)
+
+
+def test_columns_dropped_from_the_schema_still_read(path, monkeypatch):
+    columns = dict(archive.VOTE_COLUMNS, email=('str', 'json'))
+    monkeypatch.setitem(archive.TABLES, 'votes', columns)
+    votes = dict(votes_table([1, 1, 2]), email=['a@x.com', None, 'b@x.com'])
+    write_archive(path, {'votes': votes, 'ballot_rankings': empty_rankings()}, block_rows=2)
+    monkeypatch.undo()
+    with ArchiveReader(path) as reader:
+        assert reader.columns('votes')[-1] == 'email'
+        assert reader.read('votes', ['email'])['email'].tolist() == ['a@x.com', None, 'b@x.com']
+        assert list(reader.read('votes', list(archive.VOTE_COLUMNS), poll_id=2)) == list(archive.VOTE_COLUMNS)
+
+
+@pytest.mark.parametrize('keep', [0, 3, 11, -1, -5, -20])
+def test_truncated_files_are_rejected(path, keep):
+    write_archive(path, {'votes': votes_table(POLL_IDS), 'ballot_rankings': empty_rankings()}, block_rows=BLOCK_ROWS)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:keep])
+    with pytest.raises(ArchiveFormatError):
+        ArchiveReader(path)
+
+
+def test_corrupt_footer_is_rejected(path):
+    write_archive(path, {'votes': votes_table([1]), 'ballot_rankings': empty_rankings()})
+    with open(path, 'r+b') as f:
+        f.seek(-12, os.SEEK_END)
+        f.write((10 ** 9).to_bytes(8, 'little'))
+    with pytest.raises(ArchiveFormatError):
+        ArchiveReader(path)
+
+
+def test_blocks_outside_the_data_are_rejected(path):
+    write_archive(path, {'votes': votes_table([1]), 'ballot_rankings': empty_rankings()})
+    with open(path, 'rb') as f:
+        data = f.read()
+    length = int.from_bytes(data[-12:-4], 'little')
+    footer = json.loads(data[-12 - length:-12])
+    footer['tables']['votes']['columns']['id']['blocks'][0][0] = len(data)
+    encoded = json.dumps(footer).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data[:-12 - length] + encoded + len(encoded).to_bytes(8, 'little') + archive.MAGIC)
+    with pytest.raises(ArchiveFormatError, match='past the data'):
+        ArchiveReader(path)
+
+
+def test_other_files_are_rejected(path):
+    with open(path, 'wb') as f:
+        f.write(b'not an archive, just some bytes')
+    with pytest.raises(ArchiveFormatError):
+        ArchiveReader(path)
@@ -0,0 +1,167 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from events import EventBus, RedisEventBus, UnixSocketEventBus
+
+TIMEOUT = 5
+
+
+class Inbox:
+    """Handler that records events and lets a test wait for them"""
+
+    def __init__(self):
+        self.events = []
+        self._arrived = threading.Condition()
+
+    def __call__(self, event):
+        with self._arrived:
+            self.events.append(event)
+            self._arrived.notify_all()
+
+    def wait_for(self, count):
+        with self._arrived:
+            self._arrived.wait_for(lambda: len(self.events) >= count, TIMEOUT)
+        return [event['type'] for event in self.events]
+
+
+@pytest.fixture
+def unix_buses(tmp_path):
+    buses = [UnixSocketEventBus(str(tmp_path)) for _ in range(2)]
+    for bus in buses:
+        bus.start()
+    yield buses
+    for bus in buses:
+        bus.close()
+
+
+@pytest.fixture
+def redis_buses():
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    buses = [RedisEventBus(client=fakeredis.FakeStrictRedis(server=server)) for _ in range(2)]
+    for bus in buses:
+        bus.start()
+    yield buses
+    for bus in buses:
+        bus.close()
+
+
+def test_local_delivery_by_type():
+    bus = EventBus()
+    everything, votes = Inbox(), Inbox()
+    bus.subscribe(everything)
+    bus.subscribe(votes, ['vote.cast'])
+
+    event = bus.publish('vote.cast', poll_id=1)
+    bus.publish('comment.added', poll_id=1)
+
+    assert event['origin'] == bus.origin and event['poll_id'] == 1
+    assert everything.wait_for(2) == ['vote.cast', 'comment.added']
+    assert votes.wait_for(1) == ['vote.cast']
+
+
+def test_local_unsubscribe():
+    bus = EventBus()
+    inbox = Inbox()
+    unsubscribe = bus.subscribe(inbox)
+    bus.publish('vote.cast', poll_id=1)
+    unsubscribe()
+    unsubscribe()  # A second call is harmless
+    bus.publish('vote.cast', poll_id=2)
+    assert [event['poll_id'] for event in inbox.events] == [1]
+
+
+def test_failing_handler_does_not_stop_delivery():
+    bus = EventBus()
+    inbox = Inbox()
+    bus.subscribe(lambda event: 1 / 0)
+    bus.subscribe(inbox)
+    bus.publish('vote.cast', poll_id=1)
+    assert inbox.wait_for(1) == ['vote.cast']
+
+
+def test_received_events_filtered_by_origin():
+    bus = EventBus()
+    inbox = Inbox()
+    bus.subscribe(inbox)
+    bus._receive(b'{"type": "vote.cast", "origin": "%s"}' % bus.origin.encode())
+    bus._receive(b'{"type": "comment.added", "origin": "elsewhere"}')
+    bus._receive(b'not json')
+    assert inbox.wait_for(1) == ['comment.added']
+
+
+@pytest.mark.parametrize('buses', ['unix_buses', 'redis_buses'])
+def test_remote_delivery(buses, request):
+    sender, receiver = request.getfixturevalue(buses)
+    sent, received = Inbox(), Inbox()
+    sender.subscribe(sent)
+    receiver.subscribe(received, ['vote.cast'])
+
+    sender.publish('vote.cast', poll_id=7, voter_id=3)
+    sender.publish('comment.added', poll_id=7)
+
+    assert received.wait_for(1) == ['vote.cast']
+    assert received.events[0]['poll_id'] == 7 and received.events[0]['origin'] == sender.origin
+    # The publisher dispatched locally and must not see its own event come back
+    receiver.publish('reaction.changed', poll_id=7)
+    assert sent.wait_for(3) == ['vote.cast', 'comment.added', 'reaction.changed']
+
+
+@pytest.mark.parametrize('buses', ['unix_buses', 'redis_buses'])
+def test_remote_unsubscribe(buses, request):
+    sender, receiver = request.getfixturevalue(buses)
+    received, marker = Inbox(), Inbox()
+    unsubscribe = receiver.subscribe(received, ['vote.cast'])
+    receiver.subscribe(marker, ['bench.end'])
+
+    unsubscribe()
+    sender.publish('vote.cast', poll_id=1)
+    sender.publish('bench.end')
+
+    # Events arrive in order, so once the marker is in the vote would have been too
+    assert marker.wait_for(1) == ['bench.end']
+    assert received.events == []
+
+
+def test_unix_start_is_per_process(tmp_path):
+    bus = UnixSocketEventBus(str(tmp_path))
+    bus.start()
+    origin, path = bus.origin, bus.path
+    bus.start()
+    assert (bus.origin, bus.path) == (origin, path)
+    bus.close()
+    assert not (tmp_path / path.rsplit('/', 1)[1]).exists()
+
+
+def _start_in_child(bus, conn):
+    bus.start()
+    conn.send((bus.origin, bus.path))
+    bus.publish('vote.cast', poll_id=9)
+    conn.recv()
+    bus.close()
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_unix_forked_worker_gets_its_own_identity(tmp_path):
+    # What gunicorn --preload does: build and start the bus in the master, then fork workers
+    bus = UnixSocketEventBus(str(tmp_path))
+    inbox = Inbox()
+    bus.subscribe(inbox)
+    bus.start()
+
+    parent, child = multiprocessing.Pipe()
+    worker = multiprocessing.get_context('fork').Process(target=_start_in_child, args=(bus, child))
+    worker.start()
+    try:
+        origin, path = parent.recv()
+        assert origin != bus.origin and path != bus.path
+        # The worker's event reaches the master instead of being taken for its own
+        assert inbox.wait_for(1) == ['vote.cast']
+    finally:
+        parent.send('done')
+        worker.join(TIMEOUT)
+    # The worker removed its own socket, not the master's
+    assert (tmp_path / bus.path.rsplit('/', 1)[1]).exists()
+    bus.close()
@@ -0,0 +1,123 @@
+import http.server
+import socket
+import threading
+
+import pytest
+
+import remote_images
+from remote_images import RemoteImageError, fetch_image, image_type, is_public_address
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 32
+
+
+class ImageHandler(http.server.BaseHTTPRequestHandler):
+    routes = {
+        '/cat.png': (200, 'image/png', PNG),
+        '/page.png': (200, 'text/html', b'<html></html>'),
+        '/fake.png': (200, 'image/png', b'not an image at all'),
+    }
+
+    def do_GET(self):
+        if self.path.startswith('/redirect?'):
+            self.send_response(302)
+            self.send_header('Location', self.path.split('?', 1)[1])
+            self.end_headers()
+            return
+        status, content_type, body = self.routes[self.path]
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.HTTPServer(('127.0.0.1', 0), ImageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def allow_loopback(monkeypatch):
+    """Treat the test server's loopback address as public"""
+    monkeypatch.setattr(remote_images, 'is_public_address', lambda address: True)
+
+
+@pytest.mark.parametrize('address', ['127.0.0.1', '10.1.2.3', '172.16.0.1', '192.168.1.1', '169.254.169.254',
+                                     '0.0.0.0', '100.64.0.1', '::1', 'fe80::1', 'fd00::1', '::ffff:127.0.0.1',
+                                     '224.0.0.1'])
+def test_non_public_addresses_are_refused(address):
+    assert not is_public_address(address)
+
+
+def test_public_addresses_are_allowed():
+    assert is_public_address('93.184.216.34')
+    assert is_public_address('2606:2800:220:1:248:1893:25c8:1946')
+
+
+def test_image_type_reads_the_leading_bytes():
+    assert image_type(PNG) == 'png'
+    assert image_type(b'\xff\xd8\xff\xe0rest') == 'jpeg'
+    assert image_type(b'GIF89a...') == 'gif'
+    assert image_type(b'RIFF\x10\0\0\0WEBPVP8 ') == 'webp'
+    assert image_type(b'<svg xmlns="http://www.w3.org/2000/svg"/>') is None
+    assert image_type(b'') is None
+
+
+def test_loopback_host_is_refused_before_connecting(server):
+    with pytest.raises(RemoteImageError, match='non-public'):
+        fetch_image(f"{server}/cat.png", timeout=5, limit=1024)
+
+
+def test_name_resolving_to_loopback_is_refused():
+    with pytest.raises(RemoteImageError, match='non-public'):
+        remote_images.public_create_connection(('localhost', 80), timeout=1)
+
+
+def test_redirect_to_a_non_public_address_is_refused(server, monkeypatch):
+    checked = []
+
+    def first_hop_only(address):
+        checked.append(address)
+        return len(checked) == 1
+
+    monkeypatch.setattr(remote_images, 'is_public_address', first_hop_only)
+    with pytest.raises(RemoteImageError, match='non-public'):
+        fetch_image(f"{server}/redirect?{server}/cat.png", timeout=5, limit=1024)
+    assert len(checked) == 2
+
+
+def test_redirect_to_another_scheme_is_refused(server, allow_loopback):
+    with pytest.raises(RemoteImageError, match='unsupported'):
+        fetch_image(f"{server}/redirect?ftp://127.0.0.1/cat.png", timeout=5, limit=1024)
+
+
+def test_image_is_downloaded(server, allow_loopback):
+    assert fetch_image(f"{server}/cat.png", timeout=5, limit=1024) == (PNG, 'png')
+
+
+def test_non_image_content_type_is_refused(server, allow_loopback):
+    with pytest.raises(RemoteImageError, match='not an image'):
+        fetch_image(f"{server}/page.png", timeout=5, limit=1024)
+
+
+def test_bytes_that_are_not_an_image_are_refused(server, allow_loopback):
+    with pytest.raises(RemoteImageError, match='not a PNG'):
+        fetch_image(f"{server}/fake.png", timeout=5, limit=1024)
+
+
+def test_oversized_image_is_refused(server, allow_loopback):
+    with pytest.raises(RemoteImageError, match='larger'):
+        fetch_image(f"{server}/cat.png", timeout=5, limit=8)
+
+
+def test_unsupported_scheme_is_refused():
+    with pytest.raises(RemoteImageError, match='scheme'):
+        fetch_image('ftp://example.com/cat.png', timeout=5, limit=1024)
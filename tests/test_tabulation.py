@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from tabulation import APPROVAL, BORDA, IRV, approval, ballot_matrix, borda, instant_runoff, tabulate
+
+
+def ballots(*rows, width=None):
+    """Matrix of ranked option columns, padded with -1"""
+    width = width or max(len(row) for row in rows)
+    return np.array([list(row) + [-1] * (width - len(row)) for row in rows], dtype=np.int32)
+
+
+def no_ballots(width=1):
+    return np.full((0, width), -1, dtype=np.int32)
+
+
+def test_ballot_matrix_groups_rankings_by_ballot():
+    matrix, ids = ballot_matrix([5, 5, 3], [0, 1, 0], [2, 0, 1])
+    assert ids.tolist() == [3, 5]
+    assert matrix.tolist() == [[1, -1], [2, 0]]
+
+
+def test_ballot_matrix_drops_ranks_past_max_rank():
+    matrix, _ = ballot_matrix([1, 1, 1], [0, 1, 2], [0, 1, 2], max_rank=2)
+    assert matrix.tolist() == [[0, 1]]
+
+
+def test_ballot_matrix_of_no_rankings():
+    matrix, ids = ballot_matrix([], [], [], max_rank=3)
+    assert matrix.shape == (0, 3) and ids.size == 0
+
+
+def test_irv_majority_in_the_first_round():
+    result = instant_runoff(ballots([0], [0], [1]), 2)
+    assert result['winner'] == 0
+    assert result['rounds'] == [{'counts': [2, 1], 'active': [0, 1], 'exhausted': 0, 'eliminated': None}]
+
+
+def test_irv_transfers_the_eliminated_options_ballots():
+    # A 4, B 3, C 2 (both C ballots rank B second): C goes, B wins 5 to 4
+    result = instant_runoff(ballots(*[[0]] * 4, *[[1]] * 3, *[[2, 1]] * 2), 3)
+    assert [r['counts'] for r in result['rounds']] == [[4, 3, 2], [4, 5, 0]]
+    assert [r['eliminated'] for r in result['rounds']] == [2, None]
+    assert result['winner'] == 1
+
+
+def test_irv_elimination_ties_and_exhausted_ballots():
+    # A A A | B B | C>B | D>C
+    matrix = ballots([0], [0], [0], [1], [1], [2, 1], [3, 2])
+    result = instant_runoff(matrix, 4)
+    rounds = result['rounds']
+    # C and D tie on 1 with one first preference each: the later option, D, goes
+    assert rounds[0]['counts'] == [3, 2, 1, 1] and rounds[0]['eliminated'] == 3
+    # B and C tie on 2: C has fewer first preferences, so C goes
+    assert rounds[1]['counts'] == [3, 2, 2, 0] and rounds[1]['eliminated'] == 2
+    # D>C has nobody left to transfer to; A and B tie on 3 and B has fewer first preferences
+    assert rounds[2]['counts'][:2] == [3, 3] and rounds[2]['exhausted'] == 1 and rounds[2]['eliminated'] == 1
+    # A alone is left with the 3 ballots still in play
+    assert rounds[3]['exhausted'] == 4 and rounds[3]['active'] == [0]
+    assert result['winner'] == 0
+
+
+def test_irv_with_no_ballots():
+    result = instant_runoff(no_ballots(), 3)
+    assert result['winner'] is None
+    assert result['rounds'] == [{'counts': [0, 0, 0], 'active': [0, 1, 2], 'exhausted': 0, 'eliminated': None}]
+
+
+def test_irv_with_only_blank_ballots():
+    result = instant_runoff(ballots([-1, -1], [-1, -1]), 2)
+    assert result['winner'] is None
+    assert result['rounds'][0]['exhausted'] == 2
+
+
+def test_borda_points_by_rank():
+    # 2 points for first, 1 for second, 0 for third or unranked
+    result = borda(ballots([0, 1, 2], [1, 0], [1]), 3)
+    assert result['rounds'][0]['counts'] == [3, 5, 0]
+    assert result['winner'] == 1
+
+
+def test_borda_with_no_ballots():
+    result = borda(no_ballots(3), 3)
+    assert result['rounds'][0]['counts'] == [0, 0, 0] and result['winner'] is None
+
+
+def test_approval_counts_every_listed_option():
+    result = approval(ballots([0, 2], [2], [1, 2]), 3)
+    assert result['rounds'][0]['counts'] == [1, 1, 3]
+    assert result['winner'] == 2
+
+
+def test_approval_tie_goes_to_the_earlier_option():
+    assert approval(ballots([1], [0]), 2)['winner'] == 0
+
+
+def test_approval_with_no_ballots():
+    assert approval(no_ballots(2), 2)['winner'] is None
+
+
+def test_tabulate_reports_option_ids():
+    result = tabulate(IRV, ballots(*[[0]] * 4, *[[1]] * 3, *[[2, 1]] * 2), [10, 20, 30])
+    assert result['method'] == IRV and result['ballots'] == 9 and result['winner'] == 20
+    assert result['rounds'][0] == {'round': 1, 'counts': {10: 4, 20: 3, 30: 2}, 'exhausted': 0, 'eliminated': 30}
+    # Eliminated options drop out of later rounds' counts
+    assert result['rounds'][1]['counts'] == {10: 4, 20: 5}
+
+
+@pytest.mark.parametrize('method', [IRV, BORDA, APPROVAL])
+def test_tabulate_with_no_ballots(method):
+    result = tabulate(method, no_ballots(), [10, 20])
+    assert result['ballots'] == 0 and result['winner'] is None
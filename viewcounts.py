@@ -0,0 +1,119 @@
+"""
+Poll View Counting
+HyperLogLog sketches for approximate unique viewers and an in-memory
+buffer that collects view increments between periodic database flushes
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+
+def _hash64(key):
+    return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch of 2**precision one-byte registers. Standard error
+    is about 1.04 / sqrt(2**precision): 1.6% at the default precision of 12,
+    in 4 KB whatever the number of viewers.
+    """
+
+    def __init__(self, precision=12, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.num_registers = 1 << precision
+        if registers is None:
+            self.registers = np.zeros(self.num_registers, dtype=np.uint8)
+        else:
+            self.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+            if len(self.registers) != self.num_registers:
+                raise ValueError("register count does not match precision")
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(precision=len(data).bit_length() - 1, registers=data)
+
+    def to_bytes(self):
+        return self.registers.tobytes()
+
+    def add(self, key):
+        h = _hash64(key)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class ViewBuffer:
+    """
+    Per-poll view increments and viewer sketches waiting to be flushed.
+    record() is a dict update under a lock, so counting a view adds no
+    database write to the request.
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def record(self, poll_id, viewer_key):
+        with self._lock:
+            entry = self._pending.get(poll_id)
+            if entry is None:
+                entry = self._pending[poll_id] = [0, HyperLogLog(self.precision)]
+            entry[0] += 1
+            entry[1].add(viewer_key)
+
+    def pending(self, poll_id):
+        """(views, sketch copy) not yet flushed for one poll, or None"""
+        with self._lock:
+            entry = self._pending.get(poll_id)
+            if entry is None:
+                return None
+            return entry[0], HyperLogLog(self.precision, entry[1].to_bytes())
+
+    def drain(self):
+        """Take everything pending: {poll_id: (views, sketch)}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return {poll_id: (views, sketch) for poll_id, (views, sketch) in pending.items()}
+
+    def restore(self, drained):
+        """Put back a drained batch whose flush failed, merging with views recorded since"""
+        with self._lock:
+            for poll_id, (views, sketch) in drained.items():
+                entry = self._pending.get(poll_id)
+                if entry is None:
+                    self._pending[poll_id] = [views, sketch]
+                else:
+                    entry[0] += views
+                    entry[1].merge(sketch)
+
+    def discard(self, poll_id):
+        with self._lock:
+            self._pending.pop(poll_id, None)
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,51 @@
+"""
+Guest Voter Identities
+Canonical forms of guest emails and phone numbers, so every spelling of the
+same address maps to one row in the voters table
+"""
+
+import re
+
+EMAIL = 'email'
+PHONE = 'phone'
+
+_PHONE_NOISE = re.compile(r'[\s().\-]')
+
+
+def canonical_email(email):
+    """Trimmed and lower-cased; None if it is not an address at all"""
+    email = (email or '').strip().lower()
+    if email.count('@') != 1:
+        return None
+    local, domain = email.split('@')
+    if not local or not domain:
+        return None
+    return f"{local}@{domain.rstrip('.')}"
+
+
+def canonical_phone(phone):
+    """Digits only, keeping a leading + for international numbers; None if no digits remain"""
+    phone = _PHONE_NOISE.sub('', (phone or '').strip())
+    if phone.startswith('00'):
+        phone = '+' + phone[2:]
+    prefix = '+' if phone.startswith('+') else ''
+    digits = phone.lstrip('+')
+    if not digits.isdigit():
+        return None
+    return prefix + digits
+
+
+def canonical_identity(email=None, phone=None):
+    """
+    The (kind, identity) pair for a guest, preferring the email when both
+    are given. Returns None when neither yields a usable identity.
+    """
+    if email:
+        identity = canonical_email(email)
+        if identity:
+            return EMAIL, identity
+    if phone:
+        identity = canonical_phone(phone)
+        if identity:
+            return PHONE, identity
+    return None
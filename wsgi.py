@@ -1,3 +1,5 @@
-from app import app   # import your Flask app
+from app import app, start_background_services   # import your Flask app
+
+start_background_services()
 if __name__ == "__main__":
     app.run()